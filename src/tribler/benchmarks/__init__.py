@@ -0,0 +1,3 @@
+"""
+Benchmarks of the Tribler core, which can be run as modules, e.g. ``python -m tribler.benchmarks.entries_query``.
+"""
@@ -0,0 +1,164 @@
+"""
+Generate reproducible synthetic metadata databases for the benchmarks.
+
+The torrents of a corpus are inserted through the ``MetadataStore``, like torrents that are received from other peers.
+Their titles consist of the words of a generated vocabulary, of which some are far more common than others, and their
+health is heavy-tailed: most torrents were never checked or have no peers, a few have thousands of seeders. The same
+number of entries and seed always give the same torrents, but the health checks are relative to the generation time.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import sys
+from pathlib import Path
+from tempfile import gettempdir
+from time import time
+
+from ipv8.keyvault.crypto import default_eccrypto
+from pony.orm import db_session
+
+from tribler.core.database.serialization import NULL_KEY, REGULAR_TORRENT, TorrentMetadataPayload
+from tribler.core.database.store import MetadataStore
+
+SIZES = {"100k": 100_000, "1m": 1_000_000, "5m": 5_000_000}
+DEFAULT_DIRECTORY = Path(gettempdir()) / "tribler-benchmarks"
+
+VOCABULARY_SIZE = 50_000
+COMMON_WORDS = ["ubuntu", "linux", "1080p", "720p", "x264", "hevc", "season", "episode", "complete", "collection",
+                "remastered", "edition", "album", "flac", "mp3", "ebook", "pdf", "documentary", "the", "and"]
+CATEGORIES = ["Video", "VideoClips", "Audio", "Documents", "Compressed", "Other", "xxx"]
+CATEGORY_WEIGHTS = [40, 10, 20, 10, 10, 8, 2]
+TRACKERS = [f"http://tracker{i}.example.org/announce" for i in range(20)]
+
+# The fractions of torrents that were health checked, and that are fresh enough to be popular.
+CHECKED_FRACTION = 0.3
+POPULAR_FRACTION = 0.02
+
+BATCH_SIZE = 10_000
+CORPUS_KEY = "benchmark_corpus"
+
+logger = logging.getLogger(__name__)
+
+
+def create_vocabulary(rng: random.Random, size: int = VOCABULARY_SIZE) -> list[str]:
+    """
+    Create a vocabulary of pronounceable words, most common first.
+    """
+    consonants = "bcdfghjklmnprstvwz"
+    vowels = "aeiou"
+    words = dict.fromkeys(COMMON_WORDS)
+    while len(words) < size:
+        syllables = rng.randint(1, 4)
+        words["".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(syllables))] = None
+    return list(words)
+
+
+def create_payloads(rng: random.Random, vocabulary: list[str], count: int) -> list[TorrentMetadataPayload]:
+    """
+    Create unsigned torrent payloads with titles of which the words follow Zipf's law.
+    """
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(vocabulary) + 1):
+        total += 1 / rank
+        cum_weights.append(total)
+    payloads = []
+    for _ in range(count):
+        title = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(2, 8)))
+        tracker = rng.choice(TRACKERS) if rng.random() < 0.5 else ""
+        payloads.append(TorrentMetadataPayload(REGULAR_TORRENT, 0, NULL_KEY, 0, 0, 0, rng.randbytes(20),
+                                               int(rng.lognormvariate(20, 2)), rng.randint(0, int(time())), title,
+                                               rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0], tracker))
+    return payloads
+
+
+def create_health(rng: random.Random, count: int, now: int) -> list[tuple[int, int, int]]:
+    """
+    Create the (seeders, leechers, last_check) of the given number of torrents.
+    """
+    health = []
+    for _ in range(count):
+        if rng.random() >= CHECKED_FRACTION:
+            health.append((0, 0, 0))
+            continue
+        seeders = min(int(rng.paretovariate(1.2)) - 1, 100_000)
+        leechers = min(int(rng.paretovariate(1.5)) - 1, 100_000)
+        if rng.random() < POPULAR_FRACTION / CHECKED_FRACTION:
+            last_check = now - rng.randint(0, 60 * 60 * 12)
+        else:
+            last_check = now - rng.randint(60 * 60 * 24 * 2, 60 * 60 * 24 * 365)
+        health.append((seeders, leechers, last_check))
+    return health
+
+
+def insert_torrents(metadata_store: MetadataStore, payloads: list[TorrentMetadataPayload],
+                    health: list[tuple[int, int, int]]) -> None:
+    """
+    Insert the given torrents and their health.
+    """
+    metadata_store.process_payloads(payloads, skip_personal_metadata_payload=False, verified=True)
+    metadata_store.refresh_completion_terms()
+    metadata_store.db.get_connection().cursor().executemany("""
+        UPDATE TorrentState SET seeders = ?, leechers = ?, last_check = ?, has_data = 1 WHERE infohash = ?
+    """, [(*torrent_health, payload.infohash)
+          for payload, torrent_health in zip(payloads, health, strict=True) if torrent_health[2]])
+
+
+def create_corpus(path: Path, num_entries: int, seed: int = 0) -> None:
+    """
+    Create a database with the given number of torrents at the given path.
+    """
+    rng = random.Random(seed)
+    vocabulary = create_vocabulary(rng)
+    now = int(time())
+    metadata_store = MetadataStore(path, default_eccrypto.generate_key("curve25519"))
+    try:
+        for start in range(0, num_entries, BATCH_SIZE):
+            count = min(BATCH_SIZE, num_entries - start)
+            payloads = create_payloads(rng, vocabulary, count)
+            metadata_store.submit_write(insert_torrents, metadata_store, payloads, create_health(rng, count, now)
+                                        ).result()
+            logger.info("Inserted %d of %d torrents", start + count, num_entries)
+        metadata_store.submit_write(metadata_store.set_value, CORPUS_KEY,
+                                    json.dumps({"entries": num_entries, "seed": seed})).result()
+    finally:
+        metadata_store.shutdown()
+
+
+def get_corpus(num_entries: int, seed: int = 0, directory: Path = DEFAULT_DIRECTORY) -> Path:
+    """
+    Get the path of the database with the given number of torrents, creating it if it does not exist (completely).
+    """
+    path = directory / f"corpus-{num_entries}-{seed}.db"
+    if path.exists():
+        metadata_store = MetadataStore(path, default_eccrypto.generate_key("curve25519"))
+        with db_session:
+            complete = metadata_store.get_value(CORPUS_KEY) == json.dumps({"entries": num_entries, "seed": seed})
+        metadata_store.shutdown()
+        if complete:
+            return path
+        for file in directory.glob(f"{path.name}*"):
+            file.unlink()
+    directory.mkdir(parents=True, exist_ok=True)
+    create_corpus(path, num_entries, seed)
+    return path
+
+
+def main(argv: list[str]) -> None:
+    """
+    Parse the command line arguments and create the corpus.
+    """
+    parser = argparse.ArgumentParser(prog="corpus", description=__doc__)
+    parser.add_argument("--size", choices=SIZES, default="100k", help="The number of torrents")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the random generator")
+    parser.add_argument("--directory", type=Path, default=DEFAULT_DIRECTORY, help="Where to store the database")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    sys.stdout.write(f"{get_corpus(SIZES[args.size], args.seed, args.directory)}\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+"""
+Measure the Python overhead per ``get_entries`` query and count, which are served from prepared query templates.
+
+The database is empty, so that (next to nothing but) the time spent in Python is measured. The results are printed as
+JSON, in microseconds per query.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from timeit import repeat
+from typing import TYPE_CHECKING
+
+from ipv8.keyvault.crypto import default_eccrypto
+from pony.orm import db_session
+
+from tribler.core.database.query_templates import get_template
+from tribler.core.database.serialization import REGULAR_TORRENT
+from tribler.core.database.store import MetadataStore
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# The arguments of the typical queries of the REST API and of remote queries.
+SHAPES = {
+    "default": {"metadata_type": REGULAR_TORRENT},
+    "sorted": {"metadata_type": REGULAR_TORRENT, "sort_by": "HEALTH", "hide_xxx": True},
+    "search": {"metadata_type": REGULAR_TORRENT, "txt_filter": '"ubuntu"*', "sort_by": "size"},
+    "tagged": {"metadata_type": REGULAR_TORRENT, "category": "Video", "hide_xxx": True},
+    "popular": {"metadata_type": REGULAR_TORRENT, "popular": True},
+    "remote": {"metadata_type": REGULAR_TORRENT, "infohash": b"\x01" * 20},
+}
+
+
+def measure(func: Callable[[], object], number: int) -> float:
+    """
+    Get the best time of ``func``, in microseconds per call.
+    """
+    return min(repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def run(number: int) -> dict[str, dict[str, float]]:
+    """
+    Time all query shapes.
+    """
+    metadata_store = MetadataStore(":memory:", default_eccrypto.generate_key("curve25519"))
+    results = {}
+    with db_session:
+        for name, kwargs in SHAPES.items():
+            results[name] = {
+                "rowids": measure(lambda kwargs=kwargs: metadata_store.get_entries_rowids(last=50, **kwargs), number),
+                "count": measure(lambda kwargs=kwargs: metadata_store.get_entries_count(**kwargs), number)
+            }
+    metadata_store.shutdown()
+    results["template_cache"] = get_template.cache_info()._asdict()
+    return results
+
+
+def main(argv: list[str]) -> None:
+    """
+    Parse the command line arguments and print the results.
+    """
+    parser = argparse.ArgumentParser(prog="entries_query", description=__doc__)
+    parser.add_argument("--number", type=int, default=1000, help="The number of queries per measurement")
+    args = parser.parse_args(argv)
+    json.dump(run(args.number), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
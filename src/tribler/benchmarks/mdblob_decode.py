@@ -0,0 +1,94 @@
+"""
+Measure the decoding and signature checks of a (decompressed) mdblob, payload by payload versus as a batch.
+
+The blob consists of signed torrent payloads. The results are printed as JSON, in milliseconds per blob.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from timeit import repeat
+from typing import TYPE_CHECKING
+
+from ipv8.keyvault.crypto import default_eccrypto
+
+from tribler.core.database.serialization import (
+    REGULAR_TORRENT,
+    TorrentMetadataPayload,
+    decode_payload_batch,
+    int2time,
+    read_payload_with_offset,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def create_blob(num_entries: int) -> bytes:
+    """
+    Create a blob of the given number of signed torrent payloads.
+    """
+    private_key = default_eccrypto.generate_key("curve25519")
+    serialized = []
+    for i in range(num_entries):
+        payload = TorrentMetadataPayload(REGULAR_TORRENT, 0, b"\x00" * 64, i, 0, i, i.to_bytes(20, "big"), i * 1024,
+                                         int2time(i), f"torrent {i}", "Video", "http://tracker.org/announce")
+        payload.add_signature(private_key)
+        serialized.append(payload.serialized() + payload.signature)
+    return b"".join(serialized)
+
+
+def read_payloads(data: bytes) -> list[TorrentMetadataPayload]:
+    """
+    Decode the given blob one payload at a time.
+    """
+    offset = 0
+    payloads = []
+    while offset < len(data):
+        payload, offset = read_payload_with_offset(data, offset)
+        payloads.append(payload)
+    return payloads
+
+
+def measure(func: Callable[[], object], number: int) -> float:
+    """
+    Get the best time of ``func``, in milliseconds per call.
+    """
+    return min(repeat(func, number=number, repeat=5)) / number * 1e3
+
+
+def run(num_entries: int, number: int) -> dict[str, dict[str, float]]:
+    """
+    Time the decoding and verification of a blob.
+    """
+    data = create_blob(num_entries)
+    payloads = read_payloads(data)
+    batch = decode_payload_batch(data)
+    return {
+        "decode": {
+            "payloads": measure(lambda: read_payloads(data), number),
+            "batch": measure(lambda: decode_payload_batch(data), number),
+            "batch_payloads": measure(lambda: list(decode_payload_batch(data)), number),
+        },
+        "verify": {
+            "payloads": measure(lambda: [payload.check_signature() for payload in payloads], number),
+            "batch": measure(lambda: [batch.check_signature(i) for i in range(len(batch))], number),
+        },
+    }
+
+
+def main(argv: list[str]) -> None:
+    """
+    Parse the command line arguments and print the results.
+    """
+    parser = argparse.ArgumentParser(prog="mdblob_decode", description=__doc__)
+    parser.add_argument("--entries", type=int, default=10000, help="The number of payloads in the blob")
+    parser.add_argument("--number", type=int, default=3, help="The number of blobs per measurement")
+    args = parser.parse_args(argv)
+    json.dump(run(args.entries, args.number), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,143 @@
+"""
+Measure the ``MetadataStore`` on a synthetic corpus (see ``tribler.benchmarks.corpus``).
+
+This times full-text searches, popular torrents, auto-completions, the ingestion of compressed blobs, and the packing
+of entries into chunks. The results are printed as JSON, in milliseconds per call, so that runs on different commits
+can be compared.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import repeat
+from typing import TYPE_CHECKING
+
+from ipv8.keyvault.crypto import default_eccrypto
+from lz4.frame import compress
+from pony.orm import db_session
+
+from tribler.benchmarks.corpus import DEFAULT_DIRECTORY, SIZES, create_payloads, create_vocabulary, get_corpus
+from tribler.core.database.orm_bindings.torrent_metadata import entries_to_chunk
+from tribler.core.database.queries import to_fts_query
+from tribler.core.database.serialization import REGULAR_TORRENT
+from tribler.core.database.store import MetadataStore
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# The maximum size of the chunks of entries that are sent to other peers.
+CHUNK_SIZE = 1300
+# The number of entries that are packed into chunks, like the results of a remote query.
+CHUNK_ENTRIES = 1000
+# The number of entries per ingested blob and the number of ingested blobs.
+INGEST_ENTRIES = 1000
+INGEST_BLOBS = 5
+
+
+def measure(func: Callable[[], object], number: int) -> dict[str, float]:
+    """
+    Get the best and median time of ``func``, in milliseconds per call.
+    """
+    times = [time * 1e3 for time in repeat(func, number=1, repeat=number)]
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+def get_revision() -> str | None:
+    """
+    Get the commit that is benchmarked, if this is a git checkout.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True,  # noqa: S607
+                              cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_queries(metadata_store: MetadataStore, vocabulary: list[str], number: int) -> dict[str, dict[str, float]]:
+    """
+    Time the read queries of the REST API and of remote queries.
+    """
+    # Common, average and rare words (the vocabulary is ordered by frequency).
+    searches = {"common": vocabulary[0], "average": vocabulary[100], "rare": vocabulary[10000],
+                "phrase": f"{vocabulary[0]} {vocabulary[1]}"}
+    results = {}
+    with db_session:
+        for name, text in searches.items():
+            results[f"search_{name}"] = measure(lambda text=text: metadata_store.get_entries(
+                txt_filter=to_fts_query(text), metadata_type=REGULAR_TORRENT, first=1, last=50), number)
+        results["popular"] = measure(lambda: metadata_store.get_entries(metadata_type=REGULAR_TORRENT, popular=True),
+                                     number)
+        results["completions"] = measure(lambda: metadata_store.get_auto_complete_terms(vocabulary[100][:2], 5),
+                                         number)
+
+        entries = metadata_store.get_entries(metadata_type=REGULAR_TORRENT, sort_by="HEALTH", first=1,
+                                             last=CHUNK_ENTRIES)
+
+        def pack() -> None:
+            index = 0
+            while index < len(entries):
+                _, index = entries_to_chunk(entries, CHUNK_SIZE, start_index=index, include_health=True)
+
+        results["entries_to_chunk_cold"] = measure(lambda: (metadata_store.signed_blob_cache.clear(), pack()), number)
+        results["entries_to_chunk_warm"] = measure(pack, number)
+    return results
+
+
+def run_ingestion(path: Path, vocabulary: list[str], seed: int) -> dict[str, float]:
+    """
+    Time the ingestion of compressed blobs of new torrents, on a copy of the corpus.
+    """
+    rng = random.Random(seed + 1)
+    blobs = [compress(b"".join(payload.serialized() + payload.signature
+                               for payload in create_payloads(rng, vocabulary, INGEST_ENTRIES)))
+             for _ in range(INGEST_BLOBS)]
+    with TemporaryDirectory() as directory:
+        copy = Path(directory) / path.name
+        shutil.copyfile(path, copy)
+        metadata_store = MetadataStore(copy, default_eccrypto.generate_key("curve25519"))
+        times = [measure(lambda blob=blob: metadata_store.submit_write(metadata_store.process_compressed_mdblob,
+                                                                       blob).result(), 1)["min"]
+                 for blob in blobs]
+        metadata_store.shutdown()
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+def run(size: str, seed: int, directory: Path, number: int) -> dict:
+    """
+    Run all benchmarks on the corpus of the given size.
+    """
+    path = get_corpus(SIZES[size], seed, directory)
+    vocabulary = create_vocabulary(random.Random(seed))
+    metadata_store = MetadataStore(path, default_eccrypto.generate_key("curve25519"))
+    try:
+        results = run_queries(metadata_store, vocabulary, number)
+    finally:
+        metadata_store.shutdown()
+    results["process_compressed_mdblob"] = run_ingestion(path, vocabulary, seed)
+    return {"revision": get_revision(), "corpus": {"size": size, "entries": SIZES[size], "seed": seed},
+            "unit": "ms", "results": results}
+
+
+def main(argv: list[str]) -> None:
+    """
+    Parse the command line arguments and print the results.
+    """
+    parser = argparse.ArgumentParser(prog="metadata_store", description=__doc__)
+    parser.add_argument("--size", choices=SIZES, default="100k", help="The number of torrents of the corpus")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the corpus")
+    parser.add_argument("--directory", type=Path, default=DEFAULT_DIRECTORY, help="Where the corpora are stored")
+    parser.add_argument("--number", type=int, default=20, help="The number of calls per measurement")
+    args = parser.parse_args(argv)
+    json.dump(run(args.size, args.seed, args.directory, args.number), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,70 @@
+"""
+Measure the export of a snapshot of a synthetic corpus (see ``tribler.benchmarks.corpus``) and its import into an
+empty database.
+
+The results are printed as JSON, with the durations in seconds and the sizes in bytes.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from ipv8.keyvault.crypto import default_eccrypto
+
+from tribler.benchmarks.corpus import DEFAULT_DIRECTORY, SIZES, get_corpus
+from tribler.benchmarks.metadata_store import get_revision
+from tribler.core.database.snapshot import export_snapshot, import_snapshot
+from tribler.core.database.store import MetadataStore, WriteCommand
+
+
+def run(size: str, seed: int, directory: Path, verify: bool) -> dict:
+    """
+    Export the corpus of the given size to a snapshot and import it into an empty database.
+    """
+    path = get_corpus(SIZES[size], seed, directory)
+    with TemporaryDirectory() as temporary_directory:
+        snapshot_path = Path(temporary_directory) / "snapshot.lz4"
+        metadata_store = MetadataStore(path, default_eccrypto.generate_key("curve25519"))
+        try:
+            start = perf_counter()
+            exported = export_snapshot(metadata_store, snapshot_path)
+            export_duration = perf_counter() - start
+        finally:
+            metadata_store.shutdown()
+
+        target_path = Path(temporary_directory) / "metadata.db"
+        metadata_store = MetadataStore(target_path, default_eccrypto.generate_key("curve25519"))
+        try:
+            start = perf_counter()
+            command = WriteCommand(import_snapshot, (metadata_store, snapshot_path, verify), exclusive=True)
+            imported = metadata_store.write_queue.submit(command).result()
+            import_duration = perf_counter() - start
+        finally:
+            metadata_store.shutdown()
+        sizes = {"corpus": path.stat().st_size, "snapshot": snapshot_path.stat().st_size,
+                 "imported": target_path.stat().st_size}
+    return {"revision": get_revision(), "corpus": {"size": size, "entries": SIZES[size], "seed": seed},
+            "verify": verify, "exported": exported, "imported": imported, "unit": "s",
+            "results": {"export": export_duration, "import": import_duration}, "bytes": sizes}
+
+
+def main(argv: list[str]) -> None:
+    """
+    Parse the command line arguments and print the results.
+    """
+    parser = argparse.ArgumentParser(prog="snapshot", description=__doc__)
+    parser.add_argument("--size", choices=SIZES, default="1m", help="The number of torrents of the corpus")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the corpus")
+    parser.add_argument("--directory", type=Path, default=DEFAULT_DIRECTORY, help="Where the corpora are stored")
+    parser.add_argument("--no-verify", dest="verify", action="store_false", help="Skip the signature checks")
+    args = parser.parse_args(argv)
+    json.dump(run(args.size, args.seed, args.directory, args.verify), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING, cast
 
@@ -151,15 +152,27 @@ class DatabaseComponent(ComponentLauncher):
             mds_path,
             session.ipv8.keys["anonymous id"].key,
             notifier=session.notifier,
-            disable_sync=False
+            disable_sync=False,
+            substring_search=session.config.get("database/substring_search")
         )
-        session.notifier.add(Notification.torrent_metadata_added, session.mds.TorrentMetadata.add_ffa_from_dict)
+        session.notifier.add(Notification.torrent_metadata_added,
+                             partial(session.mds.submit_write, session.mds.TorrentMetadata.add_ffa_from_dict))
 
     def finalize(self, ipv8: IPv8, session: Session, community: Community) -> None:
         """
-        When we are done launching, register our REST API.
+        When we are done launching, start the database maintenance and register our REST API.
         """
-        session.rest_manager.get_endpoint("/api/statistics").session = session
+        from tribler.core.database.maintenance import DatabaseMaintenance
+
+        maintenance = DatabaseMaintenance(session.mds, community,
+                                          max_size=session.config.get("database/max_size_mb") * 1024 * 1024,
+                                          max_torrents=session.config.get("database/max_torrents"),
+                                          get_protected_infohashes=session.download_manager.downloads.keys)
+        maintenance.start()
+
+        statistics_endpoint = session.rest_manager.get_endpoint("/api/statistics")
+        statistics_endpoint.session = session
+        statistics_endpoint.db_maintenance = maintenance
 
         db_endpoint = session.rest_manager.get_endpoint("/api/metadata")
         db_endpoint.download_manager = session.download_manager
@@ -368,7 +381,7 @@ class VersioningComponent(ComponentLauncher):
         from tribler.core.versioning.manager import VersioningManager
 
         session.rest_manager.get_endpoint("/api/versioning").versioning_manager = VersioningManager(
-            community, session.config
+            community, session.config, session.notifier, session.mds
         )
 
     def get_endpoints(self) -> list[RESTEndpoint]:
@@ -5,6 +5,7 @@ import random
 import sys
 import time
 import uuid
+from asyncio import wrap_future
 from binascii import hexlify, unhexlify
 from importlib.metadata import PackageNotFoundError, version
 from itertools import count
@@ -25,7 +26,7 @@ from tribler.core.content_discovery.payload import (
     VersionResponse,
 )
 from tribler.core.database.orm_bindings.torrent_metadata import LZ4_EMPTY_ARCHIVE, entries_to_chunk
-from tribler.core.database.store import MetadataStore, ObjState, ProcessingResult
+from tribler.core.database.store import Lane, MetadataStore, ObjState, ProcessingResult
 from tribler.core.notifier import Notification, Notifier
 from tribler.core.torrent_checker.healthdataclasses import HealthInfo
 
@@ -176,7 +177,9 @@ class ContentDiscoveryCommunity(Community):
         health_list = [HealthInfo(infohash, last_check=last_check, seeders=seeders, leechers=leechers)
                        for infohash, seeders, leechers, last_check in health_tuples]
 
-        to_resolve = self.process_torrents_health(health_list)
+        to_resolve = await wrap_future(self.composition.metadata_store.submit_write_in_lane(
+            Lane.INGESTION, self.process_torrents_health, health_list
+        ))
 
         for health_info in health_list:
             # Get a single result per infohash to avoid duplicates
@@ -229,12 +232,9 @@ class ContentDiscoveryCommunity(Community):
         """
         request_uuid = uuid.uuid4()
 
-        def notify_gui(request: SelectRequest, processing_results: list[ProcessingResult]) -> None:
-            results = [
-                r.md_obj.to_simple_dict()
-                for r in processing_results
-                if r.obj_state == ObjState.NEW_OBJECT
-            ]
+        async def notify_results(request: SelectRequest, rowids: list[int]) -> None:
+            metadata_store = self.composition.metadata_store
+            results = await metadata_store.run_threaded_read(metadata_store.get_simple_dicts, rowids)
             if self.composition.notifier:
                 self.composition.notifier.notify(Notification.remote_query_results,
                                                  query=kwargs.get("txt_filter"),
@@ -242,6 +242,15 @@ class ContentDiscoveryCommunity(Community):
                                                  uuid=str(request_uuid),
                                                  peer=hexlify(request.peer.mid).decode())
 
+        def notify_gui(request: SelectRequest, processing_results: list[ProcessingResult]) -> None:
+            rowids = [
+                r.md_obj.rowid
+                for r in processing_results
+                if r.obj_state == ObjState.NEW_OBJECT
+            ]
+            # The new entries are projected to dicts on a reader thread, instead of on the event loop.
+            self.register_anonymous_task("notify_gui", notify_results, request, rowids)
+
         peers_to_query = self.get_random_peers(self.composition.max_query_peers)
 
         for p in peers_to_query:
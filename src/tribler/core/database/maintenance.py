@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import logging
+from asyncio import wrap_future
+from time import time
+from typing import TYPE_CHECKING
+
+from tribler.core.database.store import COMPLETION_TERM_BATCH_SIZE, Lane, WriteCommand
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Collection
+
+    from ipv8.taskmanager import TaskManager
+
+    from tribler.core.database.store import MetadataStore
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_CHECK_INTERVAL = 60  # Seconds between the checks for an idle window
+IDLE_PERIOD = 30  # The database is idle if nothing was written for this many seconds
+TIME_BUDGET = 2.0  # The maximum number of seconds that an operation may take per idle window
+
+# The operations, in order, and the minimum number of seconds between their runs.
+OPERATION_INTERVALS = {
+    "completion_terms": MAINTENANCE_CHECK_INTERVAL,
+    "wal_checkpoint": 5 * 60,
+    "fts_merge": 60 * 60,
+    "incremental_vacuum": 60 * 60,
+    "analyze": 24 * 60 * 60,
+}
+
+ANALYSIS_LIMIT = 1000  # The (approximate) number of rows per index that ANALYZE looks at
+FTS_MERGE_PAGES = 500  # The number of FTS segment pages that are merged per step
+VACUUM_PAGES = 1000  # The number of free pages that are released per step
+
+EVICTION_INTERVAL = 5 * 60  # Seconds between the checks of the size of the database
+EVICTION_BATCH_SIZE = 1000  # The maximum number of entries that are deleted per step
+
+
+class DatabaseMaintenance:
+    """
+    Keep the metadata database in shape: index the title words of new entries for auto-completion, update the query
+    planner statistics, merge the segments of the full-text index, release free pages, and checkpoint the write-ahead
+    log.
+
+    The operations only run in idle windows (when nothing was written for a while). Operations that take multiple
+    steps stop when their time budget is spent or when other writes are waiting, and continue in the next window.
+
+    Next to these, the eviction job keeps the database within its maximum size and number of torrents, idle or not.
+    """
+
+    def __init__(self, metadata_store: MetadataStore, task_manager: TaskManager,
+                 time_budget: float = TIME_BUDGET, max_size: int = 0, max_torrents: int = 0,
+                 get_protected_infohashes: Callable[[], Collection[bytes]] = tuple) -> None:
+        """
+        Attach to the given task manager.
+
+        :param max_size: the maximum number of bytes of the database that are in use, or 0 for no maximum.
+        :param max_torrents: the maximum number of torrents, or 0 for no maximum.
+        :param get_protected_infohashes: get the infohashes of the torrents that may not be evicted.
+        """
+        self.metadata_store = metadata_store
+        self.task_manager = task_manager
+        self.time_budget = time_budget
+        self.max_size = max_size
+        self.max_torrents = max_torrents
+        self.get_protected_infohashes = get_protected_infohashes
+        self.stats: dict[str, dict] = {}
+
+    def start(self) -> None:
+        """
+        Start the periodic checks for idle windows and, if the database is bounded, for its size.
+        """
+        self.task_manager.register_task("Database maintenance", self.run, interval=MAINTENANCE_CHECK_INTERVAL,
+                                        delay=MAINTENANCE_CHECK_INTERVAL)
+        if self.max_size or self.max_torrents:
+            self.task_manager.register_task("Database eviction", self.evict, interval=EVICTION_INTERVAL,
+                                            delay=EVICTION_INTERVAL)
+
+    def is_idle(self) -> bool:
+        """
+        Check if nothing was written to the database lately.
+        """
+        return (time() - self.metadata_store.last_write_time >= IDLE_PERIOD
+                and not self.metadata_store.write_queue.has_pending())
+
+    async def run(self) -> None:
+        """
+        Run the operations that are due (or that were not completed in their last run), if the database is idle.
+        """
+        if not self.is_idle():
+            return
+        for name, interval in OPERATION_INTERVALS.items():
+            if self.metadata_store.write_queue.has_pending():
+                break
+            stats = self.stats.get(name)
+            if stats is None or not stats["complete"] or time() - stats["last_run"] >= interval:
+                await self.run_operation(name)
+
+    async def run_operation(self, name: str) -> None:
+        """
+        Run the steps of the given operation until it is complete or its time budget is spent.
+        """
+        step: Callable[[], Awaitable[bool]] = getattr(self, name)
+        start = time()
+        steps = 0
+        complete = False
+        try:
+            while not complete:
+                complete = not await step()
+                steps += 1
+                if time() - start >= self.time_budget or self.metadata_store.write_queue.has_pending():
+                    break
+        except Exception as e:
+            logger.warning("Database maintenance operation %s failed: %s: %s", name, type(e).__name__, str(e))
+        self.stats[name] = {"last_run": start, "duration": time() - start, "steps": steps, "complete": complete}
+        logger.info("Database maintenance operation %s took %d steps (%.3f seconds), complete: %s",
+                    name, steps, self.stats[name]["duration"], complete)
+
+    async def completion_terms(self) -> bool:
+        """
+        Add the title words of some of the new entries (e.g., added through the REST API or by the upgrade) to the
+        auto-completion terms.
+
+        :return: whether there are new entries left.
+        """
+        return await wrap_future(self.metadata_store.submit_write_in_lane(
+            Lane.MAINTENANCE, self.metadata_store.refresh_completion_terms, COMPLETION_TERM_BATCH_SIZE
+        )) >= COMPLETION_TERM_BATCH_SIZE
+
+    async def wal_checkpoint(self) -> bool:
+        """
+        Checkpoint the write-ahead log.
+
+        :return: False, a checkpoint is a single step.
+        """
+        # The checkpoint uses a connection of its own, so it does not matter which thread runs it.
+        await self.metadata_store.run_read_in_lane(Lane.MAINTENANCE, self.metadata_store.checkpoint_wal)
+        return False
+
+    async def fts_merge(self) -> bool:
+        """
+        Merge some segments of the full-text index.
+
+        :return: whether there are segments left to merge.
+        """
+        return await wrap_future(self.metadata_store.submit_write_in_lane(Lane.MAINTENANCE,
+                                                                          self.metadata_store.merge_fts_index,
+                                                                          FTS_MERGE_PAGES))
+
+    async def incremental_vacuum(self) -> bool:
+        """
+        Release some free pages of the database file.
+
+        :return: whether there are free pages left to release.
+        """
+        return await wrap_future(self.metadata_store.submit_write_in_lane(Lane.MAINTENANCE,
+                                                                          self.metadata_store.incremental_vacuum,
+                                                                          VACUUM_PAGES)) > 0
+
+    async def analyze(self) -> bool:
+        """
+        Update the statistics of the query planner.
+
+        :return: False, the statistics are updated in a single step.
+        """
+        await wrap_future(self.metadata_store.submit_write_in_lane(Lane.MAINTENANCE, self.metadata_store.analyze,
+                                                                   ANALYSIS_LIMIT))
+        return False
+
+    async def get_excess(self) -> int:
+        """
+        Get the number of torrents to evict to get within bounds, or at most a batch if the database is too large.
+        """
+        excess = 0
+        if self.max_torrents:
+            num_torrents = await self.metadata_store.run_read_in_lane(Lane.MAINTENANCE,
+                                                                       self.metadata_store.get_num_torrents)
+            excess = num_torrents - self.max_torrents
+        if self.max_size:
+            used_size = await self.metadata_store.run_read_in_lane(Lane.MAINTENANCE,
+                                                                    self.metadata_store.get_db_used_size)
+            if used_size > self.max_size:
+                excess = EVICTION_BATCH_SIZE
+        return min(excess, EVICTION_BATCH_SIZE)
+
+    async def evict(self) -> None:
+        """
+        Delete the least valuable torrents, in batches, until the database is within bounds or the time budget is spent.
+        """
+        start = time()
+        steps = evicted = 0
+        complete = False
+        protected = set(self.get_protected_infohashes())
+        try:
+            while time() - start < self.time_budget:
+                excess = await self.get_excess()
+                if excess <= 0:
+                    complete = True
+                    break
+                command = WriteCommand(self.metadata_store.evict_entries, (excess, protected), exclusive=True,
+                                       lane=Lane.MAINTENANCE)
+                deleted = await wrap_future(self.metadata_store.write_queue.submit(command))
+                steps += 1
+                evicted += deleted
+                if not deleted:
+                    logger.warning("The database exceeds its bounds, but no torrents can be evicted")
+                    break
+        except Exception as e:
+            logger.warning("Database eviction failed: %s: %s", type(e).__name__, str(e))
+        self.stats["eviction"] = {"last_run": start, "duration": time() - start, "steps": steps,
+                                  "complete": complete, "evicted": evicted}
+        if evicted:
+            logger.info("Evicted %d torrents from the database in %.3f seconds",
+                        evicted, self.stats["eviction"]["duration"])
+
+    def get_stats(self) -> dict[str, dict]:
+        """
+        Get the start time, duration, number of steps, and completeness of the last run of every operation (and the
+        number of evicted torrents of the last eviction).
+        """
+        return {name: dict(stats) for name, stats in self.stats.items()}
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import threading
+from hashlib import blake2b
+from math import ceil, exp
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+BLOCK_BITS = 512  # A block is a (64 byte) cache line, all bits of a key are set in the same block
+BITS_PER_KEY = 10  # Gives a false-positive rate of about 1% at full capacity
+NUM_PROBES = 7  # The optimal number of bits per key is BITS_PER_KEY * ln(2)
+PROBE_BITS = 9  # The number of hash bits that select a bit in a block
+
+
+def entry_key(public_key: bytes, id_: int) -> bytes:
+    """
+    Convert the (public_key, id_) key of an entry to a filter key.
+
+    Entry keys are at least 8 bytes longer than infohashes, so they never equal an infohash.
+    """
+    return public_key + id_.to_bytes(8, "big")
+
+
+class MembershipFilter:
+    """
+    A blocked Bloom filter of byte strings (e.g., infohashes), which can tell that a key is definitely absent.
+
+    Keys cannot be removed: a key that is no longer in the database is merely a false positive. The filter is sized
+    for a given capacity: beyond it, the false-positive rate grows, until the filter is rebuilt with a larger capacity.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Create a new filter for (about) ``capacity`` keys.
+        """
+        self.lookups = 0
+        self.absent = 0
+        self._lock = threading.Lock()
+        self.reset(capacity)
+
+    def reset(self, capacity: int) -> None:
+        """
+        Remove all keys and resize the filter for the given capacity.
+        """
+        with self._lock:
+            self.capacity = max(1, capacity)
+            self.num_blocks = ceil(self.capacity * BITS_PER_KEY / BLOCK_BITS)
+            self.bits = bytearray(self.num_blocks * BLOCK_BITS // 8)
+            self.num_keys = 0
+
+    def get_positions(self, key: bytes) -> list[int]:
+        """
+        Get the positions of the bits of the given key.
+        """
+        value = int.from_bytes(blake2b(key, digest_size=16).digest(), "little")
+        offset = (value & 0xFFFFFFFFFFFF) % self.num_blocks * BLOCK_BITS
+        value >>= 48
+        return [offset + (value >> (i * PROBE_BITS) & (BLOCK_BITS - 1)) for i in range(NUM_PROBES)]
+
+    def add(self, key: bytes) -> None:
+        """
+        Add a key to the filter.
+        """
+        self.update((key,))
+
+    def update(self, keys: Iterable[bytes]) -> None:
+        """
+        Add the given keys to the filter.
+        """
+        with self._lock:
+            bits = self.bits
+            for key in keys:
+                for position in self.get_positions(key):
+                    bits[position >> 3] |= 1 << (position & 7)
+                self.num_keys += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        """
+        Check if the given key may have been added. If not, it has definitely not been added.
+        """
+        bits = self.bits
+        self.lookups += 1  # Not locked: the statistics may be off by a little
+        if all(bits[position >> 3] & (1 << (position & 7)) for position in self.get_positions(key)):
+            return True
+        self.absent += 1
+        return False
+
+    def get_false_positive_rate(self) -> float:
+        """
+        Estimate the probability that a key that was never added is reported as present.
+        """
+        return (1 - exp(-NUM_PROBES * self.num_keys / (self.num_blocks * BLOCK_BITS))) ** NUM_PROBES
+
+    def get_stats(self) -> dict[str, float]:
+        """
+        Get the size, memory use, and (estimated) false-positive rate of this filter and the number of lookups.
+        """
+        return {"keys": self.num_keys, "capacity": self.capacity, "memory": len(self.bits),
+                "false_positive_rate": self.get_false_positive_rate(), "lookups": self.lookups, "absent": self.absent}
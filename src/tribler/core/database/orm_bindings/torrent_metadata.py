@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import random
+import threading
 from binascii import hexlify, unhexlify
+from collections import OrderedDict
 from datetime import datetime
 from struct import unpack
 from typing import TYPE_CHECKING, Any, Self
@@ -10,6 +12,7 @@ from lz4.frame import LZ4FrameCompressor
 from pony import orm
 from pony.orm import Database, db_session
 
+from tribler.core.database.membership import entry_key
 from tribler.core.database.serialization import (
     EPOCH,
     REGULAR_TORRENT,
@@ -18,7 +21,6 @@ from tribler.core.database.serialization import (
     time2int,
 )
 from tribler.core.libtorrent.trackers import get_uniformed_tracker_url
-from tribler.core.notifier import Notification, Notifier
 
 NULL_KEY_SUBST = b"\00"
 
@@ -40,8 +42,10 @@ UPDATED = 6  # One of the entry's properties was updated. It will be committed a
 PUBLIC_KEY_LEN = 64
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
     from dataclasses import dataclass
 
+    from tribler.core.database.membership import MembershipFilter
     from tribler.core.database.orm_bindings.torrent_state import TorrentState
     from tribler.core.libtorrent.torrentdef import TorrentDef
 
@@ -109,6 +113,56 @@ def tdef_to_metadata_dict(tdef: TorrentDef) -> dict:
     }
 
 
+class SignedBlobCache:
+    """
+    An LRU cache of the signed serialized forms (blobs) of entries, by their row id.
+
+    Entries are (re)serialized for every peer that they are sent to, which involves converting them to a payload and
+    packing that payload. Their blobs only change when the entries are changed, so these are cached instead.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Create a new cache that holds the blobs of at most ``size`` entries.
+        """
+        self.size = size
+        self._blobs: OrderedDict[int, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, rowid: int) -> bytes | None:
+        """
+        Get the blob of the entry with the given row id, if it is cached.
+        """
+        with self._lock:
+            blob = self._blobs.get(rowid)
+            if blob is not None:
+                self._blobs.move_to_end(rowid)
+            return blob
+
+    def put(self, rowid: int, blob: bytes) -> None:
+        """
+        Store the blob of the entry with the given row id.
+        """
+        with self._lock:
+            self._blobs[rowid] = blob
+            if len(self._blobs) > self.size:
+                self._blobs.popitem(last=False)
+
+    def discard(self, rowid: int) -> None:
+        """
+        Forget the blob of the entry with the given row id, because the entry was changed or removed.
+        """
+        with self._lock:
+            self._blobs.pop(rowid, None)
+
+    def clear(self) -> None:
+        """
+        Forget all blobs.
+        """
+        with self._lock:
+            self._blobs.clear()
+
+
 def entries_to_chunk(metadata_list: list[TorrentMetadata], chunk_size: int, start_index: int = 0,
                      include_health: bool = False) -> tuple[bytes, int]:
     """
@@ -135,8 +189,9 @@ def entries_to_chunk(metadata_list: list[TorrentMetadata], chunk_size: int, star
         raise Exception(msg, metadata_list, chunk_size, start_index)
 
     compressor = LZ4FrameCompressor(auto_flush=True)
-    metadata_buffer = compressor.begin()
-    health_buffer = b''
+    # The chunk is assembled in place: growing immutable bytes objects would copy everything for every entry
+    metadata_buffer = bytearray(compressor.begin())
+    health_buffer = bytearray()
 
     index = 0
     size = len(metadata_buffer) + LZ4_END_MARK_SIZE
@@ -159,17 +214,25 @@ def entries_to_chunk(metadata_list: list[TorrentMetadata], chunk_size: int, star
             health_buffer += health_bytes
         index = count
 
-    result = metadata_buffer + compressor.flush()
+    metadata_buffer += compressor.flush()
     if include_health:
-        result += HealthItemsPayload(health_buffer).serialize()
+        metadata_buffer += HealthItemsPayload(bytes(health_buffer)).serialize()
 
-    return result, index + 1
+    return bytes(metadata_buffer), index + 1
 
 
-def define_binding(db: Database, notifier: Notifier | None,  # noqa: C901
-                   tag_processor_version: int) -> type[TorrentMetadata]:
+def define_binding(db: Database,  # noqa: C901
+                   notify_created: Callable[[list[tuple[bytes | None, str]]], None] | None,
+                   tag_processor_version: int,
+                   get_membership_filter: Callable[[], MembershipFilter] | None = None,
+                   signed_blob_cache: SignedBlobCache | None = None) -> type[TorrentMetadata]:
     """
     Define the torrent metadata binding.
+
+    :param notify_created: announce the (infohash, title) of newly created entries.
+    :param get_membership_filter: get the (current) filter that holds the infohashes of all torrent states and the
+                                  keys of all entries.
+    :param signed_blob_cache: the cache of the serialized forms of entries that were stored in the database.
     """
 
     class TorrentMetadata(db.Entity):
@@ -220,7 +283,8 @@ def define_binding(db: Database, notifier: Notifier | None,  # noqa: C901
 
             if "health" not in kwargs and "infohash" in kwargs:
                 infohash = kwargs["infohash"]
-                health = db.TorrentState.get_for_update(infohash=infohash) or db.TorrentState(infohash=infohash)
+                health = ((get_membership_filter is None or infohash in get_membership_filter())
+                          and db.TorrentState.get_for_update(infohash=infohash)) or db.TorrentState(infohash=infohash)
                 kwargs["health"] = health
 
             if "timestamp" not in kwargs:
@@ -238,13 +302,14 @@ def define_binding(db: Database, notifier: Notifier | None,  # noqa: C901
                 kwargs["signature"] = None
 
             super().__init__(*args, **kwargs)
+            if get_membership_filter is not None:
+                get_membership_filter().add(entry_key(self.public_key, self.id_))
 
             if 'tracker_info' in kwargs:
                 self.add_tracker(kwargs["tracker_info"])
 
-            if notifier:
-                notifier.notify(Notification.new_torrent_metadata_created,
-                                infohash=kwargs.get("infohash"), title=self.title)
+            if notify_created:
+                notify_created([(kwargs.get("infohash"), self.title)])
                 self.tag_processor_version = tag_processor_version
 
         def add_tracker(self, tracker_url: str) -> None:
@@ -255,6 +320,15 @@ def define_binding(db: Database, notifier: Notifier | None,  # noqa: C901
 
         def before_update(self) -> None:
             self.add_tracker(self.tracker_info)
+            if get_membership_filter is not None:
+                # The key of an entry may have been changed (e.g., when it was signed after its creation)
+                get_membership_filter().add(entry_key(self.public_key, self.id_))
+            if signed_blob_cache is not None:
+                signed_blob_cache.discard(self.rowid)
+
+        def before_delete(self) -> None:
+            if signed_blob_cache is not None:
+                signed_blob_cache.discard(self.rowid)
 
         def get_magnet(self) ->  str:
             return f"magnet:?xt=urn:btih:{hexlify(self.infohash).decode()}&dn={self.title}" + (
@@ -272,7 +346,11 @@ def define_binding(db: Database, notifier: Notifier | None,  # noqa: C901
             # two entries have different infohashes but the same id_. We do not want people to exploit this.
             ih_blob = metadata["infohash"]
             pk_blob = b""
-            if cls.exists(lambda g: (g.infohash == ih_blob) or (g.id_ == id_ and g.public_key == pk_blob)):
+            membership_filter = get_membership_filter() if get_membership_filter is not None else None
+            maybe_known = (membership_filter is None or ih_blob in membership_filter
+                           or entry_key(pk_blob, id_) in membership_filter)
+            if maybe_known and cls.exists(lambda g: (g.infohash == ih_blob)
+                                          or (g.id_ == id_ and g.public_key == pk_blob)):
                 return None
             if isinstance(metadata.get("tracker_info", ""), bytes):
                 metadata["tracker_info"] = metadata["tracker_info"].decode()
@@ -337,11 +415,19 @@ def define_binding(db: Database, notifier: Notifier | None,  # noqa: C901
             :param key: private key to sign object with
             :return: serialized_data+signature binary string
             """
+            # Only the blobs of entries that are stored (and not changed since) are cached
+            cacheable = key is None and signed_blob_cache is not None and self._status_ in ("loaded", "inserted",
+                                                                                             "updated")
+            if cacheable and (blob := signed_blob_cache.get(self.rowid)) is not None:
+                return blob
             kwargs = self.to_dict()
             payload = self.payload_class.from_dict(**kwargs)
             payload.signature = kwargs.pop("signature", None) or payload.signature
             if key:
                 payload.add_signature(key)
-            return payload.serialized() + payload.signature
+            blob = payload.serialized() + payload.signature
+            if cacheable:
+                signed_blob_cache.put(self.rowid, blob)
+            return blob
 
     return TorrentMetadata
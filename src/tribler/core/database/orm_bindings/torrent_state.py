@@ -1,16 +1,18 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Self
+from typing import TYPE_CHECKING, Any, Self
 
 from pony import orm
 
 from tribler.core.torrent_checker.healthdataclasses import HealthInfo
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
     from dataclasses import dataclass
 
     from pony.orm import Database
 
+    from tribler.core.database.membership import MembershipFilter
     from tribler.core.database.orm_bindings.torrent_metadata import TorrentMetadata
     from tribler.core.database.orm_bindings.tracker_state import TrackerState
 
@@ -41,9 +43,12 @@ if TYPE_CHECKING:
         def get_for_update(infohash: bytes) -> TorrentState | None: ...  # noqa: D102
 
 
-def define_binding(db: Database) -> type[TorrentState]:
+def define_binding(db: Database,
+                   get_membership_filter: Callable[[], MembershipFilter] | None = None) -> type[TorrentState]:
     """
     Define the tracker state binding.
+
+    :param get_membership_filter: get the (current) filter to add the infohashes of new torrent states to.
     """
 
     class TorrentState(db.Entity):
@@ -61,6 +66,11 @@ def define_binding(db: Database) -> type[TorrentState]:
         metadata = orm.Set('TorrentMetadata', reverse='health')
         trackers = orm.Set('TrackerState', reverse='torrents')
 
+        def __init__(self, *args: Any, **kwargs) -> None:  # noqa: ANN401
+            super().__init__(*args, **kwargs)
+            if get_membership_filter is not None:
+                get_membership_filter().add(self.infohash)
+
         @classmethod
         def from_health(cls: type[Self], health: HealthInfo) -> Self:
             return cls(infohash=health.infohash, seeders=health.seeders, leechers=health.leechers,
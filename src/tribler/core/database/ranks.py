@@ -8,6 +8,10 @@ from __future__ import annotations
 import re
 import time
 from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
 
 SECONDS_IN_DAY = 60 * 60 * 24
 
@@ -48,6 +52,26 @@ def torrent_rank(query: str, title: str, seeders: int = 0, leechers: int = 0, fr
     return tr * sr * fr
 
 
+def torrent_ranks(query: str, titles: Sequence[str | None], seeders: Sequence[int | None],
+                  leechers: Sequence[int | None], freshness: Sequence[float | None]) -> list[float]:
+    """
+    Calculates search ranks for a batch of torrents in a single pass.
+
+    The result is identical to calling ``torrent_rank`` for every torrent, but the query string is only parsed once
+    and the seeders, leechers and freshness ranks are calculated over whole columns.
+
+    :param query: a user-defined query string
+    :param titles: the torrent names
+    :param seeders: the number of seeders of each torrent
+    :param leechers: the number of leechers of each torrent
+    :param freshness: the number of seconds since the creation of each torrent, see ``torrent_rank``
+    :return: the torrent rank values in range [0, 1], in the order of the given torrents
+    """
+    trs = title_ranks(query or '', titles)
+    srs = seeders_ranks(seeders, leechers)
+    frs = freshness_ranks(freshness)
+    return [tr * ((sr + 9) / 10) * ((fr + 9) / 10) for tr, sr, fr in zip(trs, srs, frs, strict=True)]
+
 
 def seeders_rank(seeders: int, leechers: int = 0) -> float:
     """
@@ -61,6 +85,18 @@ def seeders_rank(seeders: int, leechers: int = 0) -> float:
     return sl / (100 + sl)
 
 
+def seeders_ranks(seeders: Sequence[int | None], leechers: Sequence[int | None]) -> list[float]:
+    """
+    Calculates the seeders rank for a batch of torrents. Missing values are treated as zero.
+
+    :param seeders: the number of seeders of each torrent.
+    :param leechers: the number of leechers of each torrent.
+    :return: the torrent ranks based on seeders and leechers, normalized to the range [0, 1]
+    """
+    sls = [(s or 0) + (l or 0) * 0.1 for s, l in zip(seeders, leechers, strict=True)]
+    return [sl / (100 + sl) for sl in sls]
+
+
 def freshness_rank(freshness: float | None) -> float:
     """
     Calculates a rank value based on the torrent freshness. The result is normalized to the range [0, 1].
@@ -77,6 +113,16 @@ def freshness_rank(freshness: float | None) -> float:
     return 1 / (1 + days / 30)
 
 
+def freshness_ranks(freshness: Sequence[float | None]) -> list[float]:
+    """
+    Calculates the freshness rank for a batch of torrents.
+
+    :param freshness: the number of seconds since the creation of each torrent, see ``freshness_rank``
+    :return: the torrent ranks based on freshness, normalized to the range [0, 1]
+    """
+    return [0 if f is None or f < 0 else 1 / (1 + f / SECONDS_IN_DAY / 30) for f in freshness]
+
+
 word_re = re.compile(r'\w+', re.UNICODE)
 
 
@@ -93,6 +139,19 @@ def title_rank(query: str, title: str) -> float:
     return calculate_rank(pat_query, pat_title)
 
 
+def title_ranks(query: str, titles: Sequence[str | None]) -> list[float]:
+    """
+    Calculate the similarity of a batch of titles to a query string, parsing the query only once.
+
+    :param query: a user-defined query string
+    :param titles: the torrent names, None is treated as an empty title
+    :return: the similarities of the titles to the query string as float values in range [0, 1]
+    """
+    pat_query = word_re.findall(query.lower())
+    findall = word_re.findall
+    return [calculate_rank(pat_query, findall((title or '').lower())) for title in titles]
+
+
 # These coefficients are found empirically. Their exact values are not very important for a relative ranking of results
 
 # The first word in a query is considered as a more important than the next one and so on,
@@ -3,7 +3,8 @@ from __future__ import annotations
 import asyncio
 import json
 import typing
-from binascii import unhexlify
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import hexlify, unhexlify
 from contextlib import suppress
 from typing import Self
 
@@ -62,6 +63,32 @@ def parse_bool(obj: str) -> bool:
     return bool(json.loads(obj))
 
 
+def encode_cursor(sort_by: str | None, sort_desc: bool, keyset: list) -> str:
+    """
+    Encode the keyset of the last entry of a page, and the sort order it belongs to, into an opaque cursor.
+    """
+    values = [{"hex": hexlify(value).decode()} if isinstance(value, bytes) else value for value in keyset]
+    return urlsafe_b64encode(json.dumps([sort_by, sort_desc, values]).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_by: str | None, sort_desc: bool) -> list:
+    """
+    Decode a cursor of ``encode_cursor`` into a keyset, if it belongs to the given sort order.
+
+    :raises ValueError: if the cursor is malformed or if it belongs to a different sort order.
+    """
+    try:
+        cursor_sort_by, cursor_sort_desc, values = json.loads(urlsafe_b64decode(cursor))
+        keyset = [unhexlify(value["hex"]) if isinstance(value, dict) else value for value in values]
+    except (TypeError, KeyError) as e:
+        msg = f"Malformed cursor: {cursor}"
+        raise ValueError(msg) from e
+    if (cursor_sort_by, cursor_sort_desc) != (sort_by, sort_desc):
+        msg = "The cursor belongs to a different sort order"
+        raise ValueError(msg)
+    return keyset
+
+
 class DatabaseEndpoint(RESTEndpoint):
     """
     This is the top-level endpoint class that serves other endpoints.
@@ -121,6 +148,8 @@ class DatabaseEndpoint(RESTEndpoint):
             sanitized["channel_pk"] = unhexlify(parameters["channel_pk"])
         if "origin_id" in parameters:
             sanitized["origin_id"] = int(parameters["origin_id"])
+        if "substring" in parameters and parse_bool(parameters.get("substring", "false")):
+            sanitized["substring"] = True
         if "popular" in parameters and parse_bool(parameters.get("popular", "false")):
             sanitized["sort_by"] = "HEALTH"
         return sanitized
@@ -215,8 +244,7 @@ class DatabaseEndpoint(RESTEndpoint):
         if t_filter := request.query.get("filter"):
             sanitized["txt_filter"] = t_filter
 
-        with db_session:
-            contents_list = [entry.to_simple_dict() for entry in request.context[0].get_entries(**sanitized)]
+        contents_list = request.context[0].get_simple_entries(**sanitized)
 
         self.add_download_progress_to_metadata_list(contents_list)
         response_dict = {
@@ -239,7 +267,9 @@ class DatabaseEndpoint(RESTEndpoint):
                         "last": Integer(),
                         "sort_by": String(),
                         "sort_desc": Integer(),
+                        "next_cursor": String(),
                         "total": Integer(),
+                        "total_exact": Boolean(),
                     }
                 )
             }
@@ -252,6 +282,9 @@ class DatabaseEndpoint(RESTEndpoint):
         """
         try:
             sanitized = self.sanitize_parameters(request.query)
+            if cursor := request.query.get("cursor"):
+                sanitized["after"] = decode_cursor(cursor, sanitized["sort_by"], sanitized["sort_desc"])
+            approximate_total = parse_bool(request.query.get("approximate_total", "false"))
         except (ValueError, KeyError):
             return RESTResponse({"error": {
                                     "handled": True,
@@ -273,23 +306,23 @@ class DatabaseEndpoint(RESTEndpoint):
 
         mds: MetadataStore = request.context[0]
 
-        def search_db() -> tuple[list[dict], int, int]:
+        def search_db() -> tuple[list[dict], list | None, int, bool, int]:
             with db_session:
-                pony_query = mds.get_entries(**sanitized)
-                search_results = [r.to_simple_dict() for r in pony_query]
+                search_results, next_keyset = mds.get_simple_entries_page(**sanitized)
                 if include_total:
-                    total = mds.get_total_count(**sanitized)
+                    total, total_exact = (mds.get_approximate_total(**sanitized) if approximate_total
+                                          else (mds.get_total_count(**sanitized), True))
                     max_rowid = mds.get_max_rowid()
                 else:
-                    total = max_rowid = None
+                    total = total_exact = max_rowid = None
             if self.download_manager is not None:
                 self.download_manager.notifier.notify(Notification.local_query_results,
                                                       query=request.query.get("fts_text"),
                                                       results=list(search_results))
-            return search_results, total, max_rowid
+            return search_results, next_keyset, total, total_exact, max_rowid
 
         try:
-            search_results, total, max_rowid = await mds.run_threaded(search_db)
+            search_results, next_keyset, total, total_exact, max_rowid = await mds.run_threaded_read(search_db)
         except Exception as e:
             self._logger.exception("Error while performing DB search: %s: %s", type(e).__name__, e)
             return RESTResponse(status=HTTP_BAD_REQUEST)
@@ -300,9 +333,13 @@ class DatabaseEndpoint(RESTEndpoint):
             "last": sanitized["last"],
             "sort_by": sanitized["sort_by"],
             "sort_desc": sanitized["sort_desc"],
+            # The next page can be requested (with the same query) by passing this continuation token as the cursor.
+            "next_cursor": (encode_cursor(sanitized["sort_by"], sanitized["sort_desc"], next_keyset)
+                            if next_keyset is not None
+                            and len(search_results) == sanitized["last"] - sanitized["first"] + 1 else None),
         }
         if include_total:
-            response_dict.update(total=total, max_rowid=max_rowid)
+            response_dict.update(total=total, total_exact=total_exact, max_rowid=max_rowid)
 
         return RESTResponse(response_dict)
 
@@ -333,7 +370,8 @@ class DatabaseEndpoint(RESTEndpoint):
                                 }}, status=HTTP_BAD_REQUEST)
 
         keywords = args["q"].strip().lower()
-        results = request.context[0].get_auto_complete_terms(keywords, max_terms=5)
+        mds: MetadataStore = request.context[0]
+        results = await mds.run_threaded_read(mds.get_auto_complete_terms, keywords, max_terms=5)
         return RESTResponse({"completions": results})
 
     @docs(
@@ -399,7 +437,8 @@ class DatabaseEndpoint(RESTEndpoint):
 
             return True
 
-        return RESTResponse({"added": (await request.context[0].run_threaded(perform_db_act))})
+        added = await request.context[0].run_threaded(perform_db_act)
+        return RESTResponse({"added": added})
 
     @docs(
         tags=["Metadata"],
@@ -465,7 +504,8 @@ class DatabaseEndpoint(RESTEndpoint):
 
             return True
 
-        return RESTResponse({"removed": (await request.context[0].run_threaded(perform_db_act))})
+        removed = await request.context[0].run_threaded(perform_db_act)
+        return RESTResponse({"removed": removed})
 
     @docs(
         tags=["Metadata"],
@@ -527,4 +567,5 @@ class DatabaseEndpoint(RESTEndpoint):
 
             return True
 
-        return RESTResponse({"updated": (await request.context[0].run_threaded(perform_db_act))})
+        updated = await request.context[0].run_threaded(perform_db_act)
+        return RESTResponse({"updated": updated})
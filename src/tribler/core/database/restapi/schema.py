@@ -14,6 +14,9 @@ class MetadataParameters(Schema):
     })
     sort_desc = Boolean(load_default=True)
     fts_text = String(metadata={"description": "FTS search on the chosen word* terms"})
+    substring = Boolean(load_default=False, metadata={
+        "description": "Match the words of fts_text anywhere in the titles, instead of whole (stemmed) words"
+    })
     hide_xxx = Boolean(load_default=False, metadata={"description": "Toggles xxx filter"})
     category = String()
     tags = List(String())
@@ -31,9 +34,15 @@ class SearchMetadataParameters(MetadataParameters):
     include_total = Boolean(load_default=False, metadata={
         "description": "Include total rows found in query response, expensive if there are many rows"
     })
+    approximate_total = Boolean(load_default=False, metadata={
+        "description": "Allow an inexact (but cheap) total, see total_exact in the query response"
+    })
     max_rowid = Integer(load_default=None, metadata={
         "description": "Only return results with rowid lesser than max_rowid"
     })
+    cursor = String(metadata={
+        "description": "The next_cursor of the previous page, to get the next last - first + 1 results"
+    })
 
 
 class MetadataSchema(Schema):
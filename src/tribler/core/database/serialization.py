@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import struct
+from array import array
 from binascii import hexlify
 from datetime import datetime, timedelta
 from typing import TYPE_CHECKING, Self
@@ -10,6 +11,8 @@ from ipv8.messaging.lazy_payload import VariablePayload, vp_compile
 from ipv8.messaging.serialization import VarLenUtf8, default_serializer
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from ipv8.types import PrivateKey
 
 default_serializer.add_packer("varlenIutf8", VarLenUtf8(">I"))
@@ -325,3 +328,151 @@ class HealthItemsPayload(VariablePayload):
             return 0, 0, 0
 
         return seeders, leechers, last_check
+
+
+# The fixed-size fields of the payload of a torrent, up to (but excluding) its title.
+TORRENT_HEADER = struct.Struct(">HH64sQQQ20sQI")
+# The length of a ``varlenIutf8`` field.
+VARLEN_LENGTH = struct.Struct(">I")
+METADATA_TYPE = struct.Struct(">H")
+# The deprecated fields that a ``ChannelMetadataPayload`` adds to a ``TorrentMetadataPayload``.
+CHANNEL_TORRENT_TRAILER = struct.Struct(">QQ")
+
+
+class PayloadBatch:
+    """
+    The torrent payloads of a blob, decoded field by field into columns.
+
+    The signed parts of the payloads are not copied: they are referred to by their offsets into the blob. Payload
+    objects are only created on demand (e.g., for the payloads that have a valid signature).
+    """
+
+    def __init__(self, data: bytes) -> None:
+        """
+        Create a new, empty batch for the payloads of the given blob.
+        """
+        self.data = data
+        self.view = memoryview(data)
+        self.metadata_types = array("H")
+        self.reserved_flags = array("H")
+        self.public_keys: list[bytes] = []
+        self.ids = array("Q")
+        self.origin_ids = array("Q")
+        self.timestamps = array("Q")
+        self.infohashes: list[bytes] = []
+        self.sizes = array("Q")
+        self.torrent_dates = array("L")
+        self.titles: list[str] = []
+        self.tags: list[str] = []
+        self.tracker_infos: list[str] = []
+        # The offset of every payload and of its signature, which directly follows its signed part.
+        self.offsets = array("Q")
+        self.signature_offsets = array("Q")
+
+    def __len__(self) -> int:
+        """
+        Get the number of payloads in this batch.
+        """
+        return len(self.offsets)
+
+    def __iter__(self) -> Iterator[TorrentMetadataPayload]:
+        """
+        Create the payloads of this batch, in order.
+        """
+        return map(self.get_payload, range(len(self)))
+
+    def get_signed_data(self, index: int) -> memoryview:
+        """
+        Get the serialized form of the payload at the given index, without its signature.
+        """
+        return self.view[self.offsets[index]:self.signature_offsets[index]]
+
+    def get_signature(self, index: int) -> bytes:
+        """
+        Get the signature of the payload at the given index.
+        """
+        offset = self.signature_offsets[index]
+        return self.data[offset:offset + SIGNATURE_SIZE]
+
+    def has_signature(self, index: int) -> bool:
+        """
+        Check if the payload at the given index has a signature, see ``SignedPayload.has_signature``.
+        """
+        return self.public_keys[index] != NULL_KEY or self.get_signature(index) != NULL_SIG
+
+    def check_signature(self, index: int) -> bool:
+        """
+        Check if the signature of the payload at the given index is valid for the payload as it was received.
+        """
+        return default_eccrypto.is_valid_signature(
+            default_eccrypto.key_from_public_bin(b"LibNaCLPK:" + self.public_keys[index]),
+            bytes(self.get_signed_data(index)),
+            self.get_signature(index)
+        )
+
+    def get_payload(self, index: int) -> TorrentMetadataPayload:
+        """
+        Create the payload object at the given index.
+        """
+        if self.metadata_types[index] != REGULAR_TORRENT:
+            # Deprecated payloads are rare, these are decoded the slow way.
+            return read_payload_with_offset(self.data, self.offsets[index])[0]
+        payload = TorrentMetadataPayload.from_unpack_list(
+            REGULAR_TORRENT, self.reserved_flags[index], self.public_keys[index], self.ids[index],
+            self.origin_ids[index], self.timestamps[index], self.infohashes[index], self.sizes[index],
+            self.torrent_dates[index], self.titles[index], self.tags[index], self.tracker_infos[index]
+        )
+        payload.signature = self.get_signature(index)
+        return payload
+
+
+def decode_payload_batch(data: bytes) -> PayloadBatch:
+    """
+    Decode a blob of concatenated payloads into a batch of torrent payloads.
+
+    This is the bulk equivalent of calling ``read_payload_with_offset`` until the data is exhausted, with the fixed
+    fields of torrents decoded by a single precompiled struct. Payloads that are not torrents are skipped.
+    """
+    batch = PayloadBatch(data)
+    view = batch.view
+    size = len(data)
+    offset = 0
+    while offset < size:
+        start = offset
+        metadata_type, = METADATA_TYPE.unpack_from(view, offset)
+        if metadata_type not in (REGULAR_TORRENT, CHANNEL_TORRENT):
+            # Deprecated payloads, or an UnknownBlobTypeException
+            _, offset = read_payload_with_offset(data, offset)
+            continue
+
+        (_, reserved_flags, public_key, id_, origin_id, timestamp,
+         infohash, torrent_size, torrent_date) = TORRENT_HEADER.unpack_from(view, offset)
+        offset += TORRENT_HEADER.size
+        strings = []
+        for _ in range(3):
+            length, = VARLEN_LENGTH.unpack_from(view, offset)
+            offset += VARLEN_LENGTH.size
+            strings.append(str(view[offset:offset + length], "utf-8"))
+            offset += length
+        if metadata_type == CHANNEL_TORRENT:
+            offset += CHANNEL_TORRENT_TRAILER.size
+        if offset + SIGNATURE_SIZE > size:
+            msg = f"Truncated payload at offset {start}"
+            raise ValueError(msg)
+
+        batch.metadata_types.append(metadata_type)
+        batch.reserved_flags.append(reserved_flags)
+        batch.public_keys.append(public_key)
+        batch.ids.append(id_)
+        batch.origin_ids.append(origin_id)
+        batch.timestamps.append(timestamp)
+        batch.infohashes.append(infohash)
+        batch.sizes.append(torrent_size)
+        batch.torrent_dates.append(torrent_date)
+        batch.titles.append(strings[0])
+        batch.tags.append(strings[1])
+        batch.tracker_infos.append(strings[2])
+        batch.offsets.append(start)
+        batch.signature_offsets.append(offset)
+        offset += SIGNATURE_SIZE
+    return batch
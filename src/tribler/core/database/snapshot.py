@@ -0,0 +1,108 @@
+"""
+Compact snapshots of the torrents of a metadata store, to bootstrap the database of a new node.
+
+A snapshot is a single LZ4 frame that holds a header and a sequence of batches. Every batch consists of its header,
+the signed torrent payloads (in the wire format of ``TorrentMetadataPayload``, like the blobs that are gossiped), and
+the health of these torrents. A batch without entries ends the snapshot, to detect truncated files.
+"""
+from __future__ import annotations
+
+import logging
+import struct
+from typing import IO, TYPE_CHECKING
+
+import lz4.frame
+from pony.orm import db_session
+
+from tribler.core.database.serialization import REGULAR_TORRENT, decode_payload_batch
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from tribler.core.database.serialization import TorrentMetadataPayload
+    from tribler.core.database.store import MetadataStore
+
+SNAPSHOT_MAGIC = b"TRBLSNAP"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct(">8sH")  # The magic and the version
+BATCH_HEADER = struct.Struct(">II")  # The number of entries and the size of their payloads
+HEALTH = struct.Struct(">IIQ")  # The seeders, leechers and last check of an entry
+
+SNAPSHOT_BATCH_SIZE = 10_000
+
+logger = logging.getLogger(__name__)
+
+
+def read_exactly(file: IO[bytes], size: int) -> bytes:
+    """
+    Read the given number of bytes from the given file.
+
+    :raises ValueError: if the file ends before that.
+    """
+    data = file.read(size)
+    if len(data) != size:
+        msg = f"The snapshot is truncated: expected {size} bytes, got {len(data)}"
+        raise ValueError(msg)
+    return data
+
+
+def export_snapshot(metadata_store: MetadataStore, path: Path, batch_size: int = SNAPSHOT_BATCH_SIZE) -> int:
+    """
+    Write all torrents of the given store, with their signatures and health, to a snapshot at the given path.
+
+    :return: the number of exported torrents.
+    """
+    exported = 0
+    with lz4.frame.open(path, "wb") as file, db_session:
+        file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+        for blobs, health in metadata_store.get_snapshot_batches(batch_size):
+            payloads = b"".join(blobs)
+            file.write(BATCH_HEADER.pack(len(blobs), len(payloads)))
+            file.write(payloads)
+            file.write(b"".join(HEALTH.pack(*torrent_health) for torrent_health in health))
+            exported += len(blobs)
+        file.write(BATCH_HEADER.pack(0, 0))
+    logger.info("Exported %d torrents to %s", exported, path)
+    return exported
+
+
+def read_snapshot(metadata_store: MetadataStore, path: Path, verify: bool = True
+                  ) -> Iterator[tuple[list[TorrentMetadataPayload], dict[bytes, tuple[int, int, int]]]]:
+    """
+    Read the batches of payloads of the snapshot at the given path and the health of their infohashes.
+
+    :param verify: whether to drop the payloads with an invalid signature.
+    :raises ValueError: if the file is not a (complete) snapshot.
+    """
+    with lz4.frame.open(path, "rb") as file:
+        magic, version = SNAPSHOT_HEADER.unpack(read_exactly(file, SNAPSHOT_HEADER.size))
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            msg = f"Not a snapshot of version {SNAPSHOT_VERSION}: {path}"
+            raise ValueError(msg)
+        while True:
+            num_entries, payloads_size = BATCH_HEADER.unpack(read_exactly(file, BATCH_HEADER.size))
+            if not num_entries:
+                return
+            batch = decode_payload_batch(read_exactly(file, payloads_size))
+            if len(batch) != num_entries:
+                msg = f"The batch holds {len(batch)} payloads instead of {num_entries}"
+                raise ValueError(msg)
+            health = dict(zip(batch.infohashes, HEALTH.iter_unpack(read_exactly(file, HEALTH.size * num_entries)),
+                              strict=True))
+            payloads = [payload for payload in (metadata_store.verify_payload_batch(batch) if verify else batch)
+                        if payload.metadata_type == REGULAR_TORRENT]
+            yield payloads, {payload.infohash: health[payload.infohash] for payload in payloads}
+
+
+def import_snapshot(metadata_store: MetadataStore, path: Path, verify: bool = True) -> int:
+    """
+    Add the torrents of the snapshot at the given path to the given store, in a single transaction.
+
+    This manages its own transaction, so it should be submitted to the write queue as an exclusive command.
+
+    :return: the number of added torrents.
+    """
+    imported = metadata_store.import_snapshot_batches(read_snapshot(metadata_store, path, verify))
+    logger.info("Imported %d torrents from %s", imported, path)
+    return imported
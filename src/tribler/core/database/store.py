@@ -1,45 +1,74 @@
 from __future__ import annotations
 
 import enum
+import json
 import logging
+import os
 import re
+import sqlite3
 import threading
-from asyncio import get_running_loop
+from asyncio import wrap_future
+from binascii import hexlify
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from itertools import chain, count
+from math import ceil
 from os.path import getsize
 from pathlib import Path
-from time import sleep, time
+from queue import Empty, PriorityQueue
+from time import monotonic, time
 from typing import TYPE_CHECKING, Any
 
 from lz4.frame import LZ4FrameDecompressor
-from pony import orm
-from pony.orm import Database, db_session, desc, left_join, raw_sql, select  # noqa: F401 (desc is used by pony!)
-from pony.orm.dbproviders.sqlite import keep_exception
+from pony.orm import Database, db_session, select
+from pony.utils import datetime2timestamp
 
+from tribler.core.database.membership import MembershipFilter, entry_key
 from tribler.core.database.orm_bindings import misc, torrent_metadata, tracker_state
 from tribler.core.database.orm_bindings import torrent_state as torrent_state_
-from tribler.core.database.orm_bindings.torrent_metadata import NULL_KEY_SUBST
-from tribler.core.database.ranks import torrent_rank
+from tribler.core.database.orm_bindings.torrent_metadata import (
+    COMMITTED,
+    SignedBlobCache,
+    infohash_to_id,
+)
+from tribler.core.database.query_templates import (
+    POPULAR_TORRENTS_FRESHNESS_PERIOD,
+    SELECT_CANDIDATES,
+    SELECT_COUNT,
+    SELECT_ROWIDS,
+    TRIGRAM_INDEX,
+    WORD_INDEX,
+    get_keyset_columns,
+    plan_text_search,
+    prepare_entries_query,
+)
+from tribler.core.database.ranks import torrent_ranks
 from tribler.core.database.serialization import (
     CHANNEL_TORRENT,
     COLLECTION_NODE,
     NULL_KEY,
+    NULL_SIG,
     REGULAR_TORRENT,
     HealthItemsPayload,
     TorrentMetadataPayload,
-    read_payload_with_offset,
+    decode_payload_batch,
+    int2time,
 )
+from tribler.core.libtorrent.trackers import get_uniformed_tracker_url
+from tribler.core.notifier import Notification
 from tribler.core.torrent_checker.healthdataclasses import HealthInfo
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
-    from sqlite3 import Connection
+    from collections.abc import Callable, Collection, Iterable, Iterator, Sequence
+    from sqlite3 import Connection, Cursor
 
     from ipv8.types import PrivateKey
-    from pony.orm.core import Entity, Query
+    from pony.orm.core import Entity
 
     from tribler.core.database.orm_bindings.torrent_metadata import TorrentMetadata
+    from tribler.core.database.serialization import PayloadBatch
     from tribler.core.notifier import Notifier
 
 
@@ -69,14 +98,406 @@ class ProcessingResult:
     missing_deps: list = field(default_factory=list)
 
 
+class ResultCache:
+    """
+    An LRU cache of query results (pages) that is invalidated as a whole by bumping its write generation.
+
+    Every write that can change query results should bump the generation. Results of queries that overlapped with a
+    write are not stored, as they may already be outdated.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Create a new cache that holds at most ``size`` query results.
+        """
+        self.size = size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[tuple, tuple[list[dict], list | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query: dict[str, Any]) -> tuple:
+        """
+        Convert the (keyword) arguments of a query to a hashable cache key.
+        """
+        def make_hashable(value: Any) -> Any:  # noqa: ANN401
+            if isinstance(value, set | frozenset):
+                return frozenset(value)
+            if isinstance(value, list | tuple):
+                return tuple(value)
+            return value
+
+        return tuple(sorted((name, make_hashable(value)) for name, value in query.items()))
+
+    def get(self, query: dict[str, Any]) -> tuple[int, tuple[list[dict], list | None] | None]:
+        """
+        Get the current generation and the cached results for the given query (``None`` if they are not cached).
+        """
+        key = self.make_key(query)
+        with self._lock:
+            results = self._results.get(key)
+            if results is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._results.move_to_end(key)
+            return self.generation, results
+
+    def put(self, generation: int, query: dict[str, Any], results: tuple[list[dict], list | None]) -> None:
+        """
+        Store the results of the given query, if they were retrieved during the current generation.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._results[self.make_key(query)] = results
+            if len(self._results) > self.size:
+                self._results.popitem(last=False)
+
+    def bump_generation(self) -> None:
+        """
+        Invalidate all cached results.
+        """
+        with self._lock:
+            self.generation += 1
+            self._results.clear()
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Get the number of cache hits, misses, and the number of cached results.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._results)}
+
+
+class Lane(enum.IntEnum):
+    """
+    The kinds of threaded database work, in order of priority: queued work of a lower lane is always picked up first.
+    """
+
+    INTERACTIVE = 0  # Requests of the user, through the REST API
+    REMOTE = 1  # Answers to the queries of other peers
+    INGESTION = 2  # Processing of the entries that other peers send us
+    MAINTENANCE = 3  # Upkeep of the database, see ``DatabaseMaintenance``
+
+
+class LaneStats:
+    """
+    The queue depth and the time that work waited in the queue, per lane.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create new statistics, without any queued work.
+        """
+        self._lock = threading.Lock()
+        self.queued = [0] * len(Lane)
+        self.started = [0] * len(Lane)
+        self.total_wait = [0.0] * len(Lane)
+        self.max_wait = [0.0] * len(Lane)
+
+    def on_queued(self, lane: Lane) -> None:
+        """
+        Count work that was queued in the given lane.
+        """
+        with self._lock:
+            self.queued[lane] += 1
+
+    def on_started(self, lane: Lane, wait: float) -> None:
+        """
+        Count work of the given lane that was taken from the queue after waiting ``wait`` seconds.
+        """
+        with self._lock:
+            self.started[lane] += 1
+            self.total_wait[lane] += wait
+            self.max_wait[lane] = max(self.max_wait[lane], wait)
+
+    def get_stats(self) -> dict[str, dict[str, float]]:
+        """
+        Get the current queue depth, the number of started calls, and the mean and maximum wait (in seconds) per lane.
+        """
+        with self._lock:
+            return {lane.name.lower(): {"depth": self.queued[lane] - self.started[lane],
+                                        "started": self.started[lane],
+                                        "mean_wait": self.total_wait[lane] / self.started[lane]
+                                        if self.started[lane] else 0.0,
+                                        "max_wait": self.max_wait[lane]}
+                    for lane in Lane}
+
+
+class PriorityExecutor:
+    """
+    A pool of long-lived threads that execute calls in the order of their lanes, and first come, first served within
+    a lane. A busy lane delays all lanes after it, but never the lanes before it.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str,
+                 initializer: Callable[[], None] | None = None) -> None:
+        """
+        Create a new executor and start its threads.
+
+        :param max_workers: the number of threads.
+        :param thread_name_prefix: the prefix of the names of the threads.
+        :param initializer: a callback that is called on every thread, before it executes its first call.
+        """
+        self.initializer = initializer
+        self.stats = LaneStats()
+        self._queues: list[deque[tuple[Future, Callable, tuple, dict, float]]] = [deque() for _ in Lane]
+        self._condition = threading.Condition()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._run, name=f"{thread_name_prefix}_{i}", daemon=True)
+                         for i in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, lane: Lane, func: Callable, *args: Any, **kwargs) -> Future:  # noqa: ANN401
+        """
+        Queue ``func(*args, **kwargs)`` in the given lane.
+
+        :return: the future of the result of the call.
+        """
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                msg = "Cannot queue calls after shutdown"
+                raise RuntimeError(msg)
+            self._queues[lane].append((future, func, args, kwargs, monotonic()))
+            self.stats.on_queued(lane)
+            self._condition.notify()
+        return future
+
+    def shutdown(self, cancel_futures: bool = False) -> None:
+        """
+        Stop the threads once they have executed the queued calls, or cancel these calls first.
+        """
+        with self._condition:
+            self._closed = True
+            if cancel_futures:
+                for lane in Lane:
+                    for future, *_ in self._queues[lane]:
+                        future.cancel()
+                        self.stats.on_started(lane, 0.0)
+                    self._queues[lane].clear()
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self) -> None:
+        """
+        Execute the queued calls, the first call of the first non-empty lane first, until the executor is shut down.
+        """
+        if self.initializer is not None:
+            self.initializer()
+        while True:
+            with self._condition:
+                while not self._closed and not any(self._queues):
+                    self._condition.wait()
+                lane = next((lane for lane in Lane if self._queues[lane]), None)
+                if lane is None:
+                    return
+                future, func, args, kwargs, queued_at = self._queues[lane].popleft()
+            self.stats.on_started(lane, monotonic() - queued_at)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+
+@dataclass
+class WriteCommand:
+    """
+    A call of ``func(*args, **kwargs)`` that writes to the database, to be executed by a ``WriteQueue``.
+
+    Exclusive commands are never grouped with other commands, they are expected to manage their own transactions.
+    """
+
+    func: Callable
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    exclusive: bool = False
+    lane: Lane = Lane.INTERACTIVE
+    future: Future = field(default_factory=Future)
+    queued_at: float = 0.0
+
+    def execute(self) -> Any:  # noqa: ANN401
+        """
+        Perform the call of this command.
+        """
+        return self.func(*self.args, **self.kwargs)
+
+
+class WriteQueue:
+    """
+    A single writer thread, which owns the (only) write connection, and the queue of commands it executes.
+
+    Queued commands are executed in the order of their lanes, and first come, first served within a lane. Commands
+    that are queued while the writer is busy are coalesced into a single transaction (a group commit) of at
+    most ``max_group_size`` commands. Their futures are resolved once the transaction is committed. If any command of a
+    group fails, the group is rolled back and its commands are retried in transactions of their own.
+    """
+
+    STOP = None
+
+    def __init__(self, max_group_size: int, on_commit: Callable[[], None] | None = None,
+                 thread_name: str = "WriteQueue", on_rollback: Callable[[], None] | None = None) -> None:
+        """
+        Create a new queue and start its writer thread.
+
+        :param max_group_size: the maximum number of commands per transaction.
+        :param on_commit: a callback that is called (on the writer thread) after every committed transaction.
+        :param thread_name: the name of the writer thread.
+        :param on_rollback: a callback that is called (on the writer thread) after every failed transaction.
+        """
+        self.max_group_size = max_group_size
+        self.on_commit = on_commit
+        self.on_rollback = on_rollback
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.stats = LaneStats()
+        self._queue: PriorityQueue[tuple[int, int, WriteCommand | None]] = PriorityQueue()
+        self._sequence = count()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=thread_name, daemon=True)
+        self._thread.start()
+
+    def submit(self, command: WriteCommand) -> Future:
+        """
+        Queue the given command for execution on the writer thread.
+
+        :return: the future of the command, which resolves after its transaction is committed.
+        """
+        if self._closed:
+            msg = "Cannot queue writes after shutdown"
+            raise RuntimeError(msg)
+        command.queued_at = monotonic()
+        self.stats.on_queued(command.lane)
+        self._queue.put((command.lane, next(self._sequence), command))
+        return command.future
+
+    def has_pending(self) -> bool:
+        """
+        Check if there are commands that are waiting to be executed.
+        """
+        return not self._queue.empty()
+
+    def is_writer_thread(self) -> bool:
+        """
+        Check if the current thread is the writer thread.
+        """
+        return threading.current_thread() is self._thread
+
+    def shutdown(self) -> None:
+        """
+        Execute the commands that were already queued and stop the writer thread.
+        """
+        if not self._closed:
+            self._closed = True
+            # The stop sentinel goes after all lanes, so that it follows all queued commands.
+            self._queue.put((len(Lane), next(self._sequence), self.STOP))
+        self._thread.join()
+
+    def _run(self) -> None:
+        """
+        Execute the queued commands, grouping as many non-exclusive commands as are queued at once.
+        """
+        pending: list[WriteCommand | None] = []
+        while True:
+            command = pending.pop() if pending else self._take(self._queue.get())
+            if command is self.STOP:
+                break
+            group = [command]
+            while not command.exclusive and len(group) < self.max_group_size:
+                try:
+                    queued = self._take(self._queue.get_nowait())
+                except Empty:
+                    break
+                if queued is self.STOP or queued.exclusive:
+                    pending.append(queued)
+                    break
+                group.append(queued)
+            group = [command for command in group if command.future.set_running_or_notify_cancel()]
+            if group:
+                self._execute(group)
+
+    def _take(self, item: tuple[int, int, WriteCommand | None]) -> WriteCommand | None:
+        """
+        Unpack a queued item and count the wait of its command.
+        """
+        command = item[2]
+        if command is not None:
+            self.stats.on_started(command.lane, monotonic() - command.queued_at)
+        return command
+
+    def _execute(self, group: list[WriteCommand]) -> None:
+        """
+        Execute the given commands in a single transaction (unless a command is exclusive) and resolve their futures.
+        """
+        try:
+            if group[0].exclusive:
+                results = [group[0].execute()]
+            else:
+                with db_session(immediate=True):
+                    results = [command.execute() for command in group]
+        except Exception as e:
+            if self.on_rollback is not None:
+                self.on_rollback()
+            if len(group) > 1:
+                for command in group:
+                    self._execute([command])
+                return
+            self._logger.warning("Write command %s failed: %s: %s", group[0].func.__name__, type(e).__name__, str(e))
+            group[0].future.set_exception(e)
+            return
+        if self.on_commit is not None:
+            self.on_commit()
+        for command, result in zip(group, results, strict=True):
+            command.future.set_result(result)
+
+
 BETA_DB_VERSIONS = [0, 1, 2, 3, 4, 5]
-CURRENT_DB_VERSION = 15
+CURRENT_DB_VERSION = 19
+TORRENT_TAG_DB_VERSION = 16  # The first version that has the normalized TorrentTag table
+ENTRY_COUNT_DB_VERSION = 17  # The first version that has the EntryCount table
+POPULAR_TORRENT_DB_VERSION = 18  # The first version that has the PopularTorrent table
+COMPLETION_TERM_DB_VERSION = 19  # The first version that has the CompletionTerm table
+
+# Approximate totals of text searches count at most this many full-text matches (see ``query_templates.get_filter_sql``).
+APPROXIMATE_TOTAL_THRESHOLD = 1000
 
 MIN_BATCH_SIZE = 10
 MAX_BATCH_SIZE = 1000
 
-POPULAR_TORRENTS_FRESHNESS_PERIOD = 60 * 60 * 24  # Last day
-POPULAR_TORRENTS_COUNT = 100
+# The number of long-lived, read-only connections (one per reader thread) used to serve searches.
+READ_CONNECTIONS = 4
+
+# The number of distinct get_simple_entries results that are kept in memory.
+RESULT_CACHE_SIZE = 128
+
+# The number of threads that verify the signatures of incoming payloads (the crypto library releases the GIL).
+VERIFY_THREADS = os.cpu_count() or 1
+
+# The maximum number of queued writes that are committed in a single transaction.
+MAX_WRITE_GROUP_SIZE = 100
+
+# The membership filter is rebuilt at startup, with room for this many keys, or twice the number of keys we have.
+MEMBERSHIP_FILTER_MIN_CAPACITY = 100_000
+
+# The number of serialized entries that are kept, about a few hundred bytes each.
+SIGNED_BLOB_CACHE_SIZE = 10_000
+
+# Title words shorter than this are not worth suggesting as completions.
+COMPLETION_TERM_MIN_LENGTH = 2
+# The maximum number of entries of which the title words are added to the completion terms per refresh.
+COMPLETION_TERM_BATCH_SIZE = 1000
+
+# The conditions of the free-for-all entries that are evicted first, in order: never checked, no seeders, any.
+EVICTION_TIERS = ("coalesce(ts.last_check, 0) = 0", "coalesce(ts.seeders, 0) = 0", "1")
+
 
 # This table should never be used from ORM directly.
 # It is created as a VIRTUAL table by raw SQL and
@@ -104,6 +525,184 @@ sql_add_fts_trigger_update = """
         INSERT INTO FtsIndex(rowid, title) VALUES (new.rowid, new.title);
     END;"""
 
+# The optional index of all substrings of three characters of the titles, for substring searches (see
+# ``plan_text_search``). Like the FtsIndex, it is created by raw SQL and maintained by SQL triggers.
+sql_create_trigram_fts_table = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS FtsTrigramIndex USING FTS5
+        (title, content='ChannelNode', tokenize='trigram');"""
+
+sql_add_trigram_fts_trigger_insert = """
+    CREATE TRIGGER IF NOT EXISTS fts_trigram_ai AFTER INSERT ON ChannelNode
+    BEGIN
+        INSERT INTO FtsTrigramIndex(rowid, title) VALUES (new.rowid, new.title);
+    END;"""
+
+sql_add_trigram_fts_trigger_delete = """
+    CREATE TRIGGER IF NOT EXISTS fts_trigram_ad AFTER DELETE ON ChannelNode
+    BEGIN
+        INSERT INTO FtsTrigramIndex(FtsTrigramIndex, rowid, title) VALUES ('delete', old.rowid, old.title);
+    END;"""
+
+sql_add_trigram_fts_trigger_update = """
+    CREATE TRIGGER IF NOT EXISTS fts_trigram_au AFTER UPDATE OF title ON ChannelNode BEGIN
+        INSERT INTO FtsTrigramIndex(FtsTrigramIndex, rowid, title) VALUES ('delete', old.rowid, old.title);
+        INSERT INTO FtsTrigramIndex(rowid, title) VALUES (new.rowid, new.title);
+    END;"""
+
+# Normalized (split) form of the comma-separated ChannelNode.tags. Like the FtsIndex, this table
+# should never be used from ORM directly: it is created by raw SQL and maintained by SQL triggers.
+sql_create_torrent_tag_table = """
+    CREATE TABLE IF NOT EXISTS TorrentTag (
+        torrent_rowid INTEGER NOT NULL,
+        tag TEXT NOT NULL,
+        PRIMARY KEY (tag, torrent_rowid)
+    ) WITHOUT ROWID;"""
+
+sql_create_index_torrent_tag_torrent_rowid = """
+    CREATE INDEX IF NOT EXISTS idx_torrenttag__torrent_rowid ON TorrentTag (torrent_rowid);"""
+
+
+def rebuild_fts_indexes(cursor: Cursor) -> None:
+    """
+    Rebuild the full-text indexes that exist (the word index and, with substring searches, the trigram index) from the
+    titles of all entries.
+
+    This only needs a cursor, so that it also serves connections without a ``MetadataStore`` (e.g., of the upgrade).
+    """
+    indexes = [WORD_INDEX, TRIGRAM_INDEX]
+    existing = {name for name, in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)",
+                                                 indexes)}
+    for index in indexes:
+        if index in existing:
+            cursor.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")  # noqa: S608
+
+
+def _sql_tags_as_json_array(column: str) -> str:
+    """
+    SQLite has no string splitting and triggers do not allow (recursive) CTEs. Instead, we turn the comma-separated
+    tags into a JSON array of strings that ``json_each`` can split into rows.
+
+    Tags that do not form valid JSON (e.g., because of control characters) and NULL tags map to NULL (no rows).
+    """
+    array = f"""'["' || replace(replace(replace({column}, '\\', '\\\\'), '"', '\\"'), ',', '","') || '"]'"""
+    return f"CASE WHEN json_valid({array}) THEN {array} END"
+
+
+sql_add_torrent_tag_trigger_insert = f"""
+    CREATE TRIGGER IF NOT EXISTS torrenttag_ai AFTER INSERT ON ChannelNode
+    BEGIN
+        INSERT OR IGNORE INTO TorrentTag(torrent_rowid, tag)
+        SELECT new.rowid, value FROM json_each({_sql_tags_as_json_array("new.tags")}) WHERE value != '';
+    END;"""  # noqa: S608
+
+sql_add_torrent_tag_trigger_delete = """
+    CREATE TRIGGER IF NOT EXISTS torrenttag_ad AFTER DELETE ON ChannelNode
+    BEGIN
+        DELETE FROM TorrentTag WHERE torrent_rowid = old.rowid;
+    END;"""
+
+sql_add_torrent_tag_trigger_update = f"""
+    CREATE TRIGGER IF NOT EXISTS torrenttag_au AFTER UPDATE OF tags ON ChannelNode
+    BEGIN
+        DELETE FROM TorrentTag WHERE torrent_rowid = old.rowid;
+        INSERT OR IGNORE INTO TorrentTag(torrent_rowid, tag)
+        SELECT new.rowid, value FROM json_each({_sql_tags_as_json_array("new.tags")}) WHERE value != '';
+    END;"""  # noqa: S608
+
+sql_fill_torrent_tags = f"""
+    INSERT OR IGNORE INTO TorrentTag(torrent_rowid, tag)
+    SELECT ChannelNode.rowid, tag.value
+    FROM ChannelNode, json_each({_sql_tags_as_json_array("ChannelNode.tags")}) AS tag
+    WHERE tag.value != '';"""  # noqa: S608
+
+# The number of entries per metadata type, so that (unfiltered) totals do not have to count the whole ChannelNode table.
+# Like the FtsIndex, this table should never be used from ORM directly: it is maintained by SQL triggers.
+sql_create_entry_count_table = """
+    CREATE TABLE IF NOT EXISTS EntryCount (
+        metadata_type INTEGER NOT NULL PRIMARY KEY,
+        num_entries INTEGER NOT NULL
+    );"""
+
+sql_add_entry_count_trigger_insert = """
+    CREATE TRIGGER IF NOT EXISTS entrycount_ai AFTER INSERT ON ChannelNode
+    BEGIN
+        INSERT INTO EntryCount(metadata_type, num_entries) VALUES (new.metadata_type, 1)
+        ON CONFLICT(metadata_type) DO UPDATE SET num_entries = num_entries + 1;
+    END;"""
+
+sql_add_entry_count_trigger_delete = """
+    CREATE TRIGGER IF NOT EXISTS entrycount_ad AFTER DELETE ON ChannelNode
+    BEGIN
+        UPDATE EntryCount SET num_entries = num_entries - 1 WHERE metadata_type = old.metadata_type;
+    END;"""
+
+sql_add_entry_count_trigger_update = """
+    CREATE TRIGGER IF NOT EXISTS entrycount_au AFTER UPDATE OF metadata_type ON ChannelNode
+    BEGIN
+        UPDATE EntryCount SET num_entries = num_entries - 1 WHERE metadata_type = old.metadata_type;
+        INSERT INTO EntryCount(metadata_type, num_entries) VALUES (new.metadata_type, 1)
+        ON CONFLICT(metadata_type) DO UPDATE SET num_entries = num_entries + 1;
+    END;"""
+
+sql_fill_entry_counts = """
+    INSERT OR REPLACE INTO EntryCount(metadata_type, num_entries)
+    SELECT metadata_type, count(*) FROM ChannelNode GROUP BY metadata_type;"""
+
+# The fresh and alive torrent swarms, ordered like the popular torrents, so that these are a single indexed read.
+# This table is maintained by SQL triggers on TorrentState: swarms that go stale are pruned on the next health write.
+# It should never be used from ORM directly.
+sql_create_popular_torrent_table = """
+    CREATE TABLE IF NOT EXISTS PopularTorrent (
+        torrentstate_rowid INTEGER NOT NULL PRIMARY KEY,
+        seeders INTEGER,
+        leechers INTEGER,
+        last_check INTEGER NOT NULL
+    );"""
+
+sql_create_index_popular_torrent_popularity = """
+    CREATE INDEX IF NOT EXISTS idx_populartorrent__popularity
+    ON PopularTorrent (seeders DESC, leechers DESC, last_check DESC);"""
+
+sql_create_index_popular_torrent_last_check = """
+    CREATE INDEX IF NOT EXISTS idx_populartorrent__last_check ON PopularTorrent (last_check);"""
+
+_sql_popular_since = f"CAST(strftime('%s', 'now') AS INTEGER) - {POPULAR_TORRENTS_FRESHNESS_PERIOD}"
+
+_sql_add_popular_torrent = f"""
+        DELETE FROM PopularTorrent WHERE torrentstate_rowid = new.rowid OR last_check < {_sql_popular_since};
+        INSERT INTO PopularTorrent(torrentstate_rowid, seeders, leechers, last_check)
+        SELECT new.rowid, new.seeders, new.leechers, new.last_check
+        WHERE new.last_check >= {_sql_popular_since} AND (new.seeders > 0 OR new.leechers > 0);"""  # noqa: S608
+
+sql_add_popular_torrent_trigger_insert = f"""
+    CREATE TRIGGER IF NOT EXISTS populartorrent_ai AFTER INSERT ON TorrentState
+    BEGIN{_sql_add_popular_torrent}
+    END;"""
+
+sql_add_popular_torrent_trigger_delete = """
+    CREATE TRIGGER IF NOT EXISTS populartorrent_ad AFTER DELETE ON TorrentState
+    BEGIN
+        DELETE FROM PopularTorrent WHERE torrentstate_rowid = old.rowid;
+    END;"""
+
+sql_add_popular_torrent_trigger_update = f"""
+    CREATE TRIGGER IF NOT EXISTS populartorrent_au AFTER UPDATE OF seeders, leechers, last_check ON TorrentState
+    BEGIN{_sql_add_popular_torrent}
+    END;"""
+
+sql_fill_popular_torrents = f"""
+    INSERT OR REPLACE INTO PopularTorrent(torrentstate_rowid, seeders, leechers, last_check)
+    SELECT rowid, seeders, leechers, last_check FROM TorrentState
+    WHERE last_check >= {_sql_popular_since} AND (seeders > 0 OR leechers > 0);"""  # noqa: S608
+
+# The (lowercase, unstemmed) words of all titles, with the number of entries that have them in their title.
+# The FtsIndex only knows stemmed terms, so this table is filled from the titles by ``refresh_completion_terms``.
+sql_create_completion_term_table = """
+    CREATE TABLE IF NOT EXISTS CompletionTerm (
+        term TEXT NOT NULL PRIMARY KEY,
+        num_entries INTEGER NOT NULL
+    ) WITHOUT ROWID;"""
+
 sql_add_torrentstate_trigger_after_insert = """
     CREATE TRIGGER IF NOT EXISTS torrentstate_ai AFTER INSERT ON TorrentState
     BEGIN
@@ -130,28 +729,54 @@ class MetadataStore:
     Storage of metadata for channels and torrents.
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913, PLR0915, PLR0917
             self,
             db_filename: str,
             private_key: PrivateKey,
             disable_sync: bool = False,
             notifier: Notifier | None = None,
             check_tables: bool = True,
-            db_version: int = CURRENT_DB_VERSION
+            db_version: int = CURRENT_DB_VERSION,
+            substring_search: bool = False
     ) -> None:
         """
         Create a new metadata store.
+
+        :param substring_search: whether to keep a trigram index of the titles, for substring searches.
         """
         self.notifier = notifier  # Reference to app-level notification service
+        self.substring_search = substring_search
         self.db_path = db_filename
         self.my_key = private_key
         self.my_public_key_bin = self.my_key.pub().key_to_bin()[10:]
         self._logger = logging.getLogger(self.__class__.__name__)
 
         self._shutting_down = False
+        self.last_write_time = 0.0
         self.batch_size = 10  # reasonable number, a little bit more than typically fits in a single UDP packet
         self.reference_timedelta = timedelta(milliseconds=100)
-        self.sleep_on_external_thread = 0.05  # sleep this amount of seconds between batches executed on external thread
+
+        # Threaded database access goes through a pool of readers and a single writer. Their threads are long-lived,
+        # so each thread keeps its own (Pony thread-local) connection open, instead of reconnecting for every call.
+        # In WAL mode, the readers never block the single writer and the writer never blocks the readers. Both serve
+        # their queued work in the order of its lane, so that (for example) ingestion never delays the user.
+        self._reader_state = threading.local()
+        self._read_executor = PriorityExecutor(READ_CONNECTIONS, "MetadataStoreRead",
+                                               initializer=self._init_reader_thread)
+        # Signatures of incoming payloads are verified up front, so that this does not happen inside write transactions.
+        self._verify_executor = ThreadPoolExecutor(max_workers=VERIFY_THREADS, thread_name_prefix="MetadataStoreVerify")
+
+        self.result_cache = ResultCache(RESULT_CACHE_SIZE)
+        # The infohashes of all torrent states and the (public_key, id_) keys of all entries, to skip lookups of
+        # keys that are definitely not in the database.
+        self.membership_filter = MembershipFilter(MEMBERSHIP_FILTER_MIN_CAPACITY)
+        self.signed_blob_cache = SignedBlobCache(SIGNED_BLOB_CACHE_SIZE)
+        # The (infohash, title) of the entries that were created by the transaction of the writer thread, to be
+        # announced in a single notification once it is committed.
+        self.created_torrents: list[tuple[bytes | None, str]] = []
+        # All writes go through the queue of the writer thread, which owns the only write connection.
+        self.write_queue = WriteQueue(MAX_WRITE_GROUP_SIZE, on_commit=self.on_write_commit,
+                                      thread_name="MetadataStoreWrite", on_rollback=self.on_write_rollback)
 
         # We have to dynamically define/init ORM-managed entities here to be able to support
         # multiple sessions in Tribler. ORM-managed classes are bound to the database instance
@@ -163,11 +788,17 @@ class MetadataStore:
         @self.db.on_connect
         def on_connect(_: Database, connection: Connection) -> None:
             cursor = connection.cursor()
-            cursor.execute("PRAGMA journal_mode = DELETE")
+            # Only takes effect for new databases: it allows ``incremental_vacuum`` to release free pages
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("PRAGMA journal_mode = WAL")
             cursor.execute("PRAGMA synchronous = NORMAL")
             cursor.execute("PRAGMA temp_store = MEMORY")
             cursor.execute("PRAGMA foreign_keys = ON")
 
+            # Connections of the reader threads are never allowed to change the database
+            if self.is_reader_thread():
+                cursor.execute("PRAGMA query_only = ON")
+
             # Disable disk sync for special cases
             if disable_sync:
                 # !!! ACHTUNG !!! This should be used only for special cases (e.g. DB upgrades), because
@@ -175,17 +806,16 @@ class MetadataStore:
                 cursor.execute("PRAGMA journal_mode = 0")
                 cursor.execute("PRAGMA synchronous = 0")
 
-            sqlite_rank = keep_exception(torrent_rank)
-            connection.create_function('search_rank', 5, sqlite_rank)
-
         self.MiscData = misc.define_binding(self.db)
 
         self.TrackerState = tracker_state.define_binding(self.db)
-        self.TorrentState = torrent_state_.define_binding(self.db)
+        self.TorrentState = torrent_state_.define_binding(self.db, get_membership_filter=self.get_membership_filter)
         self.TorrentMetadata = torrent_metadata.define_binding(
             self.db,
-            notifier=notifier,
-            tag_processor_version=0
+            notify_created=self.notify_created_torrents if notifier else None,
+            tag_processor_version=0,
+            get_membership_filter=self.get_membership_filter,
+            signed_blob_cache=self.signed_blob_cache
         )
 
         if db_filename == ":memory:":
@@ -205,10 +835,21 @@ class MetadataStore:
                 self.db.execute(sql_create_fts_table)
                 self.create_fts_triggers()
                 self.create_torrentstate_triggers()
+                self.create_torrent_tag_table()
+                self.create_entry_count_table()
+                self.create_popular_torrent_table()
+                self.create_completion_term_table()
 
         if create_db:
             with db_session:
                 self.MiscData(name="db_version", value=str(db_version))
+        else:
+            self.migrate_torrent_tags()
+            self.migrate_entry_counts()
+            self.migrate_popular_torrents()
+            self.migrate_completion_terms()
+        self.update_trigram_index()
+        self.fill_membership_filter()
 
     def set_value(self, key: str, value: str) -> None:
         """
@@ -275,6 +916,40 @@ class MetadataStore:
         cursor = self.db.get_connection().cursor()
         cursor.execute("insert into FtsIndex(rowid, title) select rowid, title from ChannelNode")
 
+    def create_trigram_fts_triggers(self) -> None:
+        """
+        Create the triggers of the trigram index.
+        """
+        cursor = self.db.get_connection().cursor()
+        cursor.execute(sql_add_trigram_fts_trigger_insert)
+        cursor.execute(sql_add_trigram_fts_trigger_delete)
+        cursor.execute(sql_add_trigram_fts_trigger_update)
+
+    def rebuild_fts_indexes(self) -> None:
+        """
+        Rebuild the full-text indexes from the titles of all entries.
+        """
+        rebuild_fts_indexes(self.db.get_connection().cursor())
+
+    def update_trigram_index(self) -> None:
+        """
+        Create and fill the trigram index if substring searches are enabled, or drop it if they are not.
+        """
+        with db_session(ddl=True):
+            cursor = self.db.get_connection().cursor()
+            exists = cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                    (TRIGRAM_INDEX,)).fetchone() is not None
+            if self.substring_search and not exists:
+                self._logger.info("Creating the trigram index for substring searches")
+                cursor.execute(sql_create_trigram_fts_table)
+                cursor.execute("INSERT INTO FtsTrigramIndex(FtsTrigramIndex) VALUES ('rebuild')")
+                self.create_trigram_fts_triggers()
+            elif not self.substring_search and exists:
+                self._logger.info("Dropping the trigram index, substring searches are disabled")
+                for trigger_name in ("fts_trigram_ai", "fts_trigram_ad", "fts_trigram_au"):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+                cursor.execute("DROP TABLE FtsTrigramIndex")
+
     def create_torrentstate_triggers(self) -> None:
         """
         Create the torrent state triggers.
@@ -283,39 +958,427 @@ class MetadataStore:
         cursor.execute(sql_add_torrentstate_trigger_after_insert)
         cursor.execute(sql_add_torrentstate_trigger_after_update)
 
+    def create_torrent_tag_table(self) -> None:
+        """
+        Create the normalized tag table, its index, and the triggers that keep it in sync with ChannelNode.tags.
+        """
+        cursor = self.db.get_connection().cursor()
+        cursor.execute(sql_create_torrent_tag_table)
+        cursor.execute(sql_create_index_torrent_tag_torrent_rowid)
+        cursor.execute(sql_add_torrent_tag_trigger_insert)
+        cursor.execute(sql_add_torrent_tag_trigger_delete)
+        cursor.execute(sql_add_torrent_tag_trigger_update)
+
+    def fill_torrent_tags(self) -> None:
+        """
+        Split the comma-separated tags of all existing entries into the normalized tag table.
+        """
+        cursor = self.db.get_connection().cursor()
+        cursor.execute(sql_fill_torrent_tags)
+
+    def migrate_torrent_tags(self) -> None:
+        """
+        One-shot migration for databases that were created before the normalized tag table existed.
+        """
+        with db_session:
+            db_version = int(self.get_value("db_version", "0"))
+        if db_version >= TORRENT_TAG_DB_VERSION:
+            return
+        self._logger.info("Migrating the tags of database version %d to the TorrentTag table", db_version)
+        with db_session(ddl=True):
+            self.create_torrent_tag_table()
+            self.fill_torrent_tags()
+            self.set_value("db_version", str(TORRENT_TAG_DB_VERSION))
+
+    def create_entry_count_table(self) -> None:
+        """
+        Create the table of entry counts (per metadata type) and the triggers that keep it up to date.
+        """
+        cursor = self.db.get_connection().cursor()
+        cursor.execute(sql_create_entry_count_table)
+        cursor.execute(sql_add_entry_count_trigger_insert)
+        cursor.execute(sql_add_entry_count_trigger_delete)
+        cursor.execute(sql_add_entry_count_trigger_update)
+
+    def migrate_entry_counts(self) -> None:
+        """
+        One-shot migration for databases that were created before the table of entry counts existed.
+        """
+        with db_session:
+            db_version = int(self.get_value("db_version", "0"))
+        if db_version >= ENTRY_COUNT_DB_VERSION:
+            return
+        self._logger.info("Counting the entries of database version %d into the EntryCount table", db_version)
+        with db_session(ddl=True):
+            self.create_entry_count_table()
+            self.db.get_connection().cursor().execute(sql_fill_entry_counts)
+            self.set_value("db_version", str(ENTRY_COUNT_DB_VERSION))
+
+    def create_popular_torrent_table(self) -> None:
+        """
+        Create the table of popular torrent swarms, its indices, and the triggers that keep it up to date.
+        """
+        cursor = self.db.get_connection().cursor()
+        cursor.execute(sql_create_popular_torrent_table)
+        cursor.execute(sql_create_index_popular_torrent_popularity)
+        cursor.execute(sql_create_index_popular_torrent_last_check)
+        cursor.execute(sql_add_popular_torrent_trigger_insert)
+        cursor.execute(sql_add_popular_torrent_trigger_delete)
+        cursor.execute(sql_add_popular_torrent_trigger_update)
+
+    def migrate_popular_torrents(self) -> None:
+        """
+        One-shot migration for databases that were created before the table of popular torrents existed.
+        """
+        with db_session:
+            db_version = int(self.get_value("db_version", "0"))
+        if db_version >= POPULAR_TORRENT_DB_VERSION:
+            return
+        self._logger.info("Filling the PopularTorrent table of database version %d", db_version)
+        with db_session(ddl=True):
+            self.create_popular_torrent_table()
+            self.db.get_connection().cursor().execute(sql_fill_popular_torrents)
+            self.set_value("db_version", str(POPULAR_TORRENT_DB_VERSION))
+
+    def create_completion_term_table(self) -> None:
+        """
+        Create the table of auto-completion terms.
+        """
+        self.db.get_connection().cursor().execute(sql_create_completion_term_table)
+
+    def refresh_completion_terms(self, limit: int = COMPLETION_TERM_BATCH_SIZE) -> int:
+        """
+        Add the title words of the entries that were inserted since the last refresh (at most ``limit`` of them) to the
+        auto-completion terms.
+
+        Deleted and renamed entries are not subtracted: the number of entries of a term only ranks the suggestions.
+
+        :return: The number of entries that were added.
+        """
+        last_rowid = int(self.get_value("completion_term_rowid", "0"))
+        cursor = self.db.get_connection().cursor()
+        entries = cursor.execute("SELECT rowid, title FROM ChannelNode WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                 (last_rowid, limit)).fetchall()
+        if not entries:
+            return 0
+        terms = Counter(term for _, title in entries
+                        for term in set(self.fts_keyword_search_re.findall((title or "").lower()))
+                        if len(term) >= COMPLETION_TERM_MIN_LENGTH)
+        cursor.executemany("""
+            INSERT INTO CompletionTerm(term, num_entries) VALUES (?, ?)
+            ON CONFLICT(term) DO UPDATE SET num_entries = num_entries + excluded.num_entries
+        """, terms.items())
+        self.set_value("completion_term_rowid", str(entries[-1][0]))
+        return len(entries)
+
+    def migrate_completion_terms(self) -> None:
+        """
+        One-shot migration for databases that were created before the table of auto-completion terms existed.
+        """
+        with db_session:
+            db_version = int(self.get_value("db_version", "0"))
+        if db_version >= COMPLETION_TERM_DB_VERSION:
+            return
+        self._logger.info("Collecting the auto-completion terms of database version %d", db_version)
+        with db_session(ddl=True):
+            self.create_completion_term_table()
+            while self.refresh_completion_terms():
+                pass
+            self.set_value("db_version", str(COMPLETION_TERM_DB_VERSION))
+
+    @db_session
+    def fill_membership_filter(self) -> None:
+        """
+        Rebuild the membership filter from the torrent states and entries in the database.
+
+        The new filter is filled on the side and then replaces the current filter, which other threads may be reading.
+        """
+        num_keys = self.db.select("SELECT (SELECT count(*) FROM TorrentState) + (SELECT count(*) FROM ChannelNode)")[0]
+        membership_filter = MembershipFilter(max(MEMBERSHIP_FILTER_MIN_CAPACITY, 2 * num_keys))
+        cursor = self.db.get_connection().cursor()
+        membership_filter.update(infohash for infohash, in cursor.execute("SELECT infohash FROM TorrentState"))
+        membership_filter.update(entry_key(public_key, id_)
+                                 for public_key, id_ in cursor.execute("SELECT public_key, id_ FROM ChannelNode"))
+        self.membership_filter = membership_filter
+
+    def get_membership_filter(self) -> MembershipFilter:
+        """
+        Get the current membership filter.
+        """
+        return self.membership_filter
+
+    def get_membership_filter_stats(self) -> dict[str, float]:
+        """
+        Get the statistics of the membership filter.
+        """
+        return self.membership_filter.get_stats()
+
+    def analyze(self, limit: int) -> None:
+        """
+        Update the statistics of the query planner, based on (about) ``limit`` rows of every index.
+        """
+        cursor = self.db.get_connection().cursor()
+        cursor.execute(f"PRAGMA analysis_limit = {int(limit)}")
+        cursor.execute("ANALYZE")
+
+    def merge_fts_index(self, pages: int) -> bool:
+        """
+        Merge (about) ``pages`` pages of the segments of every full-text index into larger segments.
+
+        :return: whether there are segments left to merge.
+        """
+        cursor = self.db.get_connection().cursor()
+        merging = False
+        for index in [WORD_INDEX, TRIGRAM_INDEX] if self.substring_search else [WORD_INDEX]:
+            cursor.execute(f"INSERT INTO {index}({index}, rank) VALUES ('merge', ?)", (pages,))  # noqa: S608
+            # FTS5 reports less than two changes if there was nothing (left) to merge.
+            merging |= cursor.rowcount >= 2
+        return merging
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """
+        Release (up to) ``pages`` free pages of the database file. This requires incremental auto-vacuum, which can
+        only be enabled when the database is created.
+
+        :return: the number of free pages that are left to release.
+        """
+        cursor = self.db.get_connection().cursor()
+        if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:  # 2 is INCREMENTAL
+            return 0
+        cursor.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+        return cursor.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def get_snapshot_batches(self, batch_size: int) -> Iterator[tuple[list[bytes], list[tuple[int, int, int]]]]:
+        """
+        Get the signed blobs of all torrents and their (seeders, leechers, last_check), in batches, in row id order.
+
+        The blobs are built straight from the rows, without ORM objects. This has to be iterated in a ``db_session``.
+        """
+        cursor = self.db.get_connection().cursor()
+        cursor.execute("""
+            SELECT cn.reserved_flags, cn.public_key, cn.id_, cn.origin_id, cn.timestamp, cn.infohash, cn.size,
+                   CAST(strftime('%s', cn.torrent_date) AS INTEGER), cn.title, cn.tags, cn.tracker_info, cn.signature,
+                   coalesce(ts.seeders, 0), coalesce(ts.leechers, 0), coalesce(ts.last_check, 0)
+            FROM ChannelNode cn LEFT JOIN TorrentState ts ON cn.health = ts.rowid
+            WHERE cn.metadata_type = ?
+            ORDER BY cn.rowid
+        """, (REGULAR_TORRENT,))
+        while rows := cursor.fetchmany(batch_size):
+            blobs = []
+            for row in rows:
+                # Free-for-all entries are stored without a public key and signature.
+                payload = TorrentMetadataPayload(REGULAR_TORRENT, row[0], row[1] or NULL_KEY, *row[2:7], row[7] or 0,
+                                                 row[8] or "", row[9] or "", row[10] or "")
+                blobs.append(payload.serialized() + (row[11] or NULL_SIG))
+            yield blobs, [row[12:] for row in rows]
+
+    def import_snapshot_batches(self, batches: Iterable[tuple[list[TorrentMetadataPayload],
+                                                              dict[bytes, tuple[int, int, int]]]]) -> int:
+        """
+        Insert the given batches of (verified) payloads and the (seeders, leechers, last_check) of their infohashes.
+
+        Everything is imported in a single transaction, with the triggers of the full-text indexes disabled: the
+        indexes are rebuilt once, at the end. Known entries are skipped, known torrent states get the imported health
+        if it is more recent. The call manages its own transaction, so it should be submitted as an exclusive write.
+
+        :return: the number of entries that were added.
+        """
+        imported = 0
+        with db_session(ddl=True):
+            cursor = self.db.get_connection().cursor()
+            self.drop_fts_triggers()
+            for payloads, health in batches:
+                _, _, new_entries = self._insert_new_payloads(cursor, payloads)
+                imported += len(new_entries)
+                cursor.executemany("""
+                    UPDATE TorrentState SET seeders = ?, leechers = ?, last_check = ?
+                    WHERE infohash = ? AND last_check < ?
+                """, [(seeders, leechers, last_check, infohash, last_check)
+                      for infohash, (seeders, leechers, last_check) in health.items() if last_check])
+            self.rebuild_fts_indexes()
+            self.create_fts_triggers()
+            if self.substring_search:
+                self.create_trigram_fts_triggers()
+            self.refresh_completion_terms()
+        self.bump_write_generation()
+        return imported
+
+    @db_session
+    def get_db_used_size(self) -> int:
+        """
+        Get the number of bytes of the database file that are in use, i.e., not counting free pages.
+        """
+        cursor = self.db.get_connection().cursor()
+        page_size, = cursor.execute("PRAGMA page_size").fetchone()
+        page_count, = cursor.execute("PRAGMA page_count").fetchone()
+        free_pages, = cursor.execute("PRAGMA freelist_count").fetchone()
+        return (page_count - free_pages) * page_size
+
+    def evict_entries(self, count: int, protected_infohashes: Collection[bytes] = ()) -> int:
+        """
+        Delete (up to) ``count`` of the least valuable free-for-all entries, with their torrent states and trackers if
+        nothing else refers to these. Entries that were never checked go first, then those without seeders, the
+        oldest (lowest row id) first.
+
+        Signed entries are never evicted. The membership filter keeps the keys of evicted entries, as false positives.
+
+        :param protected_infohashes: the infohashes of the entries to keep (e.g., of our downloads).
+        :return: the number of deleted entries.
+        """
+        with db_session(immediate=True):
+            # Make pending ORM changes visible to the raw SQL below.
+            self.db.flush()
+            cursor = self.db.get_connection().cursor()
+            evicted: dict[int, int | None] = {}
+            for tier in EVICTION_TIERS:
+                # The unary + keeps SQLite from using the public key index: scanning in row id order needs no sorting.
+                rows = cursor.execute(f"""
+                    SELECT cn.rowid, cn.infohash, cn.health
+                    FROM ChannelNode cn LEFT JOIN TorrentState ts ON cn.health = ts.rowid
+                    WHERE +cn.public_key = x'' AND cn.metadata_type = ? AND {tier}
+                    ORDER BY cn.rowid LIMIT ?
+                """, (REGULAR_TORRENT, count + len(evicted) + len(protected_infohashes))).fetchall()  # noqa: S608
+                for rowid, infohash, health in rows:
+                    if len(evicted) < count and infohash not in protected_infohashes:
+                        evicted[rowid] = health
+                if len(evicted) == count:
+                    break
+            if not evicted:
+                return 0
+
+            states = {health for health in evicted.values() if health is not None}
+            trackers = set(self._select_in(cursor, "SELECT trackerstate, torrentstate FROM TorrentState_TrackerState "
+                                                   "WHERE torrentstate IN ({})", states))
+            cursor.executemany("DELETE FROM ChannelNode WHERE rowid = ?", [(rowid,) for rowid in evicted])
+            cursor.executemany("""
+                DELETE FROM TorrentState WHERE rowid = ? AND NOT EXISTS (SELECT 1 FROM ChannelNode WHERE health = ?)
+            """, [(state, state) for state in states])
+            cursor.executemany("""
+                DELETE FROM TrackerState
+                WHERE rowid = ? AND NOT EXISTS (SELECT 1 FROM TorrentState_TrackerState WHERE trackerstate = ?)
+            """, [(tracker, tracker) for tracker in trackers])
+        for rowid in evicted:
+            self.signed_blob_cache.discard(rowid)
+        self.bump_write_generation()
+        return len(evicted)
+
+    def checkpoint_wal(self) -> tuple[int, int] | None:
+        """
+        Copy the committed transactions of the write-ahead log into the database file, without waiting for readers or
+        writers. A checkpoint cannot run inside a transaction, so it uses a connection of its own.
+
+        :return: the number of pages in the log and the number of these that were copied, or None for memory dbs.
+        """
+        if self.db_path == ":memory:":
+            return None
+        connection = sqlite3.connect(self.db_path)
+        try:
+            _, log_pages, checkpointed_pages = connection.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        finally:
+            connection.close()
+        return log_pages, checkpointed_pages
+
     def shutdown(self) -> None:
         """
         Disconnect the connection to the database.
         """
         self._shutting_down = True
+        # The pooled connections are thread-local: they are closed when the executor threads exit.
+        self._read_executor.shutdown(cancel_futures=True)
+        self.write_queue.shutdown()
+        self._verify_executor.shutdown(wait=True, cancel_futures=True)
         self.db.disconnect()
 
+    def _init_reader_thread(self) -> None:
+        """
+        Mark the current thread as a reader thread, before it opens its database connection.
+        """
+        self._reader_state.read_only = True
+
+    def is_reader_thread(self) -> bool:
+        """
+        Check if the current thread belongs to the pool of read-only connections.
+        """
+        return getattr(self._reader_state, "read_only", False)
+
+    def submit_write(self, func: Callable, *args: Any, **kwargs) -> Future:  # noqa: ANN401
+        """
+        Queue ``func`` for execution on the writer thread, without waiting for it.
+
+        The call may share its transaction with other queued writes, so it should not commit or start its own.
+
+        :param func: the function to be executed threaded
+        :param args: args for the function call
+        :param kwargs: kwargs for the function call
+        :return: the future of the result of the func call, which resolves after it is committed.
+        """
+        return self.submit_write_in_lane(Lane.INTERACTIVE, func, *args, **kwargs)
+
+    def submit_write_in_lane(self, lane: Lane, func: Callable, *args: Any, **kwargs) -> Future:  # noqa: ANN401
+        """
+        Queue ``func`` for execution on the writer thread, in the given lane, without waiting for it.
+
+        :return: the future of the result of the func call, which resolves after it is committed.
+        """
+        return self.write_queue.submit(WriteCommand(func, args, kwargs, lane=lane))
+
+    def submit_exclusive_write_in_lane(self, lane: Lane, func: Callable, *args: Any, **kwargs) -> Future:  # noqa: ANN401
+        """
+        Queue ``func`` for execution on the writer thread, in the given lane, outside any transaction of the writer.
+
+        The call manages its own transactions. No other write is executed (or able to time out on the write lock of
+        the database) until it returns.
+
+        :return: the future of the result of the func call.
+        """
+        return self.write_queue.submit(WriteCommand(func, args, kwargs, exclusive=True, lane=lane))
+
     async def run_threaded(self, func: Callable, *args: Any, **kwargs) -> Any:  # noqa: ANN401
         """
-        Run ``func`` threaded and close DB connection at the end of the execution.
+        Run ``func`` on the writer thread, which owns the (long-lived) write connection.
 
         :param func: the function to be executed threaded
         :param args: args for the function call
         :param kwargs: kwargs for the function call
         :return: a result of the func call.
         """
+        return await wrap_future(self.submit_write(func, *args, **kwargs))
 
-        def wrapper():  # noqa: ANN202
-            try:
-                return func(*args, **kwargs)
-            finally:
-                is_main_thread = threading.current_thread() is threading.main_thread()
-                if not is_main_thread:
-                    self.db.disconnect()
+    async def run_threaded_read(self, func: Callable, *args: Any, **kwargs) -> Any:  # noqa: ANN401
+        """
+        Run ``func`` on one of the reader threads, using one of the pooled read-only connections.
 
-        return await get_running_loop().run_in_executor(None, wrapper)
+        The given function is not allowed to write to the database: SQLite refuses writes on these connections.
+
+        :param func: the function to be executed threaded
+        :param args: args for the function call
+        :param kwargs: kwargs for the function call
+        :return: a result of the func call.
+        """
+        return await self.run_read_in_lane(Lane.INTERACTIVE, func, *args, **kwargs)
+
+    async def run_read_in_lane(self, lane: Lane, func: Callable, *args: Any, **kwargs) -> Any:  # noqa: ANN401
+        """
+        Run ``func`` on one of the reader threads, in the given lane.
+
+        :return: a result of the func call.
+        """
+        return await wrap_future(self._read_executor.submit(lane, func, *args, **kwargs))
+
+    def get_executor_stats(self) -> dict[str, dict[str, dict[str, float]]]:
+        """
+        Get the queue depth and the wait times per lane, of the reader threads and of the writer thread.
+        """
+        return {"read": self._read_executor.stats.get_stats(), "write": self.write_queue.stats.get_stats()}
 
     async def process_compressed_mdblob_threaded(self, compressed_data: bytes, **kwargs) -> list[ProcessingResult]:
         """
         Decompress the given data in a thread and return a list of uncompressed results.
         """
         try:
-            return await self.run_threaded(self.process_compressed_mdblob, compressed_data, **kwargs)
+            # Processing a blob commits in batches of its own, so it is not grouped with other writes.
+            return await wrap_future(self.submit_exclusive_write_in_lane(Lane.INGESTION, self.process_compressed_mdblob,
+                                                                         compressed_data, **kwargs))
         except Exception as e:
             self._logger.exception("DB transaction error when tried to process compressed mdblob: %s: %s",
                                    e.__class__.__name__, str(e), exc_info=e)
@@ -349,6 +1412,8 @@ class MetadataStore:
         """
         Adds or updates information about a torrent health for the torrent with the specified infohash value.
 
+        This does not invalidate the cached ``get_simple_entries`` results: the commit of the write transaction does.
+
         :param health: a health info of a torrent
         :return: True if a new TorrentState object was added
         """
@@ -356,7 +1421,8 @@ class MetadataStore:
             self._logger.warning("Invalid health info ignored: %s", str(health))
             return False
 
-        torrent_state = self.TorrentState.get_for_update(infohash=health.infohash)
+        torrent_state = (self.TorrentState.get_for_update(infohash=health.infohash)
+                         if health.infohash in self.membership_filter else None)
 
         if torrent_state and health.should_replace(torrent_state.to_health()):
             self._logger.debug("Update health info %s", str(health))
@@ -371,7 +1437,7 @@ class MetadataStore:
 
         return False
 
-    def process_squashed_mdblob(self, chunk_data: bytes, external_thread: bool = False,  # noqa: C901
+    def process_squashed_mdblob(self, chunk_data: bytes,
                                 health_info: list[tuple[int, int, int]] | None = None,
                                 skip_personal_metadata_payload: bool = True) -> list[ProcessingResult]:
         """
@@ -380,22 +1446,19 @@ class MetadataStore:
         batch processing time value of self.reference_timedelta.
 
         :param chunk_data: the blob itself, consists of one or more GigaChannel payloads concatenated together
-        :param external_thread: if this is set to True, we add some sleep between batches to allow other threads
-            to get the database lock. This is an ugly workaround for Python and asynchronous programming (locking)
-            imperfections. It only makes sense to use it when this routine runs on a non-reactor thread.
         :return: a list of tuples of (<metadata or payload>, <action type>)
         """
-        offset = 0
-        payload_list = []
-        while offset < len(chunk_data):
-            payload, offset = read_payload_with_offset(chunk_data, offset)
-            if payload and isinstance(payload, TorrentMetadataPayload):
-                # Silently ignore deprecated payloads
-                payload_list.append(payload)
-
-        if health_info and len(health_info) == len(payload_list):
+        # Deprecated payloads are silently ignored. Torrents with a bad signature are dropped before any write
+        # transaction is started.
+        payload_batch = decode_payload_batch(chunk_data)
+        valid_indices = self.get_valid_payload_indices(payload_batch)
+        payload_list = [payload_batch.get_payload(i) for i in valid_indices]
+
+        # The health records belong to the payloads of the blob, so they are filtered along with these payloads.
+        if health_info and len(health_info) == len(payload_batch):
+            valid_health = [health_info[i] for i in valid_indices]
             with db_session:
-                for payload, (seeders, leechers, last_check) in zip(payload_list, health_info, strict=False):
+                for payload, (seeders, leechers, last_check) in zip(payload_list, valid_health, strict=True):
                     if hasattr(payload, "infohash"):
                         health = HealthInfo(payload.infohash, last_check=last_check,
                                             seeders=seeders, leechers=leechers)
@@ -411,8 +1474,10 @@ class MetadataStore:
 
             # We separate the sessions to minimize database locking.
             with db_session(immediate=True):
-                for payload in batch:
-                    result.extend(self.process_payload(payload, skip_personal_metadata_payload))
+                result.extend(self.process_payloads(batch, skip_personal_metadata_payload, verified=True))
+                self.refresh_completion_terms()
+            # The batch is committed on its own, so its new entries are announced now, even if a later batch fails.
+            self.on_write_commit()
 
             # Batch size adjustment
             batch_end_time = datetime.now() - batch_start_time  # noqa: DTZ005
@@ -436,9 +1501,6 @@ class MetadataStore:
             if self._shutting_down:
                 break
 
-            if external_thread:
-                sleep(self.sleep_on_external_thread)
-
         return result
 
     @db_session
@@ -465,7 +1527,8 @@ class MetadataStore:
             return [ProcessingResult(md_obj=node, obj_state=ObjState.NEW_OBJECT)] if node else []
 
         # Do we already know about this object? In that case, we keep the first one (i.e., no versioning).
-        node = self.TorrentMetadata.get_for_update(public_key=payload.public_key, id_=payload.id_)
+        node = (self.TorrentMetadata.get_for_update(public_key=payload.public_key, id_=payload.id_)
+                if entry_key(payload.public_key, payload.id_) in self.membership_filter else None)
         if node:
             return [ProcessingResult(md_obj=node, obj_state=ObjState.DUPLICATE_OBJECT)]
 
@@ -473,261 +1536,516 @@ class MetadataStore:
         obj = self.TorrentMetadata.from_payload(payload)
         return [ProcessingResult(md_obj=obj, obj_state=ObjState.NEW_OBJECT)]
 
-    @db_session
-    def get_num_torrents(self) -> int:
+    def verify_payloads(self, payloads: list[TorrentMetadataPayload]) -> list[TorrentMetadataPayload]:
         """
-        Get the number of torrents in the database.
+        Remove the payloads with a bad signature. The signatures are checked in parallel, in slices of the list.
+
+        :param payloads: the payloads to verify.
+        :return: the payloads that have no signature or a valid signature, in their original order.
         """
-        return orm.count(self.TorrentMetadata.select(lambda g: g.metadata_type == REGULAR_TORRENT))
+        def check(payloads_slice: Sequence[TorrentMetadataPayload]) -> list[bool]:
+            return [not payload.has_signature() or payload.check_signature() for payload in payloads_slice]
+
+        return [payload for payload, valid in zip(payloads, self._check_in_parallel(check, payloads), strict=False)
+                if valid]
 
-    def search_keyword(self, query: str, origin_id: int | None = None) -> Query:
+    def verify_payload_batch(self, batch: PayloadBatch) -> list[TorrentMetadataPayload]:
         """
-        Search for an FTS query, potentially restricted to a given origin id.
+        Create the payloads of the given batch that have no signature or a valid signature, in their original order.
 
-        Requires FTS5 table "FtsIndex" to be generated and populated. FTS table is maintained automatically by SQL
-        triggers. BM25 ranking is embedded in FTS5.
+        Unlike ``verify_payloads``, the signatures are checked against the payloads as they were received, instead of
+        against their reserialization.
         """
-        # Sanitize FTS query
-        if not query or query == "*":
-            return []
+        return [batch.get_payload(i) for i in self.get_valid_payload_indices(batch)]
 
-        if origin_id is not None:
-            # When filtering a specific channel folder, we want to return all matching results
-            fts_ids = raw_sql("""
-                SELECT rowid FROM ChannelNode
-                WHERE origin_id = $origin_id
-                  AND rowid IN (SELECT rowid FROM FtsIndex WHERE FtsIndex MATCH $query)
-            """)
-        else:
-            # When searching through an entire database for some text queries, the database can contain hundreds
-            # of thousands of matching torrents. The ranking of this number of torrents may be very expensive: we need
-            # to retrieve each matching torrent info and the torrent state from the database for proper ordering.
-            # They are scattered randomly through the entire database file, so fetching all these torrents is slow.
-            # Also, the torrent_rank function used inside the final ORDER BY section is written in Python. It is about
-            # 30 times slower than a possible similar function written in C due to SQLite-Python communication cost.
-            #
-            # To speed up the query, we limit and filter search results in several iterations, and each time apply
-            # a more expensive ranking algorithm:
-            #   * First, we quickly fetch at most 10000 of the most recent torrents that match the search criteria
-            #     and ignore older torrents. This way, we avoid sorting all hundreds of thousands of matching torrents
-            #     in degenerative cases. In typical cases, when the text query is specific enough, the number of
-            #     matching torrents is not that big.
-            #   * Then, we sort these 10000 torrents to prioritize torrents with seeders and restrict the number
-            #     of torrents to just 1000.
-            #   * Finally, in the main query, we apply a slow ranking function to these 1000 torrents to show the most
-            #     relevant torrents at the top of the search result list.
-            #
-            # This multistep sort+limit sequence allows speedup queries up to two orders of magnitude. To further
-            # speed up full-text search queries, we can rewrite the torrent_rank function to C one day.
-            fts_ids = raw_sql("""
-                SELECT fts.rowid
-                FROM (
-                    SELECT rowid FROM FtsIndex WHERE FtsIndex MATCH $query ORDER BY rowid DESC LIMIT 10000
-                ) fts
-                LEFT JOIN ChannelNode cn on fts.rowid = cn.rowid
-                LEFT JOIN main.TorrentState ts on cn.health = ts.rowid
-                ORDER BY coalesce(ts.seeders, 0) DESC, fts.rowid DESC
-                LIMIT 1000
-            """)
-        return left_join(g for g in self.TorrentMetadata if g.rowid in fts_ids)
+    def get_valid_payload_indices(self, batch: PayloadBatch) -> list[int]:
+        """
+        Get the indices of the payloads of the given batch that have no signature or a valid signature, in order.
+        """
+        def check(indices: Sequence[int]) -> list[bool]:
+            return [not batch.has_signature(i) or batch.check_signature(i) for i in indices]
+
+        indices = range(len(batch))
+        return [i for i, valid in zip(indices, self._check_in_parallel(check, indices), strict=False) if valid]
+
+    def _check_in_parallel(self, check: Callable[[Sequence], list[bool]], items: Sequence) -> Iterable[bool]:
+        """
+        Apply the given check to slices of the given items, in parallel, and get the verdicts in order.
+        """
+        slice_size = max(1, ceil(len(items) / VERIFY_THREADS))
+        slices = [items[i:i + slice_size] for i in range(0, len(items), slice_size)]
+        return chain.from_iterable(self._verify_executor.map(check, slices)) if len(slices) > 1 else check(items)
 
     @db_session
-    def get_entries_query(  # noqa: C901, PLR0912, PLR0913
-            self,
-            metadata_type: int | None = None,
-            channel_pk: bytes | None = None,
-            hide_xxx: bool = False,
-            origin_id: int | None = None,
-            sort_by: str | None = None,
-            sort_desc: bool = True,
-            max_rowid: int | None = None,
-            txt_filter: str | None = None,
-            category: str | None = None,
-            infohash: bytes | None =None,
-            infohash_set: set[bytes] | None = None,
-            id_: int | None = None,
-            self_checked_torrent: bool | None = None,
-            health_checked_after: int | None = None,
-            popular: bool | None = None,
-            tags: list[str] | None = None,
-            **kwargs
-    ) -> Query:
-        """
-        This method implements REST-friendly way to get entries from the database.
-
-        Warning! For Pony magic to work, iteration variable name (e.g. 'g') should be the same everywhere!
-
-        :return: PonyORM query object corresponding to the given params.
-        """
-        if kwargs:
-            self._logger.info("get_entries_query got ignored kwargs: %s", ", ".join(kwargs.keys()))
-
-        if txt_filter:
-            pony_query = self.search_keyword(txt_filter, origin_id=origin_id)
-        elif popular:
-            if metadata_type != REGULAR_TORRENT:
-                msg = "With `popular=True`, only `metadata_type=REGULAR_TORRENT` is allowed"
-                raise TypeError(msg)
-
-            t = time() - POPULAR_TORRENTS_FRESHNESS_PERIOD  # noqa: F841 (this is used in the following query)
-            return self.TorrentMetadata.select_by_sql("""
-                           SELECT ChannelNode.* FROM
-                             (SELECT * FROM TorrentState
-                              WHERE TorrentState.has_data == 1
-                                AND TorrentState.last_check >= $t
-                                AND (TorrentState.seeders > 0 OR TorrentState.leechers > 0)
-                              ORDER BY TorrentState.seeders DESC, TorrentState.leechers DESC, TorrentState.last_check DESC
-                              LIMIT $POPULAR_TORRENTS_COUNT) results
-                           LEFT JOIN
-                             ChannelNode WHERE ChannelNode.health == results.rowid
-                           GROUP BY ChannelNode.infohash
-                           ;
-                           """)
-        else:
-            pony_query = left_join(g for g in self.TorrentMetadata)
+    def process_payloads(self, payloads: list[TorrentMetadataPayload],
+                         skip_personal_metadata_payload: bool = True,
+                         verified: bool = False) -> list[ProcessingResult]:
+        """
+        Write a batch of payloads to our database (if necessary). This is the bulk equivalent of ``process_payload``.
 
-        infohash_set = infohash_set or ({infohash} if infohash else None)
+        Instead of a handful of ORM round trips per payload, the known entries, torrent states, and trackers of the
+        whole batch are resolved with one query per table and the new rows are inserted with ``executemany``.
 
-        if max_rowid is not None:
-            pony_query = pony_query.where(lambda g: g.rowid <= max_rowid)
+        :param verified: whether the payloads already passed ``verify_payloads`` (i.e., their signatures are valid).
+        """
+        accepted = [payload for payload in payloads
+                    if not (skip_personal_metadata_payload and payload.public_key == self.my_public_key_bin)
+                    and payload.metadata_type == REGULAR_TORRENT]
+        if not verified:
+            accepted = self.verify_payloads(accepted)
+        if not accepted:
+            return []
 
-        if metadata_type is not None:
-            pony_query = pony_query.where(lambda g: g.metadata_type == metadata_type)
+        # Raw SQL writes bypass the ORM session cache. If we are called from an enclosing session that already loaded
+        # objects (that may reference the entries we would add), we stay on the ORM path to keep its cache consistent.
+        if self.db._get_cache().objects:  # noqa: SLF001
+            return [result for payload in accepted for result in self.process_payload(payload, False)]
 
-        pony_query = (
-            pony_query.where(public_key=(b"" if channel_pk == NULL_KEY_SUBST else channel_pk))
-            if channel_pk is not None
-            else pony_query
-        )
+        # Make pending ORM changes visible to the raw SQL below.
+        self.db.flush()
+        cursor = self.db.get_connection().cursor()
 
-        # origin_id can be zero, for e.g. root channel
-        pony_query = pony_query.where(id_=id_) if id_ is not None else pony_query
-        pony_query = pony_query.where(origin_id=origin_id) if origin_id is not None else pony_query
-        # SQL can do substring matching easily, but not string splitting.
-        pony_query = (pony_query.where(lambda g: g.tags.endswith(category) or (category + ",") in g.tags)
-                      if category else pony_query)
-        # Checking for "all" tags can't be mapped to a single SQL statement, so we loop multiple WHERE clauses.
-        for tag in (tags or []):
-            # Normally B023 is very dangerous. However, this lambda is not actually used, but remapped to SQL instead.
-            pony_query = (pony_query.where(lambda g: (g.tags.endswith(tag)) or (tag + "," in g.tags))  # noqa: B023
-                          if tags else pony_query)
-        pony_query = pony_query.where(lambda g: g.xxx == 0) if hide_xxx else pony_query
-        pony_query = pony_query.where(lambda g: g.infohash in infohash_set) if infohash_set else pony_query
-        pony_query = (
-            pony_query.where(lambda g: g.health.self_checked == self_checked_torrent)
-            if self_checked_torrent is not None
-            else pony_query
-        )
+        planned, known_rowids, new_entries = self._insert_new_payloads(cursor, accepted)
+        if new_entries:
+            known_rowids.update(self._select_channel_node_rowids(cursor, set(new_entries)))
+            if self.notifier:
+                self.notify_created_torrents([(payload.infohash, payload.title) for payload in new_entries.values()])
 
-        if health_checked_after is not None:
-            pony_query = pony_query.where(lambda g: g.health.has_data == 1  # Has to be written this way for index
-                                          and g.health.last_check >= health_checked_after)
+        rowids = [known_rowids[key] for key, _ in planned]
+        objects = {obj.rowid: obj for obj in self.TorrentMetadata.select(lambda g: g.rowid in rowids)} if rowids else {}
+        return [ProcessingResult(md_obj=objects[known_rowids[key]], obj_state=obj_state) for key, obj_state in planned]
 
-        # Sort the query
-        pony_query = pony_query.sort_by("desc(g.rowid)" if sort_desc else "g.rowid")
+    def _insert_new_payloads(self, cursor: Cursor, accepted: list[TorrentMetadataPayload]
+                             ) -> tuple[list[tuple[tuple[bytes, int], ObjState]], dict, dict]:
+        """
+        Plan the given payloads (see ``_plan_payloads``) and insert the new ones.
 
-        if sort_by == "HEALTH":
-            pony_query = pony_query.sort_by(
-                "(desc(g.health.seeders), desc(g.health.leechers))"
-                if sort_desc
-                else "(g.health.seeders, g.health.leechers)"
-            )
-        elif sort_by == "size":
-            # Remark: this can be optimized to skip cases where size field does not matter
-            # When querying for mixed channels / torrents lists, channels should have priority over torrents
-            sort_expression = "desc(g.size)" if sort_desc else "g.size"
-            pony_query = pony_query.sort_by(sort_expression)
-        elif sort_by:
-            sort_expression = raw_sql(f"g.{sort_by} COLLATE NOCASE" + (" DESC" if sort_desc else ""))
-            pony_query = pony_query.sort_by(sort_expression)
-
-        if sort_by is None and txt_filter:
-            """
-            The following call of `sort_by` produces an ORDER BY expression that looks like this:
-
-            ORDER BY
-                case when "g"."metadata_type" = $CHANNEL_TORRENT then 1
-                     when "g"."metadata_type" = $COLLECTION_NODE then 2
-                     else 3 end,
-
-                search_rank(
-                    $QUERY_STRING,
-                    g.title,
-                    torrentstate.seeders,
-                    torrentstate.leechers,
-                    $CURRENT_TIME - strftime('%s', g.torrent_date)
-                ) DESC,
-
-                "torrentstate"."last_check" DESC,
-
-            So, the channel torrents and channel folders are always on top if they are not filtered out.
-            Then regular torrents are selected in order of their relevance according to a search_rank() result.
-            If two torrents have the same search rank, they are ordered by the last time they were checked.
-
-            The search_rank() function is called directly from the SQLite query, but is implemented in Python,
-            it is actually the torrent_rank() function from core/utilities/search_utils.py, wrapped with
-            keep_exception() to return possible exception from SQLite to Python.
-
-            The search_rank() function receives the following arguments:
-              - the current query string (like "Big Buck Bunny");
-              - the title of the current torrent;
-              - the number of seeders;
-              - the number of leechers;
-              - the number of seconds since the torrent's creation time.
-            """
-
-            pony_query = pony_query.sort_by(
-                f"""
-                (1 if g.metadata_type == {CHANNEL_TORRENT} else 2 if g.metadata_type == {COLLECTION_NODE} else 3),
-                raw_sql('''search_rank(
-                    $txt_filter, g.title, torrentstate.seeders, torrentstate.leechers,
-                    $int(time()) - strftime('%s', g.torrent_date)
-                ) DESC'''),
-                desc(g.health.last_check)  # just to trigger the TorrentState table inclusion into the left join
-            """
-            )
+        A key that is absent from the membership filter is only assumed to be unknown. If the filter missed rows (for
+        instance, rows that another connection wrote), inserting them again violates the unique constraints. Then the
+        insertion is rolled back and retried with lookups of all keys, instead of failing the batch.
+        """
+        cursor.execute("SAVEPOINT insert_payloads")
+        try:
+            planned, known_rowids, new_entries = self._plan_payloads(cursor, accepted)
+            if new_entries:
+                self._insert_payloads(cursor, new_entries)
+        except sqlite3.IntegrityError as e:
+            self._logger.warning("The membership filter missed known entries (%s), looking up all keys", str(e))
+            cursor.execute("ROLLBACK TO insert_payloads")
+            planned, known_rowids, new_entries = self._plan_payloads(cursor, accepted, use_filter=False)
+            if new_entries:
+                self._insert_payloads(cursor, new_entries, use_filter=False)
+        cursor.execute("RELEASE insert_payloads")
+        return planned, known_rowids, new_entries
+
+    def _plan_payloads(self, cursor: Cursor, accepted: list[TorrentMetadataPayload], use_filter: bool = True
+                       ) -> tuple[list[tuple[tuple[bytes, int], ObjState]], dict, dict]:
+        """
+        Decide what to do with each of the given payloads, in order, as if they were processed one by one.
+
+        :param use_filter: whether to skip the lookups of the keys that are absent from the membership filter.
 
-        return pony_query
+        :return: the key and state of every payload that is new or a known signed entry, the row ids of the known
+                 keys, and the payloads to insert by their key.
+        """
+        # Free-for-all (unsigned) entries are stored without a public key and with an id_ derived from the infohash.
+        is_ffa = [payload.public_key == NULL_KEY for payload in accepted]
+        keys = [(b"", infohash_to_id(payload.infohash)) if ffa else (payload.public_key, payload.id_)
+                for payload, ffa in zip(accepted, is_ffa, strict=True)]
+        # Only the keys that may be in the database are looked up.
+        known_rowids = self._select_channel_node_rowids(cursor, {key for key in keys if not use_filter
+                                                                 or entry_key(*key) in self.membership_filter})
+        # An unsigned entry is also refused if its infohash is already known.
+        known_infohashes = set(self._select_in(cursor, "SELECT infohash, rowid FROM ChannelNode WHERE infohash IN ({})",
+                                               {payload.infohash for payload, ffa in zip(accepted, is_ffa, strict=True)
+                                                if ffa and (not use_filter or payload.infohash in self.membership_filter)}))
+        if not use_filter:
+            self.membership_filter.update(entry_key(*key) for key in known_rowids)
+            self.membership_filter.update(known_infohashes)
+
+        planned: list[tuple[tuple[bytes, int], ObjState]] = []
+        new_entries: dict[tuple[bytes, int], TorrentMetadataPayload] = {}
+        for payload, ffa, key in zip(accepted, is_ffa, keys, strict=True):
+            if key in known_rowids or key in new_entries:
+                if not ffa:
+                    planned.append((key, ObjState.DUPLICATE_OBJECT))
+            elif not (ffa and payload.infohash in known_infohashes):
+                new_entries[key] = payload
+                known_infohashes.add(payload.infohash)
+                planned.append((key, ObjState.NEW_OBJECT))
+        return planned, known_rowids, new_entries
+
+    def _insert_payloads(self, cursor: Cursor, new_entries: dict[tuple[bytes, int], TorrentMetadataPayload],
+                         use_filter: bool = True) -> None:
+        """
+        Insert the given payloads, their torrent states, and their trackers using raw SQL.
+
+        :param use_filter: whether to skip the lookups of the torrent states that are absent from the membership filter.
+        """
+        # Torrent states are shared by all entries with the same infohash.
+        infohashes = {payload.infohash for payload in new_entries.values()}
+        state_rowids = self._select_in(cursor, "SELECT infohash, rowid FROM TorrentState WHERE infohash IN ({})",
+                                       {infohash for infohash in infohashes
+                                        if not use_filter or infohash in self.membership_filter})
+        if not use_filter:
+            self.membership_filter.update(state_rowids.keys())
+        missing_states = infohashes - state_rowids.keys()
+        if missing_states:
+            cursor.executemany("""
+                INSERT INTO TorrentState (infohash, seeders, leechers, last_check, self_checked, has_data)
+                VALUES (?, 0, 0, 0, 0, 0)
+            """, [(infohash,) for infohash in missing_states])
+            self.membership_filter.update(missing_states)
+            state_rowids.update(self._select_in(cursor, "SELECT infohash, rowid FROM TorrentState "
+                                                        "WHERE infohash IN ({})", missing_states))
+
+        added_on = datetime2timestamp(datetime.utcnow())  # noqa: DTZ003
+        cursor.executemany("""
+            INSERT INTO ChannelNode (infohash, size, torrent_date, tracker_info, title, tags, metadata_type,
+                                     reserved_flags, origin_id, public_key, id_, timestamp, signature, added_on,
+                                     status, xxx, health, tag_processor_version)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(payload.infohash, payload.size, datetime2timestamp(payload.torrent_date
+                                                                  if isinstance(payload.torrent_date, datetime)
+                                                                  else int2time(payload.torrent_date)),
+               payload.tracker_info, payload.title, payload.tags, REGULAR_TORRENT, payload.reserved_flags,
+               payload.origin_id, public_key, id_, payload.timestamp, payload.signature if public_key else None,
+               added_on, COMMITTED, 0.0, state_rowids[payload.infohash], 0)
+              for (public_key, id_), payload in new_entries.items()])
+        self.membership_filter.update(entry_key(public_key, id_) for public_key, id_ in new_entries)
+
+        # Link the torrent states to their (sanitized) trackers. The same few tracker URLs are shared by most entries
+        # of a batch, so every distinct URL is sanitized and looked up only once.
+        uniformed_urls = {tracker_info: get_uniformed_tracker_url(tracker_info)
+                          for tracker_info in {payload.tracker_info for payload in new_entries.values()}
+                          if tracker_info}
+        torrent_trackers = {(state_rowids[payload.infohash], url) for payload in new_entries.values()
+                            if (url := uniformed_urls.get(payload.tracker_info))}
+        if torrent_trackers:
+            tracker_rowids = self._upsert_trackers(cursor, {url for _, url in torrent_trackers})
+            cursor.executemany("INSERT OR IGNORE INTO TorrentState_TrackerState (torrentstate, trackerstate) "
+                               "VALUES (?, ?)", [(state_rowid, tracker_rowids[url])
+                                                 for state_rowid, url in torrent_trackers])
+
+    def _upsert_trackers(self, cursor: Cursor, urls: set[str]) -> dict[str, int]:
+        """
+        Create the trackers with the given (sanitized) URLs that we do not know yet.
+
+        :return: the rowids of all given trackers, by their URL.
+        """
+        cursor.executemany("INSERT OR IGNORE INTO TrackerState (url, last_check, alive, failures) VALUES (?, 0, 1, 0)",
+                           [(url,) for url in urls])
+        return self._select_in(cursor, "SELECT url, rowid FROM TrackerState WHERE url IN ({})", urls)
+
+    def _select_in(self, cursor: Cursor, sql: str, values: set) -> dict:
+        """
+        Run a two-column (key, value) select with an ``IN ({})`` placeholder for the given values and return a dict.
+        """
+        result = {}
+        values = list(values)
+        for start in range(0, len(values), MAX_BATCH_SIZE):
+            chunk = values[start:start + MAX_BATCH_SIZE]
+            result.update(cursor.execute(sql.format(", ".join("?" * len(chunk))), chunk))
+        return result
+
+    def _select_channel_node_rowids(self, cursor: Cursor, keys: set[tuple[bytes, int]]) -> dict:
+        """
+        Get the rowids of the ChannelNode entries with the given (public_key, id_) keys.
+        """
+        result = {}
+        keys = list(keys)
+        for start in range(0, len(keys), MAX_BATCH_SIZE):
+            chunk = keys[start:start + MAX_BATCH_SIZE]
+            cursor.execute(f"""
+                SELECT cn.public_key, cn.id_, cn.rowid
+                FROM (VALUES {", ".join(["(?, ?)"] * len(chunk))}) AS k
+                JOIN ChannelNode cn ON cn.public_key = k.column1 AND cn.id_ = k.column2
+            """, [value for key in chunk for value in key])  # noqa: S608
+            result.update(((public_key, id_), rowid) for public_key, id_, rowid in cursor.fetchall())
+        return result
+
+    @db_session
+    def get_num_torrents(self) -> int:
+        """
+        Get the number of torrents in the database.
+        """
+        return self.get_entry_count(REGULAR_TORRENT)
+
+    @db_session
+    def get_entry_count(self, metadata_type: int | None = None) -> int:
+        """
+        Get the (trigger-maintained) number of entries of the given metadata type, or of all entries.
+        """
+        if metadata_type is None:
+            return self.db.select("SELECT coalesce(sum(num_entries), 0) FROM EntryCount")[0]
+        return self.db.select("SELECT coalesce(sum(num_entries), 0) FROM EntryCount "
+                              "WHERE metadata_type = $metadata_type")[0]
 
     async def get_entries_threaded(self, **kwargs) -> list[TorrentMetadata]:
         """
-        Retrieve entries in a thread and return a list of results.
+        Retrieve entries for a remote query in a reader thread and return a list of results.
         """
-        return await self.run_threaded(self.get_entries, **kwargs)
+        return await self.run_read_in_lane(Lane.REMOTE, self.get_entries, **kwargs)
 
     @db_session
-    def get_entries(self, first: int = 1, last: int | None = None, **kwargs) -> list[TorrentMetadata]:
+    def get_entries(self, first: int = 1, last: int | None = None, after: list | None = None,
+                    **kwargs) -> list[TorrentMetadata]:
         """
         Get some torrents. Optionally sort the results by a specific field, or filter the channels based
         on a keyword/whether you are subscribed to it.
 
+        Pages can be requested by range (``first`` to ``last``) or, more efficiently for deep pages, as the
+        ``last - first + 1`` entries that follow the ``after`` keyset of the previous page (see ``get_next_keyset``).
+
         :return: A list of class members
         """
-        pony_query = self.get_entries_query(**kwargs)
-        result = pony_query[(first or 1) - 1: last]
-        for entry in result:
-            # ACHTUNG! This is necessary in order to load entry.health inside db_session,
-            # to be able to perform successfully `entry.to_simple_dict()` later
-            entry.to_simple_dict()
-        return result
+        rowids = self.get_entries_rowids(first, last, after, **kwargs)
+        # The health is prefetched in the same session, to be able to perform `entry.to_simple_dict()` later
+        entries = {entry.rowid: entry for entry in self.TorrentMetadata.select(lambda g: g.rowid in rowids)
+                   .prefetch(self.TorrentMetadata.health)}
+        return [entries[rowid] for rowid in rowids]
+
+    @db_session
+    def get_entries_rowids(self, first: int = 1, last: int | None = None, after: list | None = None,
+                           **kwargs) -> list[int]:
+        """
+        Get the row ids of the entries that ``get_entries`` returns for the given arguments, in order.
+        """
+        start = (first or 1) - 1
+        stop = last
+        if after is not None and last is not None:
+            start, stop = 0, last - start
+        if self.is_ranked_search(**kwargs):
+            # The ranked candidates are bounded (see ``query_templates.get_filter_sql``): the keyset is simply the offset.
+            if after is not None:
+                start, stop = start + after[0], None if stop is None else stop + after[0]
+            sql, parameters = prepare_entries_query(SELECT_CANDIDATES, ordered=False,
+                                                    trigram_index=self.substring_search, **kwargs)
+            return self.rank_search_results(self.execute_template(sql, parameters), kwargs["txt_filter"])[start: stop]
+        sql, parameters = prepare_entries_query(SELECT_ROWIDS, after=after, trigram_index=self.substring_search,
+                                                **kwargs)
+        parameters.update(limit=-1 if stop is None else max(0, stop - start), offset=start)
+        return [rowid for rowid, in self.execute_template(sql, parameters)]
+
+    def execute_template(self, sql: str, parameters: dict[str, Any]) -> list[tuple]:
+        """
+        Execute a query of ``prepare_entries_query`` with the given parameters and fetch all rows.
+        """
+        # Make pending ORM changes visible to the raw SQL.
+        self.db.flush()
+        return self.db.get_connection().cursor().execute(sql, parameters).fetchall()
+
+    @staticmethod
+    def is_ranked_search(**kwargs) -> bool:
+        """
+        Check if ``get_entries`` orders the results for the given arguments by their (Python-side) search rank.
+        """
+        return bool(kwargs.get("txt_filter")) and kwargs.get("sort_by") is None
+
+    @db_session
+    def get_next_keyset(self, rowids: list[int], first: int = 1, after: list | None = None,
+                        **kwargs) -> list | None:
+        """
+        Get the keyset that continues after the given page of ``get_entries_rowids`` results, or None for an empty
+        page.
+        """
+        if not rowids:
+            return None
+        if self.is_ranked_search(**kwargs):
+            offset = after[0] if after is not None else (first or 1) - 1
+            return [offset + len(rowids)]
+        columns = ", ".join(get_keyset_columns(kwargs.get("sort_by")))
+        return list(self.db.execute(f"""
+            SELECT {columns} FROM ChannelNode g LEFT JOIN TorrentState torrentstate ON g.health = torrentstate.rowid
+            WHERE g.rowid = $(rowids[-1])
+        """).fetchone())  # noqa: S608
+
+    def bump_write_generation(self) -> None:
+        """
+        Invalidate all cached ``get_simple_entries`` results. Call this after writing anything that can change them.
+        """
+        self.last_write_time = time()
+        self.result_cache.bump_generation()
+
+    def notify_created_torrents(self, entries: list[tuple[bytes | None, str]]) -> None:
+        """
+        Announce the (infohash, title) of the given new entries.
+
+        On the writer thread, the announcement waits until the transaction is committed, and is combined with that of
+        the other entries of the transaction. Other writes are announced right away.
+        """
+        if self.write_queue.is_writer_thread():
+            self.created_torrents.extend(entries)
+        elif self.notifier:
+            self.notifier.notify(Notification.new_torrent_metadata_batch_created, entries=entries)
+
+    def on_write_commit(self) -> None:
+        """
+        Invalidate the cached results and announce the entries that were created by the committed transaction.
+        """
+        self.bump_write_generation()
+        if self.created_torrents:
+            entries, self.created_torrents = self.created_torrents, []
+            try:
+                self.notifier.notify(Notification.new_torrent_metadata_batch_created, entries=entries)
+            except Exception as e:
+                self._logger.warning("Failed to announce %d new torrents: %s: %s", len(entries), type(e).__name__,
+                                     str(e))
+
+    def on_write_rollback(self) -> None:
+        """
+        Forget the entries of the failed transaction.
+
+        The entries of the transactions that were committed before (e.g., by the batches of an exclusive command) have
+        already been announced, so only those since the last commit are forgotten.
+        """
+        self.created_torrents.clear()
+
+    @db_session
+    def get_simple_entries(self, **kwargs) -> list[dict]:
+        """
+        Get the ``to_simple_dict`` forms of the entries that ``get_entries`` would return for the given arguments.
+
+        The results are served from an LRU cache, as long as nothing was written to the database in the meantime.
+
+        :return: A list of (fresh copies of the) entry dicts.
+        """
+        return self.get_simple_entries_page(**kwargs)[0]
+
+    @db_session
+    def get_simple_entries_page(self, **kwargs) -> tuple[list[dict], list | None]:
+        """
+        Get the result of ``get_simple_entries`` and the keyset to pass as ``after`` to get the next page.
+        """
+        generation, page = self.result_cache.get(kwargs)
+        if page is None:
+            rowids = self.get_entries_rowids(**kwargs)
+            page = self.get_simple_dicts(rowids), self.get_next_keyset(rowids, **kwargs)
+            self.result_cache.put(generation, kwargs, page)
+        results, next_keyset = page
+        return [dict(entry) for entry in results], next_keyset
+
+    @db_session
+    def get_simple_dicts(self, rowids: list[int]) -> list[dict]:
+        """
+        Get the ``to_simple_dict`` forms of the entries with the given row ids, in the same order.
+
+        Instead of constructing ORM objects (and lazily loading their health), this projects the entries and their
+        health to plain dicts with a single joined SELECT. Unknown row ids are skipped.
+        """
+        cursor = self.db.get_connection().cursor()
+        rows = cursor.execute("""
+            SELECT cn.rowid, cn.title, cn.tags, cn.infohash, cn.size, ts.seeders, ts.leechers, ts.last_check,
+                   CAST(strftime('%s', cn.torrent_date) AS INTEGER), cn.tag_processor_version, cn.metadata_type,
+                   cn.id_, cn.origin_id, cn.public_key, cn.status
+            FROM ChannelNode cn LEFT JOIN TorrentState ts ON cn.health = ts.rowid
+            WHERE cn.rowid IN (SELECT value FROM json_each(?))
+        """, (json.dumps(rowids),))
+        entries = {row[0]: {
+            "name": row[1],
+            "category": row[2],
+            "infohash": hexlify(row[3]).decode(),
+            "size": row[4],
+            "num_seeders": row[5],
+            "num_leechers": row[6],
+            "last_tracker_check": row[7],
+            "created": row[8],
+            "tag_processor_version": row[9],
+            "type": row[10],
+            "id": row[11],
+            "origin_id": row[12],
+            "public_key": hexlify(row[13]).decode(),
+            "status": row[14],
+        } for row in rows}
+        return [entries[rowid] for rowid in rowids if rowid in entries]
+
+    def get_result_cache_stats(self) -> dict[str, int]:
+        """
+        Get the statistics of the ``get_simple_entries`` result cache.
+        """
+        return self.result_cache.get_stats()
+
+    def rank_search_results(self, candidates: list[tuple], txt_filter: str) -> list[int]:
+        """
+        Order the candidates of a full-text search by relevance and return their row ids.
+
+        The channel torrents and channel folders are always on top (if they are not filtered out). Then, regular
+        torrents are ordered by their ``torrent_rank`` (see ``ranks.py``), which is based on the query string, the
+        title, the number of seeders and leechers, and the torrent's age. If two torrents have the same rank, they are
+        ordered by the last time they were checked, and finally by their row id.
+
+        The full-text search already limits the candidates to at most 1000 rows. Instead of calling a Python ranking
+        function from SQLite for every candidate row, we only fetch the columns that the ranking needs and score the
+        whole batch in one pass.
+
+        :param candidates: the ``SELECT_CANDIDATES`` columns of the rows to rank.
+        """
+        if not candidates:
+            return []
+
+        rowids, metadata_types, titles, seeders, leechers, torrent_dates, last_checks = zip(*candidates, strict=True)
+        now = int(time())
+        freshness = [None if torrent_date is None else now - torrent_date for torrent_date in torrent_dates]
+        ranks = torrent_ranks(txt_filter, titles, seeders, leechers, freshness)
+        type_order = {CHANNEL_TORRENT: 1, COLLECTION_NODE: 2}
+
+        def sort_key(i: int) -> tuple:
+            # SQLite sorts NULL values last for descending orders
+            return (type_order.get(metadata_types[i], 3), -ranks[i],
+                    last_checks[i] is None, -(last_checks[i] or 0), -rowids[i])
+
+        return [rowids[i] for i in sorted(range(len(rowids)), key=sort_key)]
 
     @db_session
     def get_total_count(self, **kwargs) -> int | None:
         """
         Get total count of torrents that would be returned if there would be no pagination/limits/sort.
         """
-        for p in ["first", "last", "sort_by", "sort_desc"]:
+        for p in ["first", "last", "after", "sort_by", "sort_desc"]:
             kwargs.pop(p, None)
-        return self.get_entries_query(**kwargs).count()
+        sql, parameters = prepare_entries_query(SELECT_COUNT, ordered=False, trigram_index=self.substring_search,
+                                                **kwargs)
+        return self.execute_template(sql, parameters)[0][0]
+
+    @db_session
+    def get_approximate_total(self, txt_filter: str | None = None, metadata_type: int | None = None,
+                              substring: bool = False, **kwargs) -> tuple[int, bool]:
+        """
+        Get a cheap estimate of ``get_total_count`` and whether this estimate is exact.
+
+        Without filters, the total is read from the trigger-maintained entry counts. Text searches count their
+        full-text matches, up to the number of search candidates, without joining the matches with their entries.
+        These counts are never exact. Any other filter falls back to the (exact) ``get_total_count``.
+
+        :return: A tuple of the total and whether it is exact.
+        """
+        filters = {name: value for name, value in kwargs.items()
+                   if name not in ("first", "last", "after", "sort_by", "sort_desc")
+                   and value is not None and value is not False and value not in ("", [])}
+        if filters:
+            return self.get_total_count(txt_filter=txt_filter, metadata_type=metadata_type, substring=substring,
+                                        **filters), True
+        if not txt_filter:
+            return self.get_entry_count(metadata_type), True
+
+        fts_index, match = plan_text_search(txt_filter, substring, self.substring_search)
+        num_matches = self.db.select(f"""SELECT count(*) FROM (
+            SELECT rowid FROM {fts_index} WHERE {fts_index} MATCH $match LIMIT $threshold
+        )""", globals={"match": match, "threshold": APPROXIMATE_TOTAL_THRESHOLD})[0]  # noqa: S608
+        # The full-text index also holds the titles of entries that an exact total would not count (e.g., entries of
+        # another metadata type), so this count is never reported as exact.
+        return num_matches, False
 
     @db_session
     def get_entries_count(self, **kwargs) -> int | None:
         """
         Get the count of torrents that would be returned if there would be no pagination/limits.
         """
-        for p in ["first", "last"]:
+        for p in ["first", "last", "after"]:
             kwargs.pop(p, None)
-        return self.get_entries_query(**kwargs).count()
+        sql, parameters = prepare_entries_query(SELECT_COUNT, ordered=False, trigram_index=self.substring_search,
+                                                **kwargs)
+        return self.execute_template(sql, parameters)[0][0]
 
     @db_session
     def get_max_rowid(self) -> int:
@@ -741,41 +2059,21 @@ class MetadataStore:
     def get_auto_complete_terms(self, text: str, max_terms: int) -> list[str]:
         """
         Get the auto-completion terms for a given query.
-        """
-        if not text:
-            return []
 
-        words = self.fts_keyword_search_re.findall(text)
-        if not words:
+        The last word of the query is completed with the title words that start with it (including the word itself),
+        the words that occur in the most titles first. The earlier words of the query are kept as they are, but they
+        do not need to occur in the same titles.
+        """
+        last_word = re.search(r"\w+$", text or "", re.UNICODE)
+        if not last_word:
             return []
 
-        fts_query = '"{}"*'.format(" ".join(f"{word}" for word in words))
-        suggestion_pattern = r'\W+'.join(word for word in words) + r'(\W*)((?:[.-]?\w)*)'
-        suggestion_re = re.compile(suggestion_pattern, re.UNICODE)
-
+        prefix = last_word.group().lower()
+        # Every term that starts with the prefix sorts before the prefix followed by the highest code point.
         with db_session:
-            titles = self.db.select("""
-                cn.title
-                FROM ChannelNode cn
-                LEFT JOIN TorrentState ts ON cn.health = ts.rowid
-                WHERE cn.rowid in (
-                    SELECT rowid FROM FtsIndex WHERE FtsIndex MATCH $fts_query ORDER BY rowid DESC LIMIT $max_terms
-                )
-                ORDER BY coalesce(ts.seeders, 0) DESC
-            """, globals={"fts_query": fts_query, "max_terms": max_terms})
+            terms = self.db.select("""
+                term FROM CompletionTerm WHERE term >= $prefix AND term < $prefix_end
+                ORDER BY num_entries DESC, term LIMIT $max_terms
+            """, globals={"prefix": prefix, "prefix_end": prefix + chr(0x10FFFF), "max_terms": max_terms})
 
-        result = []
-        for title in titles:
-            match = suggestion_re.search(title.lower())
-            if match:
-                # group(2) is the ending of the last word (if the word is not finished) or the next word
-                continuation = match.group(2)
-                if re.match(r'^.*\w$', text) and match.group(1):  # group(1) is non-word symbols (spaces, commas, etc.)
-                    continuation = match.group(1) + continuation
-                suggestion = text + continuation
-                if suggestion not in result:
-                    result.append(suggestion)
-                    if len(result) >= max_terms:
-                        break
-
-        return result
+        return [text[:last_word.start()] + term for term in terms]
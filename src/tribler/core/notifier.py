@@ -28,6 +28,7 @@ class Notification(Enum):
     torrent_finished = Desc("torrent_finished", ["infohash", "name", "hidden"], [str, str, bool])
     torrent_status_changed = Desc("torrent_status_changed", ["infohash", "status"], [str, str])
     tribler_shutdown_state = Desc("tribler_shutdown_state", ["state"], [str])
+    tribler_upgrade_state = Desc("tribler_upgrade_state", ["state"], [str])
     tribler_new_version = Desc("tribler_new_version", ["version"], [str])
     remote_query_results = Desc("remote_query_results", ["query", "results", "uuid", "peer"], [str, list, str, str])
     local_query_results = Desc("local_query_results", ["query", "results"], [str, list])
@@ -49,6 +50,7 @@ class Notification(Enum):
     torrent_metadata_added = Desc("torrent_metadata_added", ["metadata"], [dict])
     new_torrent_metadata_created = Desc("new_torrent_metadata_created", ["infohash", "title"],
                                         [(bytes, type(None)), (str, type(None))])
+    new_torrent_metadata_batch_created = Desc("new_torrent_metadata_batch_created", ["entries"], [list])
 
 
 class Notifier:
@@ -62,6 +64,7 @@ class Notifier:
         """
         self.observers: dict[Notification, list[Callable[..., None]]] = defaultdict(list)
         self.delegates: set[Callable[..., None]] = set()
+        self.add(Notification.new_torrent_metadata_batch_created, self.on_new_torrent_metadata_batch_created)
 
     def add(self, topic: Notification, observer: Callable[..., None]) -> None:
         """
@@ -82,3 +85,13 @@ class Notifier:
             observer(**kwargs)
         for delegate in self.delegates:
             delegate(notification, **kwargs)
+
+    def on_new_torrent_metadata_batch_created(self, entries: list[tuple[bytes | None, str | None]]) -> None:
+        """
+        Pass the (infohash, title) entries of a batch to the observers of the individual notification.
+
+        Delegates only receive the batch.
+        """
+        for observer in self.observers[Notification.new_torrent_metadata_created]:
+            for infohash, title in entries:
+                observer(infohash=infohash, title=title)
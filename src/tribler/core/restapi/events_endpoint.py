@@ -28,6 +28,7 @@ topics_to_send_to_gui = [
     Notification.torrent_finished,
     Notification.torrent_health_updated,
     Notification.tribler_shutdown_state,
+    Notification.tribler_upgrade_state,
     Notification.remote_query_results,
     Notification.low_space,
     Notification.report_config_error,
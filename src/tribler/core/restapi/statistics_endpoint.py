@@ -5,11 +5,12 @@ from typing import TYPE_CHECKING
 from aiohttp import web
 from aiohttp_apispec import docs
 from ipv8.REST.schema import schema
-from marshmallow.fields import Integer, String
+from marshmallow.fields import Boolean, Dict, Float, Integer, Nested, String
 
 from tribler.core.restapi.rest_endpoint import MAX_REQUEST_SIZE, RESTEndpoint, RESTResponse
 
 if TYPE_CHECKING:
+    from tribler.core.database.maintenance import DatabaseMaintenance
     from tribler.core.session import Session
 
 
@@ -27,6 +28,7 @@ class StatisticsEndpoint(RESTEndpoint):
         super().__init__(middlewares, client_max_size)
         self.session: Session | None = None
         self.content_discovery_community = None
+        self.db_maintenance: DatabaseMaintenance | None = None
 
         self.app.add_routes([web.get("/tribler", self.get_tribler_stats),
                              web.get("/ipv8", self.get_ipv8_stats)])
@@ -39,6 +41,32 @@ class StatisticsEndpoint(RESTEndpoint):
                 "schema": schema(TriblerStatisticsResponse={
                     "statistics": schema(TriblerStatistics={
                         "database_size": Integer,
+                        "result_cache": schema(ResultCacheStats={
+                            "hits": Integer,
+                            "misses": Integer,
+                            "size": Integer
+                        }),
+                        "membership_filter": schema(MembershipFilterStats={
+                            "keys": Integer,
+                            "capacity": Integer,
+                            "memory": Integer,
+                            "false_positive_rate": Float,
+                            "lookups": Integer,
+                            "absent": Integer
+                        }),
+                        "executors": Dict(keys=String, values=Dict(keys=String, values=Nested(schema(LaneStats={
+                            "depth": Integer,
+                            "started": Integer,
+                            "mean_wait": Float,
+                            "max_wait": Float
+                        })))),
+                        "maintenance": Dict(keys=String, values=Nested(schema(MaintenanceStats={
+                            "last_run": Float,
+                            "duration": Float,
+                            "steps": Integer,
+                            "complete": Boolean,
+                            "evicted": Integer
+                        }))),
                         "torrent_queue_stats": [
                             schema(TorrentQueueStats={
                                 "failed": Integer,
@@ -64,7 +92,13 @@ class StatisticsEndpoint(RESTEndpoint):
 
         if self.session and self.session.mds:
             stats_dict.update({"db_size": self.session.mds.get_db_file_size(),
-                               "num_torrents": self.session.mds.get_num_torrents()})
+                               "num_torrents": self.session.mds.get_num_torrents(),
+                               "result_cache": self.session.mds.get_result_cache_stats(),
+                               "membership_filter": self.session.mds.get_membership_filter_stats(),
+                               "executors": self.session.mds.get_executor_stats()})
+
+        if self.db_maintenance:
+            stats_dict["maintenance"] = self.db_maintenance.get_stats()
 
         if self.session and self.session.download_manager:
             lt_stats: dict[str, list[dict]] = {"sessions": []}
@@ -138,7 +138,7 @@ class TorrentChecker(TaskManager):
             self._logger.warning("Not performing tracker check since we are shutting down")
             return
 
-        tracker = self.get_next_tracker()
+        tracker = await self.get_next_tracker()
         if not tracker:
             self._logger.warning("No tracker to select from to check torrent health, skip")
             return
@@ -155,7 +155,7 @@ class TorrentChecker(TaskManager):
         if len(infohashes) == 0:
             # We have no torrent to recheck for this tracker. Still update the last_check for this tracker.
             self._logger.info("No torrent to check for tracker %s", url)
-            self.tracker_manager.update_tracker_info(url)
+            await self.mds.run_threaded(self.tracker_manager.update_tracker_info, url)
             return
 
         try:
@@ -163,7 +163,7 @@ class TorrentChecker(TaskManager):
         except MalformedTrackerURLException as e:
             session = None
             # Remove the tracker from the database
-            self.tracker_manager.remove_tracker(url)
+            await self.mds.run_threaded(self.tracker_manager.remove_tracker, url)
             self._logger.warning(e)
 
         if session is None:
@@ -197,7 +197,7 @@ class TorrentChecker(TaskManager):
         except Exception as e:
             exception_str = str(e).replace('\n]', ']')
             self._logger.warning("Got session error for the tracker: %s\n%s", session.tracker_url, exception_str)
-            self.tracker_manager.update_tracker_info(session.tracker_url, False)
+            await self.mds.run_threaded(self.tracker_manager.update_tracker_info, session.tracker_url, False)
             raise e  # noqa: TRY201
         finally:
             await self.clean_session(session)
@@ -206,9 +206,7 @@ class TorrentChecker(TaskManager):
         self._logger.info("Got response from %s in %f seconds: %s", session.__class__.__name__, round(t2 - t1, 3),
                           str(result))
 
-        with db_session:
-            for health in result.torrent_health_list:
-                self.update_torrent_health(health)
+        await asyncio.gather(*(self.update_torrent_health(health) for health in result.torrent_health_list))
 
         return result
 
@@ -281,7 +279,7 @@ class TorrentChecker(TaskManager):
         self._logger.info("Results for local torrents check: %s", str(results))
         return selected_torrents, results
 
-    def get_next_tracker(self) -> Any | None:  # noqa: ANN401
+    async def get_next_tracker(self) -> Any | None:  # noqa: ANN401
         """
         Return the next unchecked tracker.
         """
@@ -289,9 +287,9 @@ class TorrentChecker(TaskManager):
             url = tracker.url
 
             if not is_valid_url(url):
-                self.tracker_manager.remove_tracker(url)
+                await self.mds.run_threaded(self.tracker_manager.remove_tracker, url)
             elif tracker.failures >= MAX_TRACKER_FAILURES:
-                self.tracker_manager.update_tracker_info(url, is_successful=False)
+                await self.mds.run_threaded(self.tracker_manager.update_tracker_info, url, is_successful=False)
             else:
                 return tracker
 
@@ -357,7 +355,7 @@ class TorrentChecker(TaskManager):
         if health.last_check == 0:
             self.notify(health)  # We don't need to store this in the db, but we still need to notify the GUI
         else:
-            self.update_torrent_health(health)
+            await self.update_torrent_health(health)
         return health
 
     def create_session_for_request(self, tracker_url: str, timeout: float = 20) -> TrackerSession | None:
@@ -385,7 +383,7 @@ class TorrentChecker(TaskManager):
         """
         url = session.tracker_url
 
-        self.tracker_manager.update_tracker_info(url, not session.is_failed)
+        await self.mds.run_threaded(self.tracker_manager.update_tracker_info, url, not session.is_failed)
         # Remove the session from our session list dictionary
         self.sessions[url].remove(session)
         if len(self.sessions[url]) == 0 and url != "DHT":
@@ -394,7 +392,7 @@ class TorrentChecker(TaskManager):
         await session.cleanup()
         self._logger.debug('Session has been cleaned up')
 
-    def update_torrent_health(self, health: HealthInfo) -> bool:
+    async def update_torrent_health(self, health: HealthInfo) -> bool:
         """
         Updates the torrent state in the database if it already exists, otherwise do nothing.
         Returns True if the update was successful, False otherwise.
@@ -408,21 +406,18 @@ class TorrentChecker(TaskManager):
             return False
 
         self._logger.debug("Update torrent health: %s", health)
-        with db_session:
-            # Update torrent state
-            torrent_state = self.mds.TorrentState.get_for_update(infohash=health.infohash)
-            if not torrent_state:
-                self._logger.warning("Unknown torrent: %s", hexlify(health.infohash).decode())
-                return False
-
-            prev_health = torrent_state.to_health()
-            if not health.should_replace(prev_health):
-                self._logger.info("Skip health update, the health in the database is fresher or have more seeders")
-                self.notify(prev_health)  # to update UI state from "Checking..."
-                return False
+        # Unknown torrents are recognized without a round trip to the database writer
+        stored = (await self.mds.run_threaded(self.store_torrent_health, health)
+                  if health.infohash in self.mds.membership_filter else None)
+        if stored is None:
+            self._logger.warning("Unknown torrent: %s", hexlify(health.infohash).decode())
+            return False
 
-            torrent_state.set(seeders=health.seeders, leechers=health.leechers, last_check=health.last_check,
-                              self_checked=True)
+        prev_health, replaced = stored
+        if not replaced:
+            self._logger.info("Skip health update, the health in the database is fresher or have more seeders")
+            self.notify(prev_health)  # to update UI state from "Checking..."
+            return False
 
         if health.seeders > 0 or health.leechers > 0:
             self.torrents_checked[health.infohash] = health
@@ -432,6 +427,26 @@ class TorrentChecker(TaskManager):
         self.notify(health)
         return True
 
+    def store_torrent_health(self, health: HealthInfo) -> tuple[HealthInfo, bool] | None:
+        """
+        Write the given health to the database, if it should replace the health that is stored for its torrent.
+
+        This is a write command for the database writer thread: it runs inside the writer's transaction.
+
+        :return: the previously stored health and whether it was replaced, or None if the torrent is unknown.
+        """
+        torrent_state = self.mds.TorrentState.get_for_update(infohash=health.infohash)
+        if not torrent_state:
+            return None
+
+        prev_health = torrent_state.to_health()
+        if not health.should_replace(prev_health):
+            return prev_health, False
+
+        torrent_state.set(seeders=health.seeders, leechers=health.leechers, last_check=health.last_check,
+                          self_checked=True)
+        return prev_health, True
+
     def notify(self, health: HealthInfo) -> None:
         """
         Send a health update to the GUI.
@@ -70,6 +70,8 @@ class TrackerManager:
         """
         Adds a new tracker into the tracker info dict and the database.
 
+        This is a write command for the database writer thread: it runs inside the writer's transaction.
+
         :param tracker_url: The new tracker URL to be added.
         """
         sanitized_tracker_url = get_uniformed_tracker_url(tracker_url)
@@ -77,18 +79,17 @@ class TrackerManager:
             self._logger.warning("skip invalid tracker: %s", repr(tracker_url))
             return
 
-        with db_session:
-            num = count(g for g in self.TrackerState if g.url == sanitized_tracker_url)
-            if num > 0:
-                self._logger.debug("skip existing tracker: %s", repr(tracker_url))
-                return
-
-            # insert into database
-            self.TrackerState(url=sanitized_tracker_url,
-                              last_check=0,
-                              failures=0,
-                              alive=True,
-                              torrents={})
+        num = count(g for g in self.TrackerState if g.url == sanitized_tracker_url)
+        if num > 0:
+            self._logger.debug("skip existing tracker: %s", repr(tracker_url))
+            return
+
+        # insert into database
+        self.TrackerState(url=sanitized_tracker_url,
+                          last_check=0,
+                          failures=0,
+                          alive=True,
+                          torrents={})
 
     def remove_tracker(self, tracker_url: str) -> None:
         """
@@ -96,20 +97,22 @@ class TrackerManager:
         URL is sanitized first and removed from the database. If the URL is ill formed then try removing the non-
         sanitized version.
 
+        This is a write command for the database writer thread: it runs inside the writer's transaction.
+
         :param tracker_url: The URL of the tracker to be deleted.
         """
         sanitized_tracker_url = get_uniformed_tracker_url(tracker_url)
 
-        with db_session:
-            options = self.TrackerState.select(lambda g: g.url in [tracker_url, sanitized_tracker_url])
-            for option in options[:]:
-                option.delete()
+        options = self.TrackerState.select(lambda g: g.url in [tracker_url, sanitized_tracker_url])
+        for option in options[:]:
+            option.delete()
 
-    @db_session
     def update_tracker_info(self, tracker_url: str, is_successful: bool = True) -> None:
         """
         Updates a tracker information.
 
+        This is a write command for the database writer thread: it runs inside the writer's transaction.
+
         :param tracker_url: The given tracker_url.
         :param is_successful: If the check was successful.
         """
@@ -4,6 +4,8 @@ import logging
 import os
 import platform
 import shutil
+from asyncio import get_running_loop
+from functools import partial
 from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -11,12 +13,19 @@ from typing import TYPE_CHECKING
 from aiohttp import ClientSession, ClientTimeout
 from packaging.version import Version
 
+from tribler.core.database.store import Lane
+from tribler.core.notifier import Notification
 from tribler.tribler_config import TriblerConfigManager
 from tribler.upgrade_script import FROM, TO, upgrade
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from ipv8.taskmanager import TaskManager
 
+    from tribler.core.database.store import MetadataStore
+    from tribler.core.notifier import Notifier
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,13 +34,18 @@ class VersioningManager:
     Version related logic.
     """
 
-    def __init__(self, task_manager: TaskManager, config: TriblerConfigManager | None) -> None:
+    def __init__(self, task_manager: TaskManager, config: TriblerConfigManager | None,
+                 notifier: Notifier | None = None, metadata_store: MetadataStore | None = None) -> None:
         """
         Create a new versioning manager.
+
+        :param metadata_store: the running metadata store, which has to catch up after the upgrade copied torrents.
         """
         super().__init__()
         self.task_manager = task_manager
         self.config = config or TriblerConfigManager()
+        self.notifier = notifier
+        self.metadata_store = metadata_store
 
     def get_current_version(self) -> str | None:
         """
@@ -107,9 +121,34 @@ class VersioningManager:
             return
         src_dir = Path(self.config.get("state_dir")) / FROM
         dst_dir = Path(self.config.get_version_state_dir())
-        self.task_manager.register_executor_task("Upgrade", upgrade, self.config,
-                                                 str(src_dir.expanduser().absolute()),
-                                                 str(dst_dir.expanduser().absolute()))
+        self.task_manager.register_executor_task("Upgrade", self.upgrade, str(src_dir.expanduser().absolute()),
+                                                 str(dst_dir.expanduser().absolute()),
+                                                 self.get_upgrade_state_reporter())
+
+    def upgrade(self, source: str, destination: str, report_state: Callable[[str], None] | None) -> None:
+        """
+        Perform the upgrade and let the running metadata store know about the torrents that it copied.
+        """
+        if self.metadata_store is None:
+            upgrade(self.config, source, destination, report_state)
+            return
+        # The copy of the old torrents holds the write lock of the database until it is done. It takes the place of
+        # the writer thread of the store, so that the writes of the store wait for it instead of timing out on the lock.
+        self.metadata_store.submit_exclusive_write_in_lane(Lane.INTERACTIVE, upgrade, self.config, source, destination,
+                                                           report_state).result()
+        # The upgrade wrote to the database behind the back of the store: the keys of the copied torrents are not
+        # in its membership filter and its cached results are stale (the commit of this write invalidates them).
+        self.metadata_store.submit_write(self.metadata_store.fill_membership_filter).result()
+
+    def get_upgrade_state_reporter(self) -> Callable[[str], None] | None:
+        """
+        Get a callback that notifies the upgrade state, from the upgrade thread, on the current event loop.
+        """
+        if self.notifier is None:
+            return None
+        loop = get_running_loop()
+        notify = partial(self.notifier.notify, Notification.tribler_upgrade_state)
+        return lambda state: loop.call_soon_threadsafe(partial(notify, state=state))
 
     def remove_version(self, version: str) -> None:
         """
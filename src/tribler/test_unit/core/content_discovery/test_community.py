@@ -3,7 +3,8 @@ from __future__ import annotations
 import os
 import sys
 from binascii import hexlify
-from typing import TYPE_CHECKING, cast
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, cast
 from unittest import skipIf
 from unittest.mock import AsyncMock, Mock, patch
 
@@ -27,9 +28,22 @@ from tribler.core.torrent_checker.torrent_checker import TorrentChecker
 from tribler.core.torrent_checker.torrentchecker_session import HealthInfo
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from ipv8.community import CommunitySettings
     from ipv8.test.mocking.ipv8 import MockIPv8
 
+    from tribler.core.database.store import Lane
+
+
+def submit_now(_: Lane, func: Callable, *args: Any, **kwargs) -> Future:  # noqa: ANN401
+    """
+    Run a (write) call of the metadata store immediately, instead of queueing it.
+    """
+    future = Future()
+    future.set_result(func(*args, **kwargs))
+    return future
+
 
 class MockTorrentChecker(TorrentChecker):
     """
@@ -71,7 +85,8 @@ class TestContentDiscoveryCommunity(TestBase[ContentDiscoveryCommunity]):
         """
         overwrite_settings = ContentDiscoverySettings(
             torrent_checker=MockTorrentChecker(),
-            metadata_store=Mock(get_entries_threaded=AsyncMock(), process_compressed_mdblob_threaded=AsyncMock())
+            metadata_store=Mock(get_entries_threaded=AsyncMock(), process_compressed_mdblob_threaded=AsyncMock(),
+                                run_threaded_read=AsyncMock(return_value=[]), submit_write_in_lane=submit_now)
         )
         out = super().create_node(overwrite_settings, create_dht, enable_statistics)
         out.overlay.cancel_all_pending_tasks()
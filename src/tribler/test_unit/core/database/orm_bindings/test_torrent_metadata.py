@@ -1,8 +1,14 @@
 from __future__ import annotations
 
 from ipv8.test.base import TestBase
-
-from tribler.core.database.orm_bindings.torrent_metadata import entries_to_chunk, infohash_to_id, tdef_to_metadata_dict
+from lz4.frame import LZ4FrameDecompressor
+
+from tribler.core.database.orm_bindings.torrent_metadata import (
+    SignedBlobCache,
+    entries_to_chunk,
+    infohash_to_id,
+    tdef_to_metadata_dict,
+)
 from tribler.core.libtorrent.torrentdef import TorrentDef
 
 
@@ -87,3 +93,24 @@ class TestTorrentMetadata(TestBase):
 
         self.assertEqual(1, last_index)
         self.assertEqual(7, health)
+
+    def test_entries_to_chunk_round_trip(self) -> None:
+        """
+        Test if entries_to_chunk gives the compressed serialized forms of the entries, in order.
+        """
+        chunk, _ = entries_to_chunk([MockTorrentMetadata(0, 99), MockTorrentMetadata(100, 199)], 400)
+
+        self.assertEqual(bytes(range(99)) + bytes(range(100, 199)), LZ4FrameDecompressor().decompress(chunk))
+
+    def test_signed_blob_cache_evict(self) -> None:
+        """
+        Test if the signed blob cache evicts the least recently used blob when it is full.
+        """
+        cache = SignedBlobCache(2)
+        cache.put(1, b"\x01")
+        cache.put(2, b"\x02")
+        cache.get(1)
+
+        cache.put(3, b"\x03")
+
+        self.assertEqual([b"\x01", None, b"\x03"], [cache.get(1), cache.get(2), cache.get(3)])
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
 from asyncio import sleep
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 from unittest.mock import AsyncMock, Mock, call
 
 from ipv8.test.base import TestBase
 from ipv8.test.REST.rest_base import MockRequest, response_to_json
 from multidict import MultiDict, MultiDictProxy
 
-from tribler.core.database.restapi.database_endpoint import DatabaseEndpoint, parse_bool
+from tribler.core.database.restapi.database_endpoint import DatabaseEndpoint, encode_cursor, parse_bool
 from tribler.core.database.serialization import REGULAR_TORRENT
 from tribler.core.restapi.rest_endpoint import HTTP_BAD_REQUEST
 
@@ -21,12 +21,13 @@ class TestDatabaseEndpoint(TestBase):
     Tests for the DatabaseEndpoint REST endpoint.
     """
 
-    async def mds_run_now(self, callback: Callable[[], tuple[dict, int, int]]) -> tuple[dict, int, int]:
+    async def mds_run_now(self, callback: Callable[..., tuple[dict, int, int]], *args: Any,  # noqa: ANN401
+                          **kwargs) -> tuple[dict, int, int]:
         """
         Run an mds callback immediately.
         """
         await sleep(0)
-        return callback()
+        return callback(*args, **kwargs)
 
     def test_sanitize(self) -> None:
         """
@@ -35,7 +36,7 @@ class TestDatabaseEndpoint(TestBase):
         soiled = MultiDictProxy(MultiDict([("first", "7"), ("last", "42"), ("sort_by", "name"), ("sort_desc", "0"),
                                            ("hide_xxx", "0"), ("category", "TEST"), ("origin_id", "13"),
                                            ("tags", "tag1"), ("tags", "tag2"), ("tags", "tag3"),
-                                           ("max_rowid", "1337"), ("channel_pk", "AA")]))
+                                           ("max_rowid", "1337"), ("channel_pk", "AA"), ("substring", "1")]))
 
         sanitized = DatabaseEndpoint.sanitize_parameters(soiled)
 
@@ -49,6 +50,7 @@ class TestDatabaseEndpoint(TestBase):
         self.assertEqual(["tag1", "tag2", "tag3"], sanitized["tags"])
         self.assertEqual(1337, sanitized["max_rowid"])
         self.assertEqual(b"\xaa", sanitized["channel_pk"])
+        self.assertTrue(sanitized["substring"])
 
     def test_parse_bool(self) -> None:
         """
@@ -172,9 +174,8 @@ class TestDatabaseEndpoint(TestBase):
         """
         endpoint = DatabaseEndpoint()
         endpoint.tribler_db = Mock()
-        endpoint.mds = Mock(run_threaded=self.mds_run_now, get_total_count=Mock(), get_max_rowid=Mock(),
-                            get_entries=Mock(return_value=[Mock(to_simple_dict=Mock(return_value={"test": "test",
-                                                                                                  "type": -1}))]))
+        endpoint.mds = Mock(run_threaded_read=self.mds_run_now, get_total_count=Mock(), get_max_rowid=Mock(),
+                            get_simple_entries_page=Mock(return_value=([{"test": "test", "type": -1}], [7])))
         request = MockRequest("/api/metadata/search/local", query={"fts_text": ""})
         request.context = [endpoint.mds]
 
@@ -194,10 +195,9 @@ class TestDatabaseEndpoint(TestBase):
         """
         endpoint = DatabaseEndpoint()
         endpoint.tribler_db = Mock()
-        endpoint.mds = Mock(run_threaded=self.mds_run_now, get_total_count=Mock(return_value=1),
+        endpoint.mds = Mock(run_threaded_read=self.mds_run_now, get_total_count=Mock(return_value=1),
                             get_max_rowid=Mock(return_value=7),
-                            get_entries=Mock(return_value=[Mock(to_simple_dict=Mock(return_value={"test": "test",
-                                                                                                  "type": -1}))]))
+                            get_simple_entries_page=Mock(return_value=([{"test": "test", "type": -1}], [7])))
         request = MockRequest("/api/metadata/search/local", query={"fts_text": "",
                                                                    "include_total": "I would like this"})
         request.context = [endpoint.mds]
@@ -212,8 +212,77 @@ class TestDatabaseEndpoint(TestBase):
         self.assertEqual(None, response_body_json["sort_by"])
         self.assertEqual(True, response_body_json["sort_desc"])
         self.assertEqual(1, response_body_json["total"])
+        self.assertTrue(response_body_json["total_exact"])
         self.assertEqual(7, response_body_json["max_rowid"])
 
+    async def test_local_search_approximate_total(self) -> None:
+        """
+        Test if performing a local search with requested approximate total, includes whether the total is exact.
+        """
+        endpoint = DatabaseEndpoint()
+        endpoint.mds = Mock(run_threaded_read=self.mds_run_now, get_approximate_total=Mock(return_value=(1000, False)),
+                            get_max_rowid=Mock(return_value=7),
+                            get_simple_entries_page=Mock(return_value=([{"test": "test", "type": -1}], [7])))
+        request = MockRequest("/api/metadata/search/local", query={"fts_text": "", "include_total": "1",
+                                                                   "approximate_total": "1"})
+        request.context = [endpoint.mds]
+
+        response = await endpoint.local_search(request)
+        response_body_json = await response_to_json(response)
+
+        self.assertEqual(200, response.status)
+        self.assertEqual(1000, response_body_json["total"])
+        self.assertFalse(response_body_json["total_exact"])
+        endpoint.mds.get_total_count.assert_not_called()
+
+    async def test_local_search_invalid_approximate_total(self) -> None:
+        """
+        Test if performing a local search with an invalid approximate total value leads to a HTTP_BAD_REQUEST status.
+        """
+        endpoint = DatabaseEndpoint()
+        request = MockRequest("/api/metadata/search/local", query={"fts_text": "", "include_total": "1",
+                                                                   "approximate_total": "yes please"})
+        request.context = [Mock()]
+
+        response = await endpoint.local_search(request)
+
+        self.assertEqual(HTTP_BAD_REQUEST, response.status)
+
+    async def test_local_search_cursor(self) -> None:
+        """
+        Test if a full page of results includes a cursor that continues after that page.
+        """
+        endpoint = DatabaseEndpoint()
+        endpoint.mds = Mock(run_threaded_read=self.mds_run_now,
+                            get_simple_entries_page=Mock(return_value=([{"test": "test", "type": -1}], [5, b"\x01"])))
+        request = MockRequest("/api/metadata/search/local", query={"fts_text": "", "first": "1", "last": "1",
+                                                                   "sort_by": "size"})
+        request.context = [endpoint.mds]
+
+        response = await endpoint.local_search(request)
+        response_body_json = await response_to_json(response)
+        next_request = MockRequest("/api/metadata/search/local", query={"fts_text": "", "first": "1", "last": "1",
+                                                                        "sort_by": "size",
+                                                                        "cursor": response_body_json["next_cursor"]})
+        next_request.context = [endpoint.mds]
+        await endpoint.local_search(next_request)
+
+        self.assertEqual([5, b"\x01"], endpoint.mds.get_simple_entries_page.call_args.kwargs["after"])
+
+    async def test_local_search_cursor_other_sort(self) -> None:
+        """
+        Test if a cursor for another sort order leads to a bad request status.
+        """
+        endpoint = DatabaseEndpoint()
+        cursor = encode_cursor("size", True, [5, 1])
+        request = MockRequest("/api/metadata/search/local", query={"fts_text": "", "sort_by": "name",
+                                                                   "cursor": cursor})
+        request.context = [endpoint.mds]
+
+        response = await endpoint.local_search(request)
+
+        self.assertEqual(HTTP_BAD_REQUEST, response.status)
+
     async def test_completions_bad_query(self) -> None:
         """
         Test if a missing query leads to a bad request status.
@@ -231,7 +300,7 @@ class TestDatabaseEndpoint(TestBase):
         Test if a normal lowercase search leads to results.
         """
         endpoint = DatabaseEndpoint()
-        endpoint.mds = Mock(get_auto_complete_terms=Mock(return_value=["test1", "test2"]))
+        endpoint.mds = Mock(run_threaded_read=self.mds_run_now, get_auto_complete_terms=Mock(return_value=["test1", "test2"]))
         request = MockRequest("/api/metadata/search/completions", query={"q": "test"})
         request.context = [endpoint.mds]
 
@@ -247,7 +316,7 @@ class TestDatabaseEndpoint(TestBase):
         Test if a mixed case search leads to results.
         """
         endpoint = DatabaseEndpoint()
-        endpoint.mds = Mock(get_auto_complete_terms=Mock(return_value=["test1", "test2"]))
+        endpoint.mds = Mock(run_threaded_read=self.mds_run_now, get_auto_complete_terms=Mock(return_value=["test1", "test2"]))
         request = MockRequest("/api/metadata/search/completions", query={"q": "TeSt"})
         request.context = [endpoint.mds]
 
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+from time import time
+from unittest.mock import AsyncMock, Mock, patch
+
+from ipv8.keyvault.crypto import default_eccrypto
+from ipv8.test.base import TestBase
+from pony.orm import db_session
+
+from tribler.core.database.maintenance import OPERATION_INTERVALS, DatabaseMaintenance
+from tribler.core.database.store import MetadataStore
+
+
+class TestDatabaseMaintenance(TestBase):
+    """
+    Tests for the DatabaseMaintenance class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a metadata store on disk, so that it has a write-ahead log.
+        """
+        super().setUp()
+        self.metadata_store = MetadataStore(os.path.join(self.temporary_directory(), "metadata.db"),
+                                            default_eccrypto.generate_key("curve25519"))
+        self.maintenance = DatabaseMaintenance(self.metadata_store, Mock())
+
+    async def tearDown(self) -> None:
+        """
+        Shut down the metadata store.
+        """
+        self.metadata_store.shutdown()
+        await super().tearDown()
+
+    async def test_run_all_operations(self) -> None:
+        """
+        Test if all operations run to completion when the database is idle.
+        """
+        with db_session:
+            for i in range(100):
+                self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": bytes([i]) * 20,
+                                                                       "title": f"torrent {i}"})
+        with db_session:
+            self.metadata_store.db.execute("DELETE FROM ChannelNode")
+        self.metadata_store.last_write_time = 0.0
+
+        await self.maintenance.run()
+        stats = self.maintenance.get_stats()
+        with db_session:
+            analyzed = self.metadata_store.db.select("SELECT count(*) FROM sqlite_stat1")[0]
+            free_pages = self.metadata_store.db.execute("PRAGMA freelist_count").fetchone()[0]
+
+        self.assertEqual(set(OPERATION_INTERVALS), set(stats))
+        self.assertTrue(all(operation["complete"] for operation in stats.values()))
+        self.assertGreater(analyzed, 0)
+        self.assertEqual(0, free_pages)
+
+    async def test_completion_terms(self) -> None:
+        """
+        Test if the title words of entries that were not ingested from other peers become completions, in batches.
+        """
+        with db_session:
+            for i in range(3):
+                self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": bytes([i]) * 20,
+                                                                       "title": f"ubuntu {i}"})
+
+        with patch("tribler.core.database.maintenance.COMPLETION_TERM_BATCH_SIZE", 2):
+            entries_left = [await self.maintenance.completion_terms(), await self.maintenance.completion_terms()]
+
+        self.assertEqual([True, False], entries_left)
+        self.assertEqual(["ubuntu"], self.metadata_store.get_auto_complete_terms("ubu", max_terms=5))
+        with db_session:
+            self.assertEqual("3", self.metadata_store.get_value("completion_term_rowid"))
+
+    async def test_run_not_idle(self) -> None:
+        """
+        Test if no operations run if the database was written to recently.
+        """
+        self.metadata_store.last_write_time = time()
+
+        await self.maintenance.run()
+
+        self.assertEqual({}, self.maintenance.get_stats())
+
+    async def test_run_operation_budget(self) -> None:
+        """
+        Test if an operation stops when its time budget is spent and continues in the next idle window.
+        """
+        self.maintenance.time_budget = 0
+        self.maintenance.fts_merge = AsyncMock(return_value=True)
+        self.metadata_store.last_write_time = 0.0
+
+        await self.maintenance.run()
+        self.metadata_store.last_write_time = 0.0
+        await self.maintenance.run()
+
+        self.assertEqual(2, self.maintenance.fts_merge.call_count)
+        self.assertEqual(1, self.maintenance.get_stats()["fts_merge"]["steps"])
+        self.assertFalse(self.maintenance.get_stats()["fts_merge"]["complete"])
+        self.assertEqual(1, self.maintenance.get_stats()["wal_checkpoint"]["steps"])
+
+    async def test_run_operation_failure(self) -> None:
+        """
+        Test if a failing operation is recorded as incomplete.
+        """
+        self.maintenance.analyze = AsyncMock(side_effect=RuntimeError)
+
+        await self.maintenance.run_operation("analyze")
+
+        self.assertEqual(0, self.maintenance.get_stats()["analyze"]["steps"])
+        self.assertFalse(self.maintenance.get_stats()["analyze"]["complete"])
+
+    async def test_evict(self) -> None:
+        """
+        Test if torrents are evicted until the database is within its maximum number of torrents.
+        """
+        with db_session:
+            for i in range(5):
+                self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": bytes([i]) * 20,
+                                                                       "title": f"torrent {i}"})
+        maintenance = DatabaseMaintenance(self.metadata_store, Mock(), max_torrents=2,
+                                          get_protected_infohashes=lambda: [b"\x00" * 20])
+
+        await maintenance.evict()
+        with db_session:
+            titles = sorted(entry.title for entry in self.metadata_store.TorrentMetadata.select())
+
+        self.assertEqual(["torrent 0", "torrent 4"], titles)
+        self.assertEqual(3, maintenance.get_stats()["eviction"]["evicted"])
+        self.assertTrue(maintenance.get_stats()["eviction"]["complete"])
+
+    async def test_evict_all_protected(self) -> None:
+        """
+        Test if eviction stops if the database is too large, but all torrents are protected.
+        """
+        with db_session:
+            self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x01" * 20, "title": "torrent"})
+        maintenance = DatabaseMaintenance(self.metadata_store, Mock(), max_size=1,
+                                          get_protected_infohashes=lambda: [b"\x01" * 20])
+
+        await maintenance.evict()
+
+        self.assertEqual(0, maintenance.get_stats()["eviction"]["evicted"])
+        self.assertFalse(maintenance.get_stats()["eviction"]["complete"])
+
+    def test_start_unbounded(self) -> None:
+        """
+        Test if the eviction job is only registered for a bounded database.
+        """
+        self.maintenance.start()
+
+        self.assertEqual(["Database maintenance"], [call.args[0] for call in
+                                                    self.maintenance.task_manager.register_task.call_args_list])
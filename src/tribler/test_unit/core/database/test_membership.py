@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from ipv8.test.base import TestBase
+
+from tribler.core.database.membership import MembershipFilter, entry_key
+
+
+class TestMembershipFilter(TestBase):
+    """
+    Tests for the MembershipFilter class.
+    """
+
+    def test_added_keys_present(self) -> None:
+        """
+        Test if all added keys are reported as present.
+        """
+        membership_filter = MembershipFilter(1000)
+        keys = [i.to_bytes(20, "big") for i in range(1000)]
+
+        membership_filter.update(keys)
+
+        self.assertTrue(all(key in membership_filter for key in keys))
+        self.assertEqual(1000, membership_filter.get_stats()["keys"])
+
+    def test_false_positive_rate(self) -> None:
+        """
+        Test if a filter at capacity reports few absent keys as present, close to its estimated rate.
+        """
+        membership_filter = MembershipFilter(1000)
+        membership_filter.update(i.to_bytes(20, "big") for i in range(1000))
+
+        false_positives = sum(i.to_bytes(20, "big") in membership_filter for i in range(1000, 11000))
+        stats = membership_filter.get_stats()
+
+        self.assertLess(false_positives / 10000, 0.03)
+        self.assertLess(stats["false_positive_rate"], 0.03)
+        self.assertEqual(10000, stats["lookups"])
+        self.assertEqual(10000 - false_positives, stats["absent"])
+
+    def test_reset(self) -> None:
+        """
+        Test if a filter can be emptied and resized.
+        """
+        membership_filter = MembershipFilter(10)
+        membership_filter.add(b"\x01" * 20)
+
+        membership_filter.reset(10000)
+
+        self.assertNotIn(b"\x01" * 20, membership_filter)
+        self.assertEqual({"keys": 0, "capacity": 10000, "memory": 12544}, {
+            key: value for key, value in membership_filter.get_stats().items() if key in {"keys", "capacity", "memory"}
+        })
+
+    def test_entry_key(self) -> None:
+        """
+        Test if entry keys do not collide with infohashes.
+        """
+        self.assertEqual(b"\x01" * 12 + (7).to_bytes(8, "big"), entry_key(b"\x01" * 12, 7))
+        self.assertNotEqual(20, len(entry_key(b"", 7)))
@@ -7,9 +7,13 @@ from ipv8.test.base import TestBase
 from tribler.core.database.ranks import (
     find_word_and_rotate_title,
     freshness_rank,
+    freshness_ranks,
     seeders_rank,
+    seeders_ranks,
     title_rank,
+    title_ranks,
     torrent_rank,
+    torrent_ranks,
 )
 
 
@@ -202,3 +206,41 @@ class TestRanks(TestBase):
 
         self.assertEqual((False, 0), find_word_and_rotate_title("B", title))
         self.assertEqual(deque(["A", "C", "X"]), title)
+
+    def test_torrent_ranks_parity(self) -> None:
+        """
+        Test if the batched torrent ranks are identical to the ranks of the single torrent rank function.
+        """
+        titles = ["Big Buck Bunny", "Big Buck Bunny 1080p", "Bunny Big Buck", None, "", "Something else"]
+        seeders = [0, 1000, None, 5, 10, 3]
+        leechers = [0, 10, 3, None, 1, 0]
+        freshness = [None, -1, 0, 3600, 86400 * 365, 12.5]
+
+        expected = [torrent_rank("Big Buck Bunny", *values)
+                    for values in zip(titles, seeders, leechers, freshness, strict=True)]
+
+        self.assertEqual(expected, torrent_ranks("Big Buck Bunny", titles, seeders, leechers, freshness))
+
+    def test_title_ranks(self) -> None:
+        """
+        Test if the batched title ranks are identical to the ranks of the single title rank function.
+        """
+        titles = ["Big Buck Bunny", "Aji Ayvl Aybbu", "Bunny"]
+
+        self.assertEqual([title_rank("Big Buck Bunny", title) for title in titles],
+                         title_ranks("Big Buck Bunny", titles))
+
+    def test_seeders_ranks(self) -> None:
+        """
+        Test if the batched seeders ranks treat missing values as zero.
+        """
+        self.assertEqual([seeders_rank(0, 0), seeders_rank(10, 0), seeders_rank(10, 100)],
+                         seeders_ranks([None, 10, 10], [0, None, 100]))
+
+    def test_freshness_ranks(self) -> None:
+        """
+        Test if the batched freshness ranks are identical to the ranks of the single freshness rank function.
+        """
+        freshness = [None, -1, 0, 10, 86400]
+
+        self.assertEqual([freshness_rank(f) for f in freshness], freshness_ranks(freshness))
@@ -6,11 +6,14 @@ from ipv8.keyvault.crypto import default_eccrypto
 from ipv8.test.base import TestBase
 
 from tribler.core.database.serialization import (
+    COLLECTION_NODE,
     REGULAR_TORRENT,
+    CollectionNodePayload,
     HealthItemsPayload,
     SignedPayload,
     TorrentMetadataPayload,
     UnknownBlobTypeException,
+    decode_payload_batch,
     int2time,
     read_payload_with_offset,
     time2int,
@@ -69,6 +72,47 @@ class TestSerialization(TestBase):
         self.assertEqual(payload.tags, unserialized.tags)
         self.assertEqual(payload.tracker_info, unserialized.tracker_info)
 
+    def test_decode_payload_batch(self) -> None:
+        """
+        Test if a batch decodes the same torrent payloads as read_payload_with_offset and skips deprecated payloads.
+        """
+        private_key = default_eccrypto.generate_key("curve25519")
+        payloads = [TorrentMetadataPayload(metadata_type=REGULAR_TORRENT, reserved_flags=0, public_key=b"\x00" * 64,
+                                           id_=i, origin_id=1337, timestamp=10, infohash=bytes([i]) * 20, size=42,
+                                           torrent_date=int2time(i), title=f"t\u00eftle {i}", tags="tags",
+                                           tracker_info="") for i in range(3)]
+        payloads[1].add_signature(private_key)
+        deprecated = CollectionNodePayload(COLLECTION_NODE, 0, b"\x00" * 64, 1, 0, 0, "title", "tags", 0)
+        data = b"".join(payload.serialized() + payload.signature
+                        for payload in [payloads[0], deprecated, payloads[1], payloads[2]])
+
+        batch = decode_payload_batch(data)
+        decoded = list(batch)
+
+        self.assertEqual(3, len(batch))
+        self.assertEqual([payload.to_dict() for payload in payloads], [payload.to_dict() for payload in decoded])
+        self.assertEqual([False, True, False], [batch.has_signature(i) for i in range(3)])
+        self.assertTrue(batch.check_signature(1))
+        self.assertEqual(payloads[1].serialized(), batch.get_signed_data(1))
+
+    def test_decode_payload_batch_unknown(self) -> None:
+        """
+        Test if a batch with an unknown payload format throws a UnknownBlobTypeException.
+        """
+        with self.assertRaises(UnknownBlobTypeException):
+            decode_payload_batch(b"\xFF\xFF")
+
+    def test_decode_payload_batch_truncated(self) -> None:
+        """
+        Test if a batch with a payload that is cut short throws a ValueError.
+        """
+        payload = TorrentMetadataPayload(metadata_type=REGULAR_TORRENT, reserved_flags=0, public_key=b"\x00" * 64,
+                                         id_=7, origin_id=1337, timestamp=10, infohash=b"\x01" * 20, size=42,
+                                         torrent_date=int2time(0), title="test", tags="tags", tracker_info="")
+
+        with self.assertRaises(ValueError):
+            decode_payload_batch(payload.serialized() + payload.signature[:10])
+
     def test_signed_payload_sign(self) -> None:
         """
         Test if signing a SignedPayload and unpacking it, leads to the same payload.
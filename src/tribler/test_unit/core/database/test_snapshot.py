@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import lz4.frame
+from ipv8.keyvault.crypto import default_eccrypto
+from ipv8.test.base import TestBase
+from pony.orm import db_session
+
+from tribler.core.database.serialization import REGULAR_TORRENT, TorrentMetadataPayload, int2time
+from tribler.core.database.snapshot import export_snapshot, import_snapshot
+from tribler.core.database.store import MetadataStore
+from tribler.core.torrent_checker.healthdataclasses import HealthInfo
+
+
+class TestSnapshot(TestBase):
+    """
+    Tests for the snapshot export and import.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a metadata store with a signed torrent and two free-for-all torrents, and an empty metadata store.
+        """
+        super().setUp()
+        directory = Path(self.temporary_directory())
+        self.path = directory / "snapshot.lz4"
+        self.source = MetadataStore(directory / "source.db", default_eccrypto.generate_key("curve25519"))
+        self.target = MetadataStore(directory / "target.db", default_eccrypto.generate_key("curve25519"),
+                                    substring_search=True)
+        private_key = default_eccrypto.generate_key("curve25519")
+        self.signed = TorrentMetadataPayload(REGULAR_TORRENT, 0, private_key.pub().key_to_bin()[10:], 7, 0, 10,
+                                             b"\x01" * 20, 42, int2time(1000), "signed ubuntu", "video", "")
+        self.signed.add_signature(private_key)
+        self.source.process_payloads([self.signed])
+        with db_session:
+            self.source.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x02" * 20, "title": "free debian"})
+            self.source.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x03" * 20, "title": "free fedora"})
+            self.source.process_torrent_health(HealthInfo(b"\x02" * 20, seeders=7, leechers=3, last_check=1000))
+
+    async def tearDown(self) -> None:
+        """
+        Shut down the metadata stores.
+        """
+        self.source.shutdown()
+        self.target.shutdown()
+        await super().tearDown()
+
+    def test_round_trip(self) -> None:
+        """
+        Test if the torrents, their signatures and health, are imported and indexed, and only once.
+        """
+        exported = export_snapshot(self.source, self.path, batch_size=2)
+        imported = import_snapshot(self.target, self.path)
+        imported_again = import_snapshot(self.target, self.path)
+
+        with db_session:
+            signed = self.target.TorrentMetadata.get(infohash=b"\x01" * 20)
+            health = self.target.TorrentMetadata.get(infohash=b"\x02" * 20).health
+            found = {entry.title for entry in self.target.get_entries(txt_filter='"free"')}
+            substring = {entry.title for entry in self.target.get_entries(txt_filter='"edor"', substring=True)}
+            self.assertEqual((self.signed.public_key, self.signed.signature, 42),
+                             (signed.public_key, signed.signature, signed.size))
+            self.assertEqual((7, 3, 1000), (health.seeders, health.leechers, health.last_check))
+        self.assertEqual((3, 3, 0), (exported, imported, imported_again))
+        self.assertEqual({"free debian", "free fedora"}, found)
+        self.assertEqual({"free fedora"}, substring)
+        self.assertEqual(3, self.target.get_num_torrents())
+        self.assertEqual(["fedora"], self.target.get_auto_complete_terms("fed", 5))
+
+    def test_invalid_signature(self) -> None:
+        """
+        Test if torrents with an invalid signature are not imported.
+        """
+        export_snapshot(self.source, self.path)
+        with lz4.frame.open(self.path, "rb") as file:
+            data = file.read()
+        with lz4.frame.open(self.path, "wb") as file:
+            file.write(data.replace(b"signed ubuntu", b"signed fedora"))
+
+        imported = import_snapshot(self.target, self.path)
+
+        self.assertEqual(2, imported)
+        self.assertEqual(2, self.target.get_num_torrents())
+
+    def test_truncated(self) -> None:
+        """
+        Test if a truncated snapshot is refused without importing any of its torrents.
+        """
+        export_snapshot(self.source, self.path)
+        with lz4.frame.open(self.path, "rb") as file:
+            data = file.read()
+        with lz4.frame.open(self.path, "wb") as file:
+            file.write(data[:-8])
+
+        self.assertRaises(ValueError, import_snapshot, self.target, self.path)
+        self.assertEqual(0, self.target.get_num_torrents())
+        with db_session:
+            triggers = self.target.db.select("name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'fts_%'")
+        self.assertEqual(6, len(triggers))
@@ -1,14 +1,43 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import threading
+from itertools import product
+from time import time
+from unittest.mock import Mock, call, patch
+
 from ipv8.community import Community, CommunitySettings
 from ipv8.keyvault.crypto import default_eccrypto
 from ipv8.test.base import TestBase
 from ipv8.test.mocking.ipv8 import MockIPv8
-from pony.orm import db_session
+from lz4.frame import compress
+from pony.orm import OperationalError, db_session
+from pony.orm.core import UnexpectedError
 
+from tribler.core.database.membership import entry_key
 from tribler.core.database.orm_bindings.torrent_metadata import entries_to_chunk
-from tribler.core.database.serialization import NULL_KEY, int2time
-from tribler.core.database.store import MetadataStore, ObjState
+from tribler.core.database.query_templates import TRIGRAM_INDEX, WORD_INDEX, plan_text_search
+from tribler.core.database.ranks import torrent_rank
+from tribler.core.database.serialization import (
+    CHANNEL_TORRENT,
+    NULL_KEY,
+    REGULAR_TORRENT,
+    SNIPPET,
+    TorrentMetadataPayload,
+    int2time,
+)
+from tribler.core.database.store import (
+    CURRENT_DB_VERSION,
+    Lane,
+    MetadataStore,
+    ObjState,
+    PriorityExecutor,
+    WriteCommand,
+    WriteQueue,
+)
+from tribler.core.notifier import Notification, Notifier
+from tribler.core.torrent_checker.healthdataclasses import HealthInfo
 
 
 class MockCommunity(Community):
@@ -57,6 +86,7 @@ class TestMetadataStore(TestBase[MockCommunity]):
         uncompressed = self.metadata_store.process_compressed_mdblob(chunk, skip_personal_metadata_payload=False)
 
         self.assertEqual(signatures, [d.md_obj.signature for d in uncompressed])
+        self.assertEqual(["test torrent"], self.metadata_store.get_auto_complete_terms("test tor", max_terms=5))
 
     @db_session
     def test_squash_mdblobs_multiple_chunks(self) -> None:
@@ -206,8 +236,121 @@ class TestMetadataStore(TestBase[MockCommunity]):
                                                                "title": "abcabc",
                                                                "tracker_info": b"http://tracker/announce"})
 
+    def test_verify_payloads(self) -> None:
+        """
+        Test if only payloads with a bad signature are removed, in slices over multiple threads.
+        """
+        other_key = default_eccrypto.generate_key("curve25519")
+        payloads = [TorrentMetadataPayload(REGULAR_TORRENT, 0, NULL_KEY, i, 0, i, bytes([i + 1]) * 20, i,
+                                           int2time(i), f"title {i}", "", "") for i in range(7)]
+        for payload in payloads[:5]:
+            payload.add_signature(other_key)
+        payloads[1].title = "tampered"
+
+        with patch("tribler.core.database.store.VERIFY_THREADS", 3):
+            verified = self.metadata_store.verify_payloads(payloads)
+
+        self.assertEqual([payloads[0], *payloads[2:]], verified)
+
+    def test_process_squashed_mdblob_forged_health(self) -> None:
+        """
+        Test if the health of valid entries is kept when a blob also holds an entry with a bad signature.
+        """
+        other_key = default_eccrypto.generate_key("curve25519")
+        payloads = [TorrentMetadataPayload(REGULAR_TORRENT, 0, NULL_KEY, i, 0, i, bytes([i + 1]) * 20, i,
+                                           int2time(i), f"title {i}", "", "") for i in range(3)]
+        payloads[0].add_signature(other_key)
+        payloads[0].title = "tampered"
+        chunk = b"".join(payload.serialized() + payload.signature for payload in payloads)
+
+        self.metadata_store.process_squashed_mdblob(chunk, health_info=[(1, 10, 100), (2, 20, 200), (3, 30, 300)])
+
+        with db_session:
+            self.assertIsNone(self.metadata_store.TorrentState.get(infohash=payloads[0].infohash))
+            for payload, seeders in zip(payloads[1:], [2, 3], strict=True):
+                health = self.metadata_store.TorrentState.get(infohash=payload.infohash)
+                self.assertEqual(seeders, health.seeders)
+
+    def test_process_payloads_parity(self) -> None:
+        """
+        Test if processing payloads in bulk gives the same results and rows as processing them one by one.
+        """
+        other_key = default_eccrypto.generate_key("curve25519")
+        payloads = []
+        for i, (key, tracker_info) in enumerate([(other_key, "http://tracker.org/announce"), (None, ""),
+                                                 (other_key, "udp://tracker.org:80"), (None, "invalid tracker")]):
+            payload = TorrentMetadataPayload(REGULAR_TORRENT, 0, NULL_KEY, i, 0, i, bytes([i + 1]) * 20, i,
+                                             int2time(i), f"title {i}", "tag", tracker_info)
+            if key is not None:
+                payload.add_signature(key)
+            payloads.append(payload)
+        # A duplicate signed entry, a duplicate unsigned entry, and an unsigned entry for a known infohash
+        payloads += [payloads[0], payloads[1], TorrentMetadataPayload(REGULAR_TORRENT, 0, NULL_KEY, 9, 0, 9,
+                                                                      payloads[2].infohash, 9, int2time(9), "", "", "")]
+        stores = [self.metadata_store, MetadataStore(":memory:", self.private_key(0), check_tables=False)]
+        select_rows = """
+            SELECT cn.infohash, cn.size, cn.torrent_date, cn.tracker_info, cn.title, cn.tags, cn.public_key, cn.id_,
+                   cn.timestamp, cn.signature, ts.infohash, tr.url
+            FROM ChannelNode cn JOIN TorrentState ts ON cn.health = ts.rowid
+            LEFT JOIN TorrentState_TrackerState tts ON tts.torrentstate = ts.rowid
+            LEFT JOIN TrackerState tr ON tr.rowid = tts.trackerstate
+            ORDER BY cn.rowid
+        """
+
+        with db_session:
+            bulk = [(r.obj_state, r.md_obj.infohash, r.md_obj.public_key, r.md_obj.signature)
+                    for r in stores[0].process_payloads(payloads)]
+            bulk_rows = stores[0].db.execute(select_rows).fetchall()
+        with db_session:
+            single = [(r.obj_state, r.md_obj.infohash, r.md_obj.public_key, r.md_obj.signature)
+                      for payload in payloads for r in stores[1].process_payload(payload)]
+            stores[1].db.flush()
+            single_rows = stores[1].db.execute(select_rows).fetchall()
+
+        self.assertEqual(5, len(bulk))
+        self.assertEqual(single, bulk)
+        self.assertEqual(single_rows, bulk_rows)
+
+    def test_process_payloads_filter_miss(self) -> None:
+        """
+        Test if payloads of rows that are missing from the membership filter are recognized instead of failing.
+        """
+        payloads = [TorrentMetadataPayload(REGULAR_TORRENT, 0, NULL_KEY, 0, 0, 0, bytes([i + 1]) * 20, i,
+                                           int2time(i), f"title {i}", "tag", "") for i in range(2)]
+        with db_session:
+            self.metadata_store.process_payloads(payloads[:1], verified=True)
+        self.metadata_store.membership_filter.reset(10)
+
+        with db_session:
+            results = self.metadata_store.process_payloads(payloads, verified=True)
+
+        self.assertEqual([ObjState.NEW_OBJECT], [result.obj_state for result in results])
+        self.assertEqual(2, self.metadata_store.get_num_torrents())
+        self.assertIn(payloads[0].infohash, self.metadata_store.membership_filter)
+
+    def test_process_payloads_shared_trackers(self) -> None:
+        """
+        Test if the entries of a batch with (differently spelled) shared tracker URLs are linked to the same trackers.
+        """
+        with db_session:
+            self.metadata_store.TrackerState(url="udp://tracker.org:80")
+        tracker_infos = ["http://tracker.org/announce", "http://tracker.org:80/announce/", "udp://tracker.org:80",
+                         "http://tracker.org/announce", ""]
+        payloads = [TorrentMetadataPayload(REGULAR_TORRENT, 0, NULL_KEY, 0, 0, 0, bytes([i + 1]) * 20, i,
+                                           int2time(i), f"title {i}", "tag", tracker_info)
+                    for i, tracker_info in enumerate(tracker_infos)]
+
+        with db_session:
+            self.metadata_store.process_payloads(payloads, verified=True)
+            trackers = self.metadata_store.db.execute("""
+                SELECT tr.url, COUNT(*) FROM TrackerState tr
+                JOIN TorrentState_TrackerState tts ON tts.trackerstate = tr.rowid GROUP BY tr.url
+            """).fetchall()
+
+        self.assertEqual([("http://tracker.org/announce", 3), ("udp://tracker.org:80", 1)], sorted(trackers))
+
     @db_session
-    def test_get_entries_query_sort_by_size(self) -> None:
+    def test_get_entries_sort_by_size(self) -> None:
         """
         Test if entries are properly sorted by size.
         """
@@ -215,13 +358,13 @@ class TestMetadataStore(TestBase[MockCommunity]):
         self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xcd" * 20, "title": "def", "size": 1})
         self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xef" * 20, "title": "ghi", "size": 10})
 
-        ordered1, ordered2, ordered3 = self.metadata_store.get_entries_query(sort_by="size", sort_desc=True)[:]
+        ordered1, ordered2, ordered3 = self.metadata_store.get_entries(sort_by="size", sort_desc=True)
         self.assertEqual(20, ordered1.size)
         self.assertEqual(10, ordered2.size)
         self.assertEqual(1, ordered3.size)
 
     @db_session
-    def test_get_entries_query_deprecated(self) -> None:
+    def test_get_entries_deprecated(self) -> None:
         """
         Test if the get entries query ignores invalid arguments.
         """
@@ -229,14 +372,14 @@ class TestMetadataStore(TestBase[MockCommunity]):
         self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xcd" * 20, "title": "def", "size": 1})
         self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xef" * 20, "title": "ghi", "size": 10})
 
-        ordered1, ordered2, ordered3 = self.metadata_store.get_entries_query(sort_by="size", sort_desc=True,
-                                                                             exclude_deleted="1")[:]
+        ordered1, ordered2, ordered3 = self.metadata_store.get_entries(sort_by="size", sort_desc=True,
+                                                                             exclude_deleted="1")
         self.assertEqual(20, ordered1.size)
         self.assertEqual(10, ordered2.size)
         self.assertEqual(1, ordered3.size)
 
     @db_session
-    def test_get_entries_query_tags(self) -> None:
+    def test_get_entries_tags(self) -> None:
         """
         Test if entries can be fetched by partial tags.
         """
@@ -247,12 +390,12 @@ class TestMetadataStore(TestBase[MockCommunity]):
         self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xef" * 20, "title": "ghi", "size": 1,
                                                                "tags": "tag4,tag3"})
 
-        ordered1, ordered2 = self.metadata_store.get_entries_query(sort_by="size", tags=["tag4"])[:]
+        ordered1, ordered2 = self.metadata_store.get_entries(sort_by="size", tags=["tag4"])
         self.assertEqual(3, ordered1.size)
         self.assertEqual(1, ordered2.size)
 
     @db_session
-    def test_get_entries_query_category(self) -> None:
+    def test_get_entries_category(self) -> None:
         """
         Test if entries can be fetched by category (single tag).
         """
@@ -263,12 +406,12 @@ class TestMetadataStore(TestBase[MockCommunity]):
         self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xef" * 20, "title": "ghi", "size": 1,
                                                                "tags": "tag4,tag3"})
 
-        ordered1, ordered2 = self.metadata_store.get_entries_query(sort_by="size", tags=["tag2"])[:]
+        ordered1, ordered2 = self.metadata_store.get_entries(sort_by="size", tags=["tag2"])
         self.assertEqual(3, ordered1.size)
         self.assertEqual(2, ordered2.size)
 
     @db_session
-    def test_get_entries_query_tags_multiple(self) -> None:
+    def test_get_entries_tags_multiple(self) -> None:
         """
         Test if entries can be fetched by multiple tags.
         """
@@ -279,5 +422,724 @@ class TestMetadataStore(TestBase[MockCommunity]):
         self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xef" * 20, "title": "ghi", "size": 1,
                                                                "tags": "tag4,tag3"})
 
-        ordered1, = self.metadata_store.get_entries_query(sort_by="size", tags=["tag1", "tag2"])[:]
+        ordered1, = self.metadata_store.get_entries(sort_by="size", tags=["tag1", "tag2"])
         self.assertEqual(3, ordered1.size)
+
+    @db_session
+    def test_torrent_tags_follow_updates(self) -> None:
+        """
+        Test if the normalized tags are kept in sync with the comma-separated tags.
+        """
+        entry = self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xab" * 20, "title": "abc",
+                                                                       "tags": 'tag1,"tag\\2",,tag1'})
+        select_tags = "SELECT tag FROM TorrentTag WHERE torrent_rowid = $entry.rowid ORDER BY tag"
+
+        self.metadata_store.db.flush()
+        tags_on_insert = [tag for tag, in self.metadata_store.db.execute(select_tags)]
+        entry.tags = "tag3"
+        self.metadata_store.db.flush()
+        tags_on_update = [tag for tag, in self.metadata_store.db.execute(select_tags)]
+        entry.delete()
+        self.metadata_store.db.flush()
+        tags_on_delete = [tag for tag, in self.metadata_store.db.execute(select_tags)]
+
+        self.assertEqual(['"tag\\2"', "tag1"], tags_on_insert)
+        self.assertEqual(["tag3"], tags_on_update)
+        self.assertEqual([], tags_on_delete)
+
+    @db_session
+    def test_get_entries_tags_exact(self) -> None:
+        """
+        Test if tags only match complete tags and not substrings of tags.
+        """
+        self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xab" * 20, "title": "abc",
+                                                               "tags": "Video,subtag"})
+
+        self.assertEqual(1, self.metadata_store.get_entries_count(category="Video"))
+        self.assertEqual(0, self.metadata_store.get_entries_count(category="tag"))
+        self.assertEqual(0, self.metadata_store.get_entries_count(tags=["Video", "tag"]))
+
+    def test_migrate_torrent_tags(self) -> None:
+        """
+        Test if the comma-separated tags of an older database are migrated into the normalized tag table.
+        """
+        db_path = os.path.join(self.temporary_directory(), "metadata.db")
+        metadata_store = MetadataStore(db_path, self.private_key(0), db_version=15)
+        with db_session:
+            metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xab" * 20, "title": "abc",
+                                                              "tags": "tag1,tag2"})
+            metadata_store.db.execute("DROP TABLE TorrentTag")
+        metadata_store.shutdown()
+
+        metadata_store = MetadataStore(db_path, self.private_key(0))
+        with db_session:
+            num_tagged = metadata_store.get_entries_count(tags=["tag1", "tag2"])
+            db_version = metadata_store.get_value("db_version")
+        metadata_store.shutdown()
+
+        self.assertEqual(1, num_tagged)
+        self.assertEqual(str(CURRENT_DB_VERSION), db_version)
+
+    def test_entry_counts_follow_changes(self) -> None:
+        """
+        Test if the entry counts follow inserted, updated, and deleted entries.
+        """
+        with db_session:
+            entry1 = self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xab" * 20, "title": "abc"})
+            entry2 = self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xcd" * 20, "title": "def"})
+        with db_session:
+            num_added = self.metadata_store.get_num_torrents()
+            self.metadata_store.db.execute("UPDATE ChannelNode SET metadata_type = $snippet WHERE rowid = $rowid",
+                                           globals={}, locals={"snippet": SNIPPET, "rowid": entry1.rowid})
+        with db_session:
+            num_updated = self.metadata_store.get_num_torrents()
+            self.metadata_store.TorrentMetadata.get(rowid=entry2.rowid).delete()
+        with db_session:
+            num_deleted = self.metadata_store.get_entry_count()
+
+        self.assertEqual(2, num_added)
+        self.assertEqual(1, num_updated)
+        self.assertEqual(1, num_deleted)
+
+    def test_migrate_entry_counts(self) -> None:
+        """
+        Test if the entries of an older database are counted into the entry count table.
+        """
+        db_path = os.path.join(self.temporary_directory(), "metadata.db")
+        metadata_store = MetadataStore(db_path, self.private_key(0), db_version=16)
+        with db_session:
+            metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xab" * 20, "title": "abc"})
+            metadata_store.db.execute("DROP TABLE EntryCount")
+        metadata_store.shutdown()
+
+        metadata_store = MetadataStore(db_path, self.private_key(0))
+        with db_session:
+            num_torrents = metadata_store.get_num_torrents()
+            db_version = metadata_store.get_value("db_version")
+        metadata_store.shutdown()
+
+        self.assertEqual(1, num_torrents)
+        self.assertEqual(str(CURRENT_DB_VERSION), db_version)
+
+    @db_session
+    def test_get_entries_popular(self) -> None:
+        """
+        Test if only fresh torrents with peers are popular.
+        """
+        now = int(time())
+        for i, (seeders, last_check) in enumerate([(5, now), (0, now), (9, now - 2 * 24 * 3600), (7, now - 60)]):
+            entry = self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": bytes([i]) * 20,
+                                                                           "title": f"torrent {i}"})
+            entry.health.set(seeders=seeders, leechers=0, last_check=last_check)
+        self.metadata_store.db.flush()
+
+        popular = self.metadata_store.get_entries(metadata_type=REGULAR_TORRENT, popular=True)
+
+        self.assertEqual({"torrent 0", "torrent 3"}, {entry.title for entry in popular})
+
+    @db_session
+    def test_popular_torrents_follow_health(self) -> None:
+        """
+        Test if the popular torrents table follows health updates and prunes stale swarms.
+        """
+        now = int(time())
+        entry = self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x01" * 20, "title": "abc"})
+        entry.health.set(seeders=3, leechers=1, last_check=now)
+        self.metadata_store.db.flush()
+        rows_fresh = self.metadata_store.db.select("SELECT seeders, leechers FROM PopularTorrent")
+        entry.health.set(seeders=0, leechers=0, last_check=now)
+        self.metadata_store.db.flush()
+        rows_dead = self.metadata_store.db.select("SELECT seeders FROM PopularTorrent")
+        entry.health.set(seeders=4, leechers=0, last_check=now - 2 * 24 * 3600)
+        self.metadata_store.db.flush()
+        rows_stale = self.metadata_store.db.select("SELECT seeders FROM PopularTorrent")
+
+        self.assertEqual([(3, 1)], rows_fresh)
+        self.assertEqual([], rows_dead)
+        self.assertEqual([], rows_stale)
+
+    def test_migrate_popular_torrents(self) -> None:
+        """
+        Test if the fresh swarms of an older database are inserted into the popular torrents table.
+        """
+        db_path = os.path.join(self.temporary_directory(), "metadata.db")
+        metadata_store = MetadataStore(db_path, self.private_key(0), db_version=17)
+        with db_session:
+            entry = metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xab" * 20, "title": "abc"})
+            entry.health.set(seeders=3, leechers=1, last_check=int(time()))
+        with db_session:
+            metadata_store.db.execute("DROP TABLE PopularTorrent")
+        metadata_store.shutdown()
+
+        metadata_store = MetadataStore(db_path, self.private_key(0))
+        with db_session:
+            popular = metadata_store.get_entries(metadata_type=REGULAR_TORRENT, popular=True)
+            titles = [entry.title for entry in popular]
+            db_version = metadata_store.get_value("db_version")
+        metadata_store.shutdown()
+
+        self.assertEqual(["abc"], titles)
+        self.assertEqual(str(CURRENT_DB_VERSION), db_version)
+
+    @db_session
+    def test_get_auto_complete_terms(self) -> None:
+        """
+        Test if the last word of a query is completed with the most common title words that start with it.
+        """
+        for title in ["Ubuntu Linux", "ubuntu server", "Ubuntu-Studio", "Lubuntu"]:
+            self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": os.urandom(20), "title": title})
+        self.metadata_store.db.flush()
+
+        num_refreshed = self.metadata_store.refresh_completion_terms()
+        num_refreshed_again = self.metadata_store.refresh_completion_terms()
+
+        self.assertEqual(4, num_refreshed)
+        self.assertEqual(0, num_refreshed_again)
+        self.assertEqual(["ubuntu"], self.metadata_store.get_auto_complete_terms("ubu", max_terms=5))
+        self.assertEqual(["Ubuntu server", "Ubuntu studio"],
+                         self.metadata_store.get_auto_complete_terms("Ubuntu s", max_terms=5))
+        self.assertEqual(["Ubuntu server"], self.metadata_store.get_auto_complete_terms("Ubuntu s", max_terms=1))
+        self.assertEqual([], self.metadata_store.get_auto_complete_terms("ubuntu ", max_terms=5))
+        self.assertEqual(["Lubuntu linux"], self.metadata_store.get_auto_complete_terms("Lubuntu linux", max_terms=5))
+        self.assertEqual(["ubuntu"], self.metadata_store.get_auto_complete_terms("ubuntu", max_terms=5))
+
+    def test_migrate_completion_terms(self) -> None:
+        """
+        Test if the titles of an older database are collected into the auto-completion terms.
+        """
+        db_path = os.path.join(self.temporary_directory(), "metadata.db")
+        metadata_store = MetadataStore(db_path, self.private_key(0), db_version=18)
+        with db_session:
+            metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xab" * 20, "title": "pioneer one"})
+        with db_session:
+            metadata_store.db.execute("DROP TABLE CompletionTerm")
+        metadata_store.shutdown()
+
+        metadata_store = MetadataStore(db_path, self.private_key(0))
+        completions = metadata_store.get_auto_complete_terms("pio", max_terms=5)
+        with db_session:
+            db_version = metadata_store.get_value("db_version")
+        metadata_store.shutdown()
+
+        self.assertEqual(["pioneer"], completions)
+        self.assertEqual(str(CURRENT_DB_VERSION), db_version)
+
+    @db_session
+    def test_get_approximate_total(self) -> None:
+        """
+        Test if approximate totals are only marked as exact when they are.
+        """
+        self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xab" * 20, "title": "abc"})
+        self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xcd" * 20, "title": "abc def",
+                                                               "tags": "video"})
+        self.metadata_store.db.flush()
+
+        self.assertEqual((2, True), self.metadata_store.get_approximate_total(first=1, last=1, sort_by=None))
+        self.assertEqual((2, False), self.metadata_store.get_approximate_total(txt_filter="abc*"))
+        self.assertEqual((2, False), self.metadata_store.get_approximate_total(txt_filter="abc*",
+                                                                               metadata_type=REGULAR_TORRENT))
+        self.assertEqual((1, True), self.metadata_store.get_approximate_total(txt_filter="abc*", category="video"))
+
+    def test_plan_text_search(self) -> None:
+        """
+        Test if substring searches use the trigram index for terms that are long enough, and prefixes otherwise.
+        """
+        self.assertEqual((WORD_INDEX, '"matrix"'), plan_text_search('"matrix"'))
+        self.assertEqual((WORD_INDEX, '"matrix"'), plan_text_search('"matrix"', substring=True))
+        self.assertEqual((TRIGRAM_INDEX, '"atrix" "x264"'),
+                         plan_text_search('"atrix" "x2" "x264"', substring=True, trigram_index=True))
+        self.assertEqual((WORD_INDEX, '"ab"* "c"*'), plan_text_search('"ab" "c"', substring=True, trigram_index=True))
+
+    def test_substring_search(self) -> None:
+        """
+        Test if the trigram index follows the changes to the titles and is dropped when substring searches are off.
+        """
+        db_path = os.path.join(self.temporary_directory(), "metadata.db")
+        metadata_store = MetadataStore(db_path, self.private_key(0), substring_search=True)
+        with db_session:
+            for i, title in enumerate(["TheMatrix 1999", "ubuntu desktop", "Reloaded.Matrix"]):
+                metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": bytes([i + 1]) * 20, "title": title})
+        with db_session:
+            matrix = {entry.title for entry in metadata_store.get_entries(txt_filter='"matrix"', substring=True)}
+            words = {entry.title for entry in metadata_store.get_entries(txt_filter='"matrix"')}
+            metadata_store.TorrentMetadata.get(infohash=b"\x01" * 20).title = "TheMatri 1999"
+            metadata_store.TorrentMetadata.get(infohash=b"\x03" * 20).delete()
+        with db_session:
+            updated = metadata_store.get_entries(txt_filter='"matrix"', substring=True)
+            total = metadata_store.get_approximate_total(txt_filter='"desk"', substring=True)
+            merging = metadata_store.merge_fts_index(10)
+        metadata_store.shutdown()
+        metadata_store = MetadataStore(db_path, self.private_key(0))
+        with db_session:
+            fallback = {entry.title for entry in metadata_store.get_entries(txt_filter='"matrix"', substring=True)}
+            tables = metadata_store.db.select("name FROM sqlite_master WHERE name LIKE 'FtsTrigram%'")
+        metadata_store.shutdown()
+
+        self.assertEqual({"TheMatrix 1999", "Reloaded.Matrix"}, matrix)
+        self.assertEqual({"Reloaded.Matrix"}, words)
+        self.assertEqual([], updated)
+        self.assertEqual((1, False), total)
+        self.assertFalse(merging)
+        self.assertEqual(set(), fallback)
+        self.assertEqual([], tables)
+
+    @db_session
+    def test_get_simple_dicts(self) -> None:
+        """
+        Test if the projected entries are equal to their ``to_simple_dict`` forms, in the requested order.
+        """
+        entries = [self.metadata_store.TorrentMetadata.add_ffa_from_dict({
+            "infohash": bytes([i]) * 20, "title": f"torrent {i}", "tags": "video", "size": i,
+            "torrent_date": int2time(1700000000 + i)
+        }) for i in range(3)]
+        entries[1].health.set(seeders=3, leechers=2, last_check=1700000000)
+        self.metadata_store.db.flush()
+        rowids = [entries[2].rowid, entries[0].rowid, 1000, entries[1].rowid]
+
+        simple_dicts = self.metadata_store.get_simple_dicts(rowids)
+
+        self.assertEqual([entries[i].to_simple_dict() for i in (2, 0, 1)], simple_dicts)
+
+    @db_session
+    def test_get_simple_entries_cached(self) -> None:
+        """
+        Test if repeated queries are served from the result cache, as fresh copies.
+        """
+        self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\xab" * 20, "title": "abc"})
+
+        results1 = self.metadata_store.get_simple_entries(tags=[], first=1, last=10)
+        results1[0]["progress"] = 1.0
+        results2 = self.metadata_store.get_simple_entries(first=1, tags=[], last=10)
+
+        self.assertEqual(["abc"], [result["name"] for result in results2])
+        self.assertNotIn("progress", results2[0])
+        self.assertEqual({"hits": 1, "misses": 1, "size": 1}, self.metadata_store.get_result_cache_stats())
+
+    def test_get_simple_entries_invalidated(self) -> None:
+        """
+        Test if cached query results are invalidated by committed writes.
+        """
+        metadata_store = MetadataStore(os.path.join(self.temporary_directory(), "metadata.db"), self.private_key(0))
+        metadata_store.submit_write(metadata_store.TorrentMetadata.add_ffa_from_dict,
+                                    {"infohash": b"\xab" * 20, "title": "abc"}).result()
+        metadata_store.get_simple_entries()
+
+        metadata_store.submit_write(metadata_store.process_torrent_health,
+                                    HealthInfo(b"\xab" * 20, seeders=3, leechers=1, last_check=1)).result()
+        results = metadata_store.get_simple_entries()
+        stats = metadata_store.get_result_cache_stats()
+        metadata_store.shutdown()
+
+        self.assertEqual(3, results[0]["num_seeders"])
+        self.assertEqual({"hits": 0, "misses": 2, "size": 1}, stats)
+
+    @db_session
+    def test_get_entries_keyset_pagination(self) -> None:
+        """
+        Test if paging with keysets gives the same pages as paging by range, for every sort order and filter.
+        """
+        for i in range(7):
+            self.metadata_store.TorrentMetadata(title=f"torrent {i % 3}", infohash=bytes([i + 1]) * 20, size=i % 2,
+                                                torrent_date=int2time(i // 2))
+            self.metadata_store.TorrentState.get(infohash=bytes([i + 1]) * 20).set(seeders=i % 3, leechers=i % 2)
+        self.metadata_store.TorrentMetadata.get(infohash=b"\x01" * 20).size = None
+        max_rowid = self.metadata_store.TorrentMetadata.get(infohash=b"\x05" * 20).rowid
+
+        for sort_by, sort_desc, filters in product([None, "HEALTH", "size", "title", "torrent_date"], [True, False],
+                                                   [{}, {"max_rowid": max_rowid}]):
+            query = {"sort_by": sort_by, "sort_desc": sort_desc, "first": 1, "last": 3, **filters}
+            by_range = [self.metadata_store.get_entries(**dict(query, first=first, last=first + 2))
+                        for first in (1, 4, 7)]
+            by_keyset = [self.metadata_store.get_entries(**query)]
+            for _ in range(2):
+                after = self.metadata_store.get_next_keyset([e.rowid for e in by_keyset[-1]], **query)
+                by_keyset.append(self.metadata_store.get_entries(after=after, **query))
+
+            self.assertEqual([[e.rowid for e in page] for page in by_range],
+                             [[e.rowid for e in page] for page in by_keyset], query)
+
+    @db_session
+    def test_get_entries_keyset_ranked_search(self) -> None:
+        """
+        Test if paging through ranked search results with keysets gives the same pages as paging by range.
+        """
+        for i in range(5):
+            self.metadata_store.TorrentMetadata(title=f"ubuntu {i}", infohash=bytes([i + 1]) * 20)
+        query = {"txt_filter": "ubuntu", "first": 1, "last": 2}
+
+        first_page = self.metadata_store.get_entries(**query)
+        after = self.metadata_store.get_next_keyset([e.rowid for e in first_page], **query)
+        second_page = self.metadata_store.get_entries(after=after, **query)
+
+        self.assertEqual([2], after)
+        self.assertEqual(self.metadata_store.get_entries(txt_filter="ubuntu", first=3, last=4), second_page)
+
+    def test_journal_mode_wal(self) -> None:
+        """
+        Test if on-disk databases are opened in WAL mode.
+        """
+        metadata_store = MetadataStore(os.path.join(self.temporary_directory(), "metadata.db"), self.private_key(0))
+
+        with db_session:
+            journal_mode = metadata_store.db.execute("PRAGMA journal_mode").fetchone()[0]
+        metadata_store.shutdown()
+
+        self.assertEqual("wal", journal_mode)
+
+    async def test_run_threaded_read_is_read_only(self) -> None:
+        """
+        Test if the pooled reader connections can read, but not write.
+        """
+        metadata_store = MetadataStore(os.path.join(self.temporary_directory(), "metadata.db"), self.private_key(0))
+
+        @db_session
+        def add_torrent(infohash: bytes) -> None:
+            metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": infohash, "title": "test"})
+
+        await metadata_store.run_threaded(add_torrent, b"\x01" * 20)
+        num_torrents = await metadata_store.run_threaded_read(metadata_store.get_num_torrents)
+        # The write is refused when the new objects are flushed (which Pony wraps) or, if it has to look up
+        # the torrent state first, when the transaction is upgraded to a write transaction.
+        with self.assertRaises((OperationalError, UnexpectedError)):
+            await metadata_store.run_threaded_read(add_torrent, b"\x02" * 20)
+        metadata_store.shutdown()
+
+        self.assertEqual(1, num_torrents)
+
+    def test_membership_filter(self) -> None:
+        """
+        Test if the membership filter is rebuilt with the keys in the database and learns the keys of new rows.
+        """
+        db_path = os.path.join(self.temporary_directory(), "metadata.db")
+        metadata_store = MetadataStore(db_path, self.private_key(0))
+        with db_session:
+            entry = metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x01" * 20, "title": "test"})
+            metadata_store.process_torrent_health(HealthInfo(b"\x02" * 20, seeders=1))
+        learned = [b"\x01" * 20 in metadata_store.membership_filter, b"\x02" * 20 in metadata_store.membership_filter]
+        metadata_store.shutdown()
+
+        metadata_store = MetadataStore(db_path, self.private_key(0))
+        membership_filter = metadata_store.membership_filter
+        rebuilt = [key in membership_filter for key in [b"\x01" * 20, b"\x02" * 20, entry_key(b"", entry.id_)]]
+        metadata_store.shutdown()
+
+        self.assertEqual([True, True], learned)
+        self.assertEqual([True, True, True], rebuilt)
+        self.assertNotIn(b"\x03" * 20, membership_filter)
+        self.assertEqual(3, membership_filter.get_stats()["keys"])
+
+    def test_fill_membership_filter_swap(self) -> None:
+        """
+        Test if the membership filter is rebuilt on the side, without clearing the filter that is being read.
+        """
+        with db_session:
+            self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x01" * 20, "title": "test"})
+        old_filter = self.metadata_store.membership_filter
+
+        self.metadata_store.fill_membership_filter()
+        with db_session:
+            self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x02" * 20, "title": "test"})
+
+        self.assertIsNot(old_filter, self.metadata_store.membership_filter)
+        self.assertIn(b"\x01" * 20, old_filter)
+        self.assertIn(b"\x01" * 20, self.metadata_store.membership_filter)
+        self.assertIn(b"\x02" * 20, self.metadata_store.membership_filter)
+
+    def test_write_queue_group_commit(self) -> None:
+        """
+        Test if the writes that are queued while the writer is busy are committed in a single transaction.
+        """
+        started = threading.Event()
+        busy = threading.Event()
+        commits = []
+        write_queue = WriteQueue(10, on_commit=lambda: commits.append(len(commits)))
+
+        def wait_until_released() -> bool:
+            started.set()
+            return busy.wait(5)
+
+        first = write_queue.submit(WriteCommand(wait_until_released))
+        started.wait(5)
+        rest = [write_queue.submit(WriteCommand(pow, (2, i))) for i in range(3)]
+        busy.set()
+        write_queue.shutdown()
+
+        self.assertEqual([True, 1, 2, 4], [future.result() for future in [first, *rest]])
+        self.assertEqual(2, len(commits))
+
+    def test_write_queue_lanes(self) -> None:
+        """
+        Test if the writes that are queued while the writer is busy are executed in the order of their lanes.
+        """
+        started = threading.Event()
+        busy = threading.Event()
+        order = []
+        write_queue = WriteQueue(10)
+
+        def wait_until_released() -> bool:
+            started.set()
+            return busy.wait(5)
+
+        write_queue.submit(WriteCommand(wait_until_released, exclusive=True))
+        started.wait(5)
+        for lane in [Lane.MAINTENANCE, Lane.INGESTION, Lane.INTERACTIVE]:
+            write_queue.submit(WriteCommand(order.append, (lane,), exclusive=True, lane=lane))
+        busy.set()
+        write_queue.shutdown()
+        stats = write_queue.stats.get_stats()
+
+        self.assertEqual([Lane.INTERACTIVE, Lane.INGESTION, Lane.MAINTENANCE], order)
+        self.assertEqual(2, stats["interactive"]["started"])
+        self.assertEqual(0, stats["maintenance"]["depth"])
+        self.assertLess(0, stats["maintenance"]["max_wait"])
+
+    def test_priority_executor_lanes(self) -> None:
+        """
+        Test if the calls that are queued while the threads are busy are executed in the order of their lanes.
+        """
+        started = threading.Event()
+        busy = threading.Event()
+        order = []
+        executor = PriorityExecutor(1, "TestRead")
+
+        def wait_until_released() -> bool:
+            started.set()
+            return busy.wait(5)
+
+        executor.submit(Lane.INTERACTIVE, wait_until_released)
+        started.wait(5)
+        futures = [executor.submit(lane, order.append, lane) for lane in [Lane.MAINTENANCE, Lane.REMOTE,
+                                                                          Lane.INTERACTIVE, Lane.REMOTE]]
+        depth = executor.stats.get_stats()["remote"]["depth"]
+        busy.set()
+        for future in futures:
+            future.result(5)
+        failed = executor.submit(Lane.REMOTE, int, "not a number")
+        executor.shutdown()
+
+        self.assertEqual([Lane.INTERACTIVE, Lane.REMOTE, Lane.REMOTE, Lane.MAINTENANCE], order)
+        self.assertEqual(2, depth)
+        self.assertIsInstance(failed.exception(), ValueError)
+        self.assertRaises(RuntimeError, executor.submit, Lane.INTERACTIVE, int)
+
+    async def test_submit_write_failure_isolated(self) -> None:
+        """
+        Test if a failing write does not take down the other writes it was grouped with.
+        """
+        metadata_store = MetadataStore(os.path.join(self.temporary_directory(), "metadata.db"), self.private_key(0))
+        busy = threading.Event()
+
+        def add_torrent(infohash: bytes, fail: bool = False) -> None:
+            metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": infohash, "title": "test"})
+            if fail:
+                msg = "Failed after writing"
+                raise ValueError(msg)
+
+        metadata_store.submit_write(busy.wait, 5)
+        futures = [metadata_store.submit_write(add_torrent, bytes([i]) * 20, fail=i == 1) for i in range(3)]
+        busy.set()
+        added = await asyncio.gather(*map(asyncio.wrap_future, futures), return_exceptions=True)
+        num_torrents = await metadata_store.run_threaded_read(metadata_store.get_num_torrents)
+        metadata_store.shutdown()
+
+        self.assertIsInstance(added[1], ValueError)
+        self.assertEqual(2, num_torrents)
+
+    async def test_new_torrents_notified_per_transaction(self) -> None:
+        """
+        Test if the torrents that are created by a transaction are announced in one notification after its commit.
+        """
+        notifier = Notifier()
+        on_batch = Mock()
+        created = []
+        notifier.add(Notification.new_torrent_metadata_batch_created, on_batch)
+        notifier.add(Notification.new_torrent_metadata_created, lambda infohash, title: created.append(infohash))
+        metadata_store = MetadataStore(os.path.join(self.temporary_directory(), "metadata.db"), self.private_key(0),
+                                       notifier=notifier)
+        busy = threading.Event()
+
+        def add_torrents(infohashes: list[bytes], fail: bool = False) -> None:
+            metadata_store.process_payloads([TorrentMetadataPayload(REGULAR_TORRENT, 0, NULL_KEY, 0, 0, 0, infohash,
+                                                                    1, int2time(0), "test", "video", "")
+                                             for infohash in infohashes], verified=True)
+            if fail:
+                msg = "Failed after writing"
+                raise ValueError(msg)
+
+        metadata_store.submit_write(busy.wait, 5)
+        futures = [metadata_store.submit_write(add_torrents, [b"\x00" * 20, b"\x0a" * 20]),
+                   metadata_store.submit_write(metadata_store.TorrentMetadata.add_ffa_from_dict,
+                                               {"infohash": b"\x05" * 20, "title": "test"}),
+                   metadata_store.submit_write(add_torrents, [b"\x06" * 20], fail=True)]
+        busy.set()
+        await asyncio.gather(*map(asyncio.wrap_future, futures), return_exceptions=True)
+        metadata_store.shutdown()
+
+        # The failing write rolls back its group, of which the other writes are retried in transactions of their own.
+        self.assertEqual([call(entries=[(b"\x00" * 20, "test"), (b"\x0a" * 20, "test")]),
+                          call(entries=[(b"\x05" * 20, "test")])], on_batch.call_args_list)
+        self.assertEqual([b"\x00" * 20, b"\x0a" * 20, b"\x05" * 20], created)
+
+    async def test_new_torrents_notified_per_batch(self) -> None:
+        """
+        Test if the torrents of the committed batches of a blob are announced, even if a later batch fails.
+        """
+        notifier = Notifier()
+        on_batch = Mock()
+        notifier.add(Notification.new_torrent_metadata_batch_created, on_batch)
+        metadata_store = MetadataStore(os.path.join(self.temporary_directory(), "metadata.db"), self.private_key(0),
+                                       notifier=notifier)
+        metadata_store.batch_size = 1
+        payloads = [TorrentMetadataPayload(REGULAR_TORRENT, 0, NULL_KEY, 0, 0, 0, bytes([i + 1]) * 20, 1,
+                                           int2time(0), "test", "video", "") for i in range(2)]
+        chunk = b"".join(payload.serialized() + payload.signature for payload in payloads)
+        process_payloads = metadata_store.process_payloads
+
+        def fail_second_batch(batch: list[TorrentMetadataPayload], *args: bool, **kwargs: bool) -> list:
+            result = process_payloads(batch, *args, **kwargs)
+            if batch[0].infohash != payloads[0].infohash:
+                msg = "Failed after writing"
+                raise ValueError(msg)
+            return result
+
+        with patch.object(metadata_store, "process_payloads", fail_second_batch):
+            result = await metadata_store.process_compressed_mdblob_threaded(compress(chunk))
+        with db_session:
+            num_entries = metadata_store.TorrentMetadata.select().count()
+        metadata_store.shutdown()
+
+        self.assertEqual([], result)
+        self.assertEqual(1, num_entries)
+        self.assertEqual([call(entries=[(b"\x01" * 20, "test")])], on_batch.call_args_list)
+        self.assertEqual([], metadata_store.created_torrents)
+
+    @db_session
+    def test_get_entries_filters(self) -> None:
+        """
+        Test if the entries are filtered and sorted according to the arguments, and counted and paged consistently.
+        """
+        now = int(time())
+        # The row id of every entry is i + 1.
+        for i in range(12):
+            entry = self.metadata_store.TorrentMetadata(title=f"ubuntu {i % 5}", infohash=bytes([i + 1]) * 20,
+                                                        size=i % 4, tags=["video", "audio,video", "audio"][i % 3],
+                                                        xxx=i % 2, origin_id=i % 3, torrent_date=int2time(now - i))
+            entry.health.set(seeders=i % 3, leechers=i % 4, last_check=now - 1000 * (i % 2), self_checked=i % 2 == 0)
+        arguments = [
+            ({}, [12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1]),
+            ({"sort_by": "size"}, [12, 8, 4, 11, 7, 3, 10, 6, 2, 9, 5, 1]),
+            ({"sort_by": "HEALTH", "sort_desc": False}, [1, 10, 7, 4, 5, 2, 11, 8, 9, 6, 3, 12]),
+            ({"sort_by": "title"}, [10, 5, 9, 4, 8, 3, 12, 7, 2, 11, 6, 1]),
+            ({"hide_xxx": True}, [11, 9, 7, 5, 3, 1]),
+            ({"category": "video"}, [11, 10, 8, 7, 5, 4, 2, 1]),
+            ({"tags": ["audio", "video"]}, [11, 8, 5, 2]),
+            ({"max_rowid": 5}, [5, 4, 3, 2, 1]),
+            ({"infohash": b"\x02" * 20}, [2]),
+            ({"infohash_set": {b"\x02" * 20, b"\x03" * 20, b"\x09" * 20}}, [9, 3, 2]),
+            ({"txt_filter": '"ubuntu" "3"', "sort_by": "size"}, [4, 9]),
+            ({"self_checked_torrent": True}, [11, 9, 7, 5, 3, 1]),
+            ({"txt_filter": "ubuntu", "origin_id": 1, "sort_by": "HEALTH"}, [8, 11, 2, 5]),
+            ({"health_checked_after": now}, [11, 9, 7, 5, 3, 1]),
+            ({"popular": True, "metadata_type": REGULAR_TORRENT}, [12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2]),
+            ({"channel_pk": b""}, [12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1]),
+            ({"origin_id": 2}, [12, 9, 6, 3]),
+            ({"metadata_type": CHANNEL_TORRENT}, []),
+            ({"category": "audio", "hide_xxx": True, "sort_by": "size"}, [11, 3, 9, 5]),
+        ]
+
+        for kwargs, expected in arguments:
+            with self.subTest(**{name: str(value) for name, value in kwargs.items()}):
+                self.assertEqual(expected, self.metadata_store.get_entries_rowids(**kwargs))
+                self.assertEqual(expected[2:5], self.metadata_store.get_entries_rowids(first=3, last=5, **kwargs))
+                self.assertEqual(len(expected), self.metadata_store.get_total_count(**kwargs))
+
+    @db_session
+    def test_get_entries_search_rank_parity(self) -> None:
+        """
+        Test if the batched re-ranking of search results gives the same order as ranking inside SQLite.
+        """
+        now = 1700000000
+        titles = ["ubuntu", "ubuntu linux", "linux ubuntu", "ubuntu server edition", "the ubuntu linux iso",
+                  "ubuntu linux", "ubuntu desktop linux", "ubuntu"]
+        for i, title in enumerate(titles):
+            self.metadata_store.TorrentMetadata(title=title, infohash=bytes([i + 1]) * 20,
+                                                torrent_date=int2time(now - i * 86400 * 7))
+            self.metadata_store.TorrentState.get(infohash=bytes([i + 1]) * 20).set(seeders=(i * 7) % 5,
+                                                                                   leechers=i % 3,
+                                                                                   last_check=i % 2)
+        txt_filter = '"ubuntu" "linux"'
+        self.metadata_store.db.get_connection().create_function("search_rank", 5, torrent_rank)
+        expected = [rowid for rowid, in self.metadata_store.db.execute("""
+            SELECT g.rowid FROM ChannelNode g LEFT JOIN TorrentState torrentstate ON g.health = torrentstate.rowid
+            WHERE g.rowid IN (SELECT rowid FROM FtsIndex WHERE FtsIndex MATCH $txt_filter)
+            ORDER BY search_rank($txt_filter, g.title, torrentstate.seeders, torrentstate.leechers,
+                                 $now - strftime('%s', g.torrent_date)) DESC,
+                     torrentstate.last_check DESC
+        """)]
+
+        with patch("tribler.core.database.store.time", Mock(return_value=now)):
+            ranked = self.metadata_store.get_entries(txt_filter=txt_filter)
+            paged = self.metadata_store.get_entries(txt_filter=txt_filter, first=2, last=4)
+
+        self.assertEqual(5, len(ranked))
+        self.assertEqual(expected, [entry.rowid for entry in ranked])
+        self.assertEqual(expected[1:4], [entry.rowid for entry in paged])
+
+    def test_serialized_cached(self) -> None:
+        """
+        Test if the cached serialized form of a stored entry equals its fresh serialization.
+        """
+        with db_session:
+            entry = self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x01" * 20, "title": "test"})
+            self.metadata_store.db.flush()
+            blob = entry.serialized()
+            cached = self.metadata_store.signed_blob_cache.get(entry.rowid)
+            fresh = entry.payload_class.from_dict(**entry.to_dict())
+
+        self.assertEqual(blob, cached)
+        self.assertEqual(fresh.serialized() + fresh.signature, blob)
+
+    def test_serialized_cache_invalidated(self) -> None:
+        """
+        Test if the cached serialized form of an entry is dropped when the entry is changed or deleted.
+        """
+        with db_session:
+            entry = self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x01" * 20, "title": "test"})
+            self.metadata_store.db.flush()
+            old_blob = entry.serialized()
+            entry.tags = "video"
+            self.metadata_store.db.flush()
+            new_blob = entry.serialized()
+            entry.delete()
+            self.metadata_store.db.flush()
+
+        self.assertNotEqual(old_blob, new_blob)
+        self.assertIsNone(self.metadata_store.signed_blob_cache.get(entry.rowid))
+
+    def test_evict_entries(self) -> None:
+        """
+        Test if the least valuable unprotected free-for-all entries are evicted, with their orphaned states and trackers.
+        """
+        health = {b"\x01": (0, 0), b"\x02": (0, 10), b"\x03": (5, 10), b"\x04": (0, 0), b"\x05": (0, 0)}
+        with db_session:
+            for prefix, (seeders, last_check) in health.items():
+                entry = self.metadata_store.TorrentMetadata.add_ffa_from_dict({
+                    "infohash": prefix * 20, "title": f"torrent {prefix[0]}",
+                    "tracker_info": f"http://tracker{prefix[0]}.org/announce"
+                })
+                entry.health.set(seeders=seeders, last_check=last_check)
+            self.metadata_store.TorrentMetadata(title="signed", infohash=b"\x06" * 20, id_=6,
+                                                public_key=self.metadata_store.my_public_key_bin)
+
+        evicted = self.metadata_store.evict_entries(3, protected_infohashes={b"\x04" * 20})
+        with db_session:
+            titles = sorted(entry.title for entry in self.metadata_store.TorrentMetadata.select())
+            states = self.metadata_store.db.select("SELECT count(*) FROM TorrentState")[0]
+            trackers = self.metadata_store.db.select("SELECT url FROM TrackerState")
+            searched = [entry.title for entry in self.metadata_store.get_entries(txt_filter='"torrent"*')]
+
+        self.assertEqual(3, evicted)
+        self.assertEqual(["signed", "torrent 3", "torrent 4"], titles)
+        self.assertEqual(3, states)
+        self.assertEqual(["http://tracker3.org/announce", "http://tracker4.org/announce"], sorted(trackers))
+        self.assertEqual(["torrent 3", "torrent 4"], sorted(searched))
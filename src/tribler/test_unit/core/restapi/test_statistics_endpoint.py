@@ -29,7 +29,10 @@ class TestStatisticsEndpoint(TestBase):
         """
         endpoint = StatisticsEndpoint()
         endpoint.session = Mock(download_manager=None)
-        endpoint.session.mds = Mock(get_db_file_size=Mock(return_value=42), get_num_torrents=Mock(return_value=7))
+        endpoint.session.mds = Mock(get_db_file_size=Mock(return_value=42), get_num_torrents=Mock(return_value=7),
+                                    get_result_cache_stats=Mock(return_value={"hits": 3, "misses": 1, "size": 1}),
+                                    get_membership_filter_stats=Mock(return_value={"keys": 7, "memory": 128}),
+                                    get_executor_stats=Mock(return_value={"read": {"remote": {"depth": 2}}}))
         request = MockRequest("/api/statistics/tribler")
 
         response = endpoint.get_tribler_stats(request)
@@ -37,6 +40,24 @@ class TestStatisticsEndpoint(TestBase):
 
         self.assertEqual(42, response_body_json["tribler_statistics"]["db_size"])
         self.assertEqual(7, response_body_json["tribler_statistics"]["num_torrents"])
+        self.assertEqual({"hits": 3, "misses": 1, "size": 1}, response_body_json["tribler_statistics"]["result_cache"])
+        self.assertEqual({"keys": 7, "memory": 128}, response_body_json["tribler_statistics"]["membership_filter"])
+        self.assertEqual({"read": {"remote": {"depth": 2}}}, response_body_json["tribler_statistics"]["executors"])
+
+    async def test_get_tribler_stats_with_maintenance(self) -> None:
+        """
+        Test if getting Tribler stats forwards the stats of the last database maintenance.
+        """
+        stats = {"analyze": {"last_run": 10.0, "duration": 0.5, "steps": 1, "complete": True}}
+        endpoint = StatisticsEndpoint()
+        endpoint.session = Mock(mds=None, download_manager=None)
+        endpoint.db_maintenance = Mock(get_stats=Mock(return_value=stats))
+        request = MockRequest("/api/statistics/tribler")
+
+        response = endpoint.get_tribler_stats(request)
+        response_body_json = await response_to_json(response)
+
+        self.assertEqual(stats, response_body_json["tribler_statistics"]["maintenance"])
 
     async def test_get_ipv8_stats_no_ipv8(self) -> None:
         """
@@ -86,3 +86,20 @@ class TestNotifier(TestBase):
 
         with self.assertRaises(TypeError):
             self.notifier.notify(Notification.tribler_new_version, version="test")
+
+    def test_batch_adapter(self) -> None:
+        """
+        Test if the observers of new torrents are notified of every torrent of a batch, and delegates of the batch.
+        """
+        callback = Mock()
+        delegate = Mock()
+        self.notifier.add(Notification.new_torrent_metadata_created, callback)
+        self.notifier.delegates.add(delegate)
+
+        self.notifier.notify(Notification.new_torrent_metadata_batch_created,
+                             entries=[(b"\x01" * 20, "a"), (b"\x02" * 20, "b")])
+
+        self.assertEqual([call(infohash=b"\x01" * 20, title="a"), call(infohash=b"\x02" * 20, title="b")],
+                         callback.call_args_list)
+        self.assertEqual([call(Notification.new_torrent_metadata_batch_created,
+                               entries=[(b"\x01" * 20, "a"), (b"\x02" * 20, "b")])], delegate.call_args_list)
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+import os
 import random
 import secrets
 import time
 from binascii import unhexlify
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
+from ipv8.keyvault.crypto import default_eccrypto
 from ipv8.test.base import TestBase
 from ipv8.util import succeed
 
 import tribler
+from tribler.core.database.membership import MembershipFilter
+from tribler.core.database.store import MetadataStore
 from tribler.core.notifier import Notification, Notifier
 from tribler.core.torrent_checker.healthdataclasses import (
     TOLERABLE_TIME_DRIFT,
@@ -27,6 +32,9 @@ from tribler.core.torrent_checker.tracker_manager import TrackerManager
 from tribler.test_unit.core.torrent_checker.mocks import MockEntity, MockTorrentState, MockTrackerState
 from tribler.tribler_config import TriblerConfigManager
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 
 class MockMiniTorrentMetadata(MockEntity):
     """
@@ -57,7 +65,8 @@ class TestTorrentChecker(TestBase):
         """
         super().setUp()
 
-        self.metadata_store = Mock()
+        self.metadata_store = Mock(run_threaded=self.mds_run_now,
+                                   membership_filter=MagicMock(**{"__contains__.return_value": True}))
         self.metadata_store.TorrentState = MockTorrentState()
         self.metadata_store.TrackerState = MockTrackerState()
         self.metadata_store.TorrentMetadata = MockMiniTorrentMetadata()
@@ -77,6 +86,12 @@ class TestTorrentChecker(TestBase):
         await self.torrent_checker.shutdown()
         await super().tearDown()
 
+    async def mds_run_now(self, callback: Callable[..., Any], *args: Any, **kwargs) -> Any:  # noqa: ANN401
+        """
+        Run an mds callback immediately.
+        """
+        return callback(*args, **kwargs)
+
     async def test_create_socket_fail(self) -> None:
         """
         Test creation of the UDP socket of the torrent checker when it fails.
@@ -241,7 +256,7 @@ class TestTorrentChecker(TestBase):
 
         self.assertIsNone(result)
 
-    def test_get_valid_next_tracker_for_auto_check(self) -> None:
+    async def test_get_valid_next_tracker_for_auto_check(self) -> None:
         """
         Test if only valid tracker url are used for auto check.
         """
@@ -250,11 +265,37 @@ class TestTorrentChecker(TestBase):
             MockTrackerState("http://announce.torrentsmd.com:8080/announce"),
         ]
 
-        next_tracker = self.torrent_checker.get_next_tracker()
+        next_tracker = await self.torrent_checker.get_next_tracker()
 
         self.assertEqual("http://announce.torrentsmd.com:8080/announce", next_tracker.url)
 
-    def test_update_health(self) -> None:
+    async def test_tracker_writes_on_writer_thread(self) -> None:
+        """
+        Test if the tracker bookkeeping writes to the database on the writer thread, not on the event loop.
+        """
+        metadata_store = MetadataStore(os.path.join(self.temporary_directory(), "metadata.db"),
+                                       default_eccrypto.generate_key("curve25519"))
+        tracker_manager = TrackerManager(state_dir=Path("."), metadata_store=metadata_store)
+        torrent_checker = TorrentChecker(config=TriblerConfigManager(), tracker_manager=tracker_manager,
+                                         download_manager=MagicMock(), notifier=MagicMock(),
+                                         metadata_store=metadata_store)
+        await metadata_store.run_threaded(tracker_manager.add_tracker, "http://tracker.org:80/announce")
+        session = Mock(tracker_url="http://tracker.org/announce", is_failed=True, cleanup=AsyncMock())
+        torrent_checker.sessions[session.tracker_url].append(session)
+        writes = []
+
+        with patch.object(metadata_store.TrackerState, "before_update",
+                          lambda _: writes.append(metadata_store.write_queue.is_writer_thread())):
+            await torrent_checker.check_random_tracker()
+            await torrent_checker.clean_session(session)
+        tracker_info = tracker_manager.get_tracker_info(session.tracker_url)
+        await torrent_checker.shutdown()
+        metadata_store.shutdown()
+
+        self.assertEqual([True, True], writes)
+        self.assertEqual(1, tracker_info["failures"])
+
+    async def test_update_health(self) -> None:
         """
         Test if torrent health can be updated.
         """
@@ -267,7 +308,7 @@ class TestTorrentChecker(TestBase):
         ts = MockTorrentState(infohash=b"\xee" * 20)
         self.torrent_checker.mds.TorrentState.instances = [ts]
 
-        updated = self.torrent_checker.update_torrent_health(health)
+        updated = await self.torrent_checker.update_torrent_health(health)
 
         self.assertIsNotNone(updated)
         self.assertEqual(1, len(self.torrent_checker.torrents_checked))
@@ -297,29 +338,40 @@ class TestTorrentChecker(TestBase):
         for t in selected_torrents:
             self.assertIn(t.infohash, selection_range)
 
-    def test_update_torrent_health_invalid_health(self) -> None:
+    async def test_update_torrent_health_invalid_health(self) -> None:
         """
         Tests if invalid health is ignored in TorrentChecker.update_torrent_health().
         """
         health = HealthInfo(unhexlify('abcd0123'), last_check=int(time.time()) + TOLERABLE_TIME_DRIFT + 2)
 
-        self.assertFalse(self.torrent_checker.update_torrent_health(health))
+        self.assertFalse(await self.torrent_checker.update_torrent_health(health))
 
-    def test_update_torrent_health_not_self_checked(self) -> None:
+    async def test_update_torrent_health_not_self_checked(self) -> None:
         """
         Tests if non-self-checked health is ignored in TorrentChecker.update_torrent_health().
         """
         health = HealthInfo(unhexlify('abcd0123'))
 
-        self.assertFalse(self.torrent_checker.update_torrent_health(health))
+        self.assertFalse(await self.torrent_checker.update_torrent_health(health))
 
-    def test_update_torrent_health_unknown_torrent(self) -> None:
+    async def test_update_torrent_health_unknown_torrent(self) -> None:
         """
         Tests if unknown torrent's health is ignored in TorrentChecker.update_torrent_health().
         """
         health = HealthInfo(unhexlify('abcd0123'), 1, 2, self_checked=True)
 
-        self.assertFalse(self.torrent_checker.update_torrent_health(health))
+        self.assertFalse(await self.torrent_checker.update_torrent_health(health))
+
+    async def test_update_torrent_health_filtered_torrent(self) -> None:
+        """
+        Tests if a torrent that is not in the membership filter is ignored without writing to the database.
+        """
+        self.metadata_store.membership_filter = MembershipFilter(10)
+        self.metadata_store.run_threaded = AsyncMock()
+        health = HealthInfo(unhexlify('abcd0123'), 1, 2, self_checked=True)
+
+        self.assertFalse(await self.torrent_checker.update_torrent_health(health))
+        self.metadata_store.run_threaded.assert_not_called()
 
     async def test_update_torrent_health_no_replace(self) -> None:
         """
@@ -336,7 +388,7 @@ class TestTorrentChecker(TestBase):
 
         health = HealthInfo(unhexlify('abcd0123'), 1, 2, self_checked=True, last_check=now)
 
-        self.assertFalse(self.torrent_checker.update_torrent_health(health))
+        self.assertFalse(await self.torrent_checker.update_torrent_health(health))
 
         notified = mocked_handler.call_args.kwargs
         self.assertEqual(prev_health.infohash, unhexlify(notified["infohash"]))
@@ -1,3 +1,4 @@
+from asyncio import get_running_loop, sleep
 from importlib.metadata import PackageNotFoundError
 from unittest.mock import AsyncMock, Mock, patch
 
@@ -6,6 +7,8 @@ from ipv8.test.base import TestBase
 from packaging.version import Version
 
 import tribler
+from tribler.core.database.store import Lane
+from tribler.core.notifier import Notification, Notifier
 from tribler.core.versioning.manager import VersioningManager
 from tribler.test_unit.mocks import MockTriblerConfigManager
 from tribler.upgrade_script import FROM, TO
@@ -187,3 +190,41 @@ class TestVersioningManager(TestBase):
 
         with patch("os.path.isfile", lambda _: False):
             self.assertEqual(FROM, self.manager.can_upgrade())
+
+    async def test_upgrade_state_reporter(self) -> None:
+        """
+        Check if the upgrade state is notified on the event loop, also when it is reported from another thread.
+        """
+        notifier = Notifier()
+        callback = Mock()
+        notifier.add(Notification.tribler_upgrade_state, callback)
+        manager = VersioningManager(self.task_manager, MockTriblerConfigManager(), notifier)
+
+        report_state = manager.get_upgrade_state_reporter()
+        await get_running_loop().run_in_executor(None, report_state, "Copying torrents (2/4)")
+        await sleep(0)
+
+        callback.assert_called_once_with(state="Copying torrents (2/4)")
+
+    def test_upgrade_state_reporter_no_notifier(self) -> None:
+        """
+        Check if there is no upgrade state reporter without a notifier.
+        """
+        self.assertIsNone(self.manager.get_upgrade_state_reporter())
+
+    def test_upgrade_refreshes_metadata_store(self) -> None:
+        """
+        Check if the upgrade takes the place of the writer of the running metadata store, which refills its
+        membership filter after the upgrade.
+        """
+        metadata_store = Mock()
+        manager = VersioningManager(self.task_manager, MockTriblerConfigManager(), metadata_store=metadata_store)
+        upgrade = Mock()
+
+        with patch.dict(tribler.core.versioning.manager.__dict__, {"upgrade": upgrade}):
+            manager.upgrade("source", "destination", None)
+
+        metadata_store.submit_exclusive_write_in_lane.assert_called_once_with(Lane.INTERACTIVE, upgrade,
+                                                                              manager.config, "source",
+                                                                              "destination", None)
+        metadata_store.submit_write.assert_called_once_with(metadata_store.fill_membership_filter)
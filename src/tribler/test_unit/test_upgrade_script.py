@@ -0,0 +1,80 @@
+import os
+
+from ipv8.keyvault.crypto import default_eccrypto
+from ipv8.test.base import TestBase
+from pony.orm import db_session
+
+from tribler.core.database.store import MetadataStore
+from tribler.upgrade_script import _inject_7_14_tables
+
+
+class TestUpgradeScript(TestBase):
+    """
+    Tests for the upgrade script.
+    """
+
+    def create_metadata_store(self, name: str) -> MetadataStore:
+        """
+        Create a metadata store in a temporary directory.
+        """
+        return MetadataStore(os.path.join(self.temporary_directory(), name),
+                             default_eccrypto.generate_key("curve25519"))
+
+    def test_inject_7_14_tables(self) -> None:
+        """
+        Test if the torrents, trackers and their health are copied from an old database into an existing one.
+        """
+        src = self.create_metadata_store("src.db")
+        with db_session:
+            tracker = src.TrackerState(url="http://tracker.org/announce", last_check=20, alive=False, failures=2)
+            for i, title in enumerate(["ubuntu", "debian"]):
+                entry = src.TorrentMetadata.add_ffa_from_dict({"infohash": bytes([i]) * 20, "title": title,
+                                                               "tags": "software"})
+                entry.health.set(seeders=i + 1, leechers=0, last_check=10)
+                entry.health.trackers.add(tracker)
+        src.shutdown()
+        dst = self.create_metadata_store("dst.db")
+        with db_session:
+            dst.TrackerState(url="http://tracker.org/announce", last_check=10, alive=True, failures=1)
+            dst.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x00" * 20, "title": "ubuntu"})
+        dst.shutdown()
+        states = []
+
+        _inject_7_14_tables(src.db_path, dst.db_path, states.append)
+
+        dst = MetadataStore(dst.db_path, dst.my_key)
+        with db_session:
+            titles = sorted(entry.title for entry in dst.get_entries(txt_filter="debian OR ubuntu"))
+            tracker = dst.TrackerState.get(url="http://tracker.org/announce")
+            tracked = sorted(health.seeders for health in tracker.torrents)
+            tagged = dst.get_entries_count(category="software")
+            indices = dst.db.select("SELECT name FROM sqlite_master WHERE name LIKE 'idx_%'")
+        dst.shutdown()
+
+        self.assertEqual(["debian", "ubuntu"], titles)
+        self.assertEqual((20, False, 3), (tracker.last_check, tracker.alive, tracker.failures))
+        self.assertEqual([0, 2], tracked)
+        self.assertEqual(1, tagged)
+        self.assertIn("idx_channelnode__infohash", indices)
+        self.assertEqual(6, len(states))
+
+    def test_inject_7_14_tables_trigram_index(self) -> None:
+        """
+        Test if the copied torrents are added to the trigram index, if the new database has one.
+        """
+        src = self.create_metadata_store("src.db")
+        with db_session:
+            src.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x01" * 20, "title": "debian"})
+        src.shutdown()
+        dst = MetadataStore(os.path.join(self.temporary_directory(), "dst.db"),
+                            default_eccrypto.generate_key("curve25519"), substring_search=True)
+        dst.shutdown()
+
+        _inject_7_14_tables(src.db_path, dst.db_path)
+
+        dst = MetadataStore(dst.db_path, dst.my_key, substring_search=True)
+        with db_session:
+            titles = [entry.title for entry in dst.get_entries(txt_filter='"ebia"', substring=True)]
+        dst.shutdown()
+
+        self.assertEqual(["debian"], titles)
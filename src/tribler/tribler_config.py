@@ -53,6 +53,9 @@ class DatabaseConfig(TypedDict):
     """
 
     enabled: bool
+    max_size_mb: int
+    max_torrents: int
+    substring_search: bool
 
 
 class VersioningConfig(TypedDict):
@@ -206,7 +209,7 @@ DEFAULT_CONFIG = {
     "statistics": False,
 
     "content_discovery_community": ContentDiscoveryCommunityConfig(enabled=True),
-    "database": DatabaseConfig(enabled=True),
+    "database": DatabaseConfig(enabled=True, max_size_mb=0, max_torrents=0, substring_search=False),
     "dht_discovery": DHTDiscoveryCommunityConfig(enabled=True),
     "libtorrent": LibtorrentConfig(
         socks_listen_ports=[0, 0, 0, 0, 0],
@@ -13,30 +13,22 @@ import logging
 import os
 import shutil
 import sqlite3
-from itertools import islice
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from configobj import ConfigObj
-from pony.orm import Database, OperationalError, db_session
+
+from tribler.core.database.store import rebuild_fts_indexes
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Callable
 
     from tribler.tribler_config import TriblerConfigManager
 
 FROM: str = "7.14"
 TO: str = "8.0"
 
-# ruff: noqa: B007,C901,F841,N802,RUF015,W291
-
-
-def batched(results: list, n: int = 1) -> Generator[list]:
-    """
-    Backport for ``itertools.batched()``.
-    """
-    for start in islice(range(len(results)), None, None, 2):
-        yield results[start : (start+n)]
+logger = logging.getLogger(__name__)
 
 
 def _copy_if_not_exist(src: str, dst: str) -> None:
@@ -102,247 +94,67 @@ def _import_7_14_settings(src: str, dst: TriblerConfigManager) -> None:
     _copy_if_exists(old, "tunnel_community/max_circuits", dst, "tunnel_community/max_circuits", int)
 
 
-@db_session(retry=3)
-def _inject_StatementOp_inner(db: Database, batch: list) -> None:
-    """
-    The inner injection script to write old StatementOp info into the current database.
-    """
-    for (subject_name, subject_type,
-         object_name, object_type,
-         stmt_added_count, stmt_removed_count, stmt_local_operation,
-         peer_public_key, peer_added_at,
-         stmtop_operation, stmtop_clock, stmtop_signature, stmtop_updated_at, stmtop_auto_generated) in batch:
-        # Insert subject
-        results = list(db.execute("SELECT id FROM Resource WHERE name=$subject_name AND type=$subject_type",
-                                  globals(), locals()))
-        if not results:
-            cursor = db.execute("INSERT INTO Resource "
-                                "VALUES ((SELECT COALESCE(MAX(id),0)+1 FROM Resource), $subject_name, "
-                                "$subject_type)",
-                                globals(), locals())
-            results = [(cursor.lastrowid,)]
-        subject_id, = results[0]
-
-        # Insert object
-        results = list(
-            db.execute("SELECT id FROM Resource WHERE name=$object_name AND type=$object_type",
-                       globals(), locals()))
-        if not results:
-            cursor = db.execute(
-                "INSERT INTO Resource VALUES ((SELECT COALESCE(MAX(id),0)+1 FROM Resource), $object_name, "
-                "$object_type)",
-                globals(), locals()
-            )
-            results = [(cursor.lastrowid,)]
-        object_id, = results[0]
-
-        # Insert statement
-        results = list(db.execute(
-            "SELECT id FROM Statement WHERE object=$object_id AND subject=$subject_id",
-            globals(), locals()))
-        if not results:
-            cursor = db.execute(
-                "INSERT INTO Statement VALUES ((SELECT COALESCE(MAX(id),0)+1 FROM Statement), $subject_id, "
-                "$object_id, $stmt_added_count, $stmt_removed_count, $stmt_local_operation)",
-                globals(), locals()
-            )
-            results = [(cursor.lastrowid,)]
-        statement_id, = results[0]
-
-        # Insert peer
-        results = list(
-            db.execute("SELECT id, added_at FROM Peer WHERE public_key=$peer_public_key",
-                       globals(), locals()))
-        if results and results[0][1] >= peer_added_at:
-            db.execute("UPDATE Peer SET added_at=$peer_added_at WHERE public_key=$peer_public_key",
-                       globals(), locals())
-            results = [(results[0][0],)]
-        elif not results:
-            cursor = db.execute(
-                "INSERT INTO Peer VALUES ((SELECT COALESCE(MAX(id),0)+1 FROM Peer), $peer_public_key, "
-                "$peer_added_at)",
-                globals(), locals()
-            )
-            results = [(cursor.lastrowid,)]
-        else:
-            results = [(results[0][0],)]
-        peer_id, = results[0]
-
-        # Insert statement op
-        results = list(db.execute("SELECT id FROM StatementOp WHERE statement=$statement_id AND "
-                                  "peer=$peer_id",
-                                  globals(), locals()))
-        if not results:
-            db.execute(
-                "INSERT INTO StatementOp VALUES ((SELECT COALESCE(MAX(id),0)+1 FROM StatementOp), "
-                "$statement_id, $peer_id, $stmtop_operation, $stmtop_clock, $stmtop_signature, "
-                "$stmtop_updated_at, $stmtop_auto_generated)",
-                globals(), locals())
-
-
-@db_session(retry=3)
-def _inject_ChannelNode_inner(db: Database, batch: list) -> None:
-    """
-    The inner injection script to write old ChannelNode info into the current database.
-    """
-    for (infohash, size, torrent_date, tracker_info, title, tags, metadata_type, reserved_flags,
-         origin_id, public_key, id_, timestamp, signature, added_on, status, xxx, tag_processor_version,
-         seeders, leechers, last_check, self_checked, has_data) in batch:
-        # Insert subject
-        results = list(db.execute("SELECT rowid FROM TorrentState WHERE infohash=$infohash",
-                                  globals(), locals()))
-        if not results:
-            cursor = db.execute("INSERT INTO TorrentState "
-                                "VALUES ((SELECT COALESCE(MAX(rowid),0)+1 FROM TorrentState), "
-                                "$infohash, $seeders, $leechers, $last_check, $self_checked, $has_data)",
-                                globals(), locals())
-            results = [(cursor.lastrowid,)]
-        health_id, = results[0]
-
-        # Insert channel ChannelNode
-        results = list(db.execute("SELECT rowid FROM ChannelNode WHERE public_key=$public_key AND id_=$id_",
-                                  globals(), locals()))
-        if not results:
-            db.execute(
-                "INSERT INTO ChannelNode VALUES ((SELECT COALESCE(MAX(rowid),0)+1 FROM ChannelNode), "
-                "$infohash, $size, $torrent_date, $tracker_info, $title, $tags, $metadata_type, "
-                "$reserved_flags, $origin_id, $public_key, $id_, $timestamp, $signature, $added_on, "
-                "$status, $xxx, $health_id, $tag_processor_version)",
-                globals(), locals())
-
-
-def _inject_ChannelNode(abs_src_db: str, abs_dst_db: str) -> None:
-    """
-    Import old ChannelNode entries.
-    """
-    src_con = sqlite3.connect(abs_src_db)
-    output = list(src_con.execute("""SELECT ChannelNode.infohash, ChannelNode.size, ChannelNode.torrent_date, 
-ChannelNode.tracker_info, ChannelNode.title, ChannelNode.tags, ChannelNode.metadata_type, ChannelNode.reserved_flags, 
-ChannelNode.origin_id, ChannelNode.public_key, ChannelNode.id_, ChannelNode.timestamp, ChannelNode.signature, 
-ChannelNode.added_on, ChannelNode.status, ChannelNode.xxx, ChannelNode.tag_processor_version, TorrentState.seeders, 
-TorrentState.leechers, TorrentState.last_check, TorrentState.self_checked, TorrentState.has_data
-FROM ChannelNode
-INNER JOIN TorrentState ON ChannelNode.health=TorrentState.rowid
-;"""))
-    src_con.close()
-
-    db = Database()
-    db.bind(provider="sqlite", filename=abs_dst_db)
-    for batch in batched(output, n=20):
-        try:
-            _inject_ChannelNode_inner(db, batch)
-        except OperationalError as e:
-            logging.exception(e)
-    try:
-        db.disconnect()
-    except OperationalError as e:
-        logging.exception(e)
-
-
-@db_session(retry=3)
-def _inject_TrackerState_inner(db: Database, batch: list) -> None:
-    """
-    The inner injection script to write old TrackerState info into the current database.
-    """
-    for (url, last_check, alive, failures) in batch:
-        results = list(db.execute("SELECT rowid, last_check, alive, failures FROM TrackerState WHERE "
-                                  "url=$url",
-                                  globals(), locals()))
-        if results:
-            tracker_id, n_last_check, n_alive, n_failures = results[0]
-            s_last_check = max(n_last_check, last_check)
-            s_alive = alive if last_check > n_last_check else n_alive
-            s_failures = int(failures) + int(n_failures)
-            db.execute(
-                "UPDATE TrackerState SET last_check=$s_last_check, alive=$s_alive, failures=$s_failures "
-                "WHERE rowid=$tracker_id",
-                globals(), locals())
-        else:
-            db.execute(
-                "INSERT INTO TrackerState VALUES ((SELECT COALESCE(MAX(rowid),0)+1 FROM TrackerState), "
-                "$url, $last_check, $alive, $failures)",
-                globals(), locals())
-
-
-def _inject_TrackerState(abs_src_db: str, abs_dst_db: str) -> None:
-    """
-    Import old TrackerState entries.
-    """
-    src_con = sqlite3.connect(abs_src_db)
-    output = list(src_con.execute("SELECT url, last_check, alive, failures FROM TrackerState;"))
-    src_con.close()
-
-    db = Database()
-    db.bind(provider="sqlite", filename=abs_dst_db)
-    for batch in batched(output, n=20):
-        try:
-            _inject_TrackerState_inner(db, batch)
-        except OperationalError as e:
-            logging.exception(e)
-    try:
-        db.disconnect()
-    except OperationalError as e:
-        logging.exception(e)
-
-
-@db_session(retry=3)
-def _inject_TorrentState_TrackerState_inner(db: Database, batch: list) -> None:
-    """
-    The inner injection script to write old TorrentState info into the current database.
-    """
-    for (infohash, url) in batch:
-        results = list(db.execute("""SELECT TorrentState.infohash, TrackerState.url
-FROM TorrentState_TrackerState
-INNER JOIN TorrentState ON TorrentState_TrackerState.torrentstate=TorrentState.rowid
-INNER JOIN TrackerState ON TorrentState_TrackerState.trackerstate=TrackerState.rowid
-WHERE TorrentState.infohash=$infohash AND TrackerState.url=$url
-;""", globals(), locals()))
-        if not results:
-            # Note: both the tracker and torrent state should've been imported already
-            torrent_states = list(db.execute("SELECT rowid FROM TorrentState WHERE infohash=$infohash",
-                                             globals(), locals()))
-            tracker_states = list(db.execute("SELECT rowid FROM TrackerState WHERE url=$url",
-                                             globals(), locals()))
-            if not torrent_states:
-                logging.warning("Torrent state for %s disappeared mid-upgrade!", infohash)
-                continue
-            if not tracker_states:
-                logging.warning("Tracker state for %s disappeared mid-upgrade!", url)
-                continue
-            torrent_state, = torrent_states[0]
-            tracker_state, = tracker_states[0]
-            db.execute("INSERT INTO TorrentState_TrackerState VALUES ($torrent_state, $tracker_state)",
-                       globals(), locals())
-
-
-def _inject_TorrentState_TrackerState(abs_src_db: str, abs_dst_db: str) -> None:
-    """
-    Import old TorrentState_TrackerState entries.
-    """
-    src_con = sqlite3.connect(abs_src_db)
-    output = list(src_con.execute("""SELECT TorrentState.infohash, TrackerState.url
-FROM TorrentState_TrackerState
-INNER JOIN TorrentState ON TorrentState_TrackerState.torrentstate=TorrentState.rowid
-INNER JOIN TrackerState ON TorrentState_TrackerState.trackerstate=TrackerState.rowid
-;"""))
-    src_con.close()
-
-    db = Database()
-    db.bind(provider="sqlite", filename=abs_dst_db)
-    for batch in batched(output, n=20):
-        try:
-            _inject_TorrentState_TrackerState_inner(db, batch)
-        except OperationalError as e:
-            logging.exception(e)
-    try:
-        db.disconnect()
-    except OperationalError as e:
-        logging.exception(e)
-
-
-def _inject_7_14_tables(src_db: str, dst_db: str) -> None:
+# The set-based copy of the 7.14 metadata database (ATTACHed as "old") into the current one, as (state, statement).
+# The rows of the current database win: entries that it already has are left alone (``ON CONFLICT DO NOTHING``).
+# SQLite needs the ``WHERE true`` to parse an upsert that follows a ``SELECT``.
+_INJECT_7_14_STATEMENTS = [
+    ("Copying torrent health", """
+INSERT INTO main.TorrentState(infohash, seeders, leechers, last_check, self_checked, has_data)
+SELECT infohash, seeders, leechers, last_check, self_checked, has_data FROM old.TorrentState
+WHERE rowid IN (SELECT health FROM old.ChannelNode)
+ON CONFLICT DO NOTHING
+"""),
+    ("Copying torrents", """
+INSERT INTO main.ChannelNode(infohash, size, torrent_date, tracker_info, title, tags, metadata_type, reserved_flags,
+                             origin_id, public_key, id_, timestamp, signature, added_on, status, xxx, health,
+                             tag_processor_version)
+SELECT cn.infohash, cn.size, cn.torrent_date, cn.tracker_info, cn.title, cn.tags, cn.metadata_type, cn.reserved_flags,
+       cn.origin_id, cn.public_key, cn.id_, cn.timestamp, cn.signature, cn.added_on, cn.status, cn.xxx, ts.rowid,
+       cn.tag_processor_version
+FROM old.ChannelNode cn
+INNER JOIN old.TorrentState old_ts ON cn.health = old_ts.rowid
+INNER JOIN main.TorrentState ts ON ts.infohash = old_ts.infohash
+WHERE true
+ON CONFLICT DO NOTHING
+"""),
+    ("Copying trackers", """
+INSERT INTO main.TrackerState(url, last_check, alive, failures)
+SELECT url, last_check, alive, failures FROM old.TrackerState
+WHERE true
+ON CONFLICT(url) DO UPDATE SET
+    last_check = max(last_check, excluded.last_check),
+    alive = CASE WHEN excluded.last_check > last_check THEN excluded.alive ELSE alive END,
+    failures = failures + excluded.failures
+"""),
+    ("Copying torrent trackers", """
+INSERT INTO main.TorrentState_TrackerState(torrentstate, trackerstate)
+SELECT ts.rowid, tr.rowid
+FROM old.TorrentState_TrackerState link
+INNER JOIN old.TorrentState old_ts ON link.torrentstate = old_ts.rowid
+INNER JOIN old.TrackerState old_tr ON link.trackerstate = old_tr.rowid
+INNER JOIN main.TorrentState ts ON ts.infohash = old_ts.infohash
+INNER JOIN main.TrackerState tr ON tr.url = old_tr.url
+WHERE true
+ON CONFLICT DO NOTHING
+"""),
+]
+
+
+def _report_state(state: str, report_state: Callable[[str], None] | None) -> None:
+    """
+    Log the given upgrade state and pass it on to the given callback, if any.
+    """
+    logger.info(state)
+    if report_state is not None:
+        report_state(state)
+
+
+def _inject_7_14_tables(src_db: str, dst_db: str, report_state: Callable[[str], None] | None = None) -> None:
     """
     Fetch data from the old database and attempt to insert it into a new one.
+
+    The old database is attached to the new one and copied with one statement per table. The FTS triggers and the
+    indices of the new database are dropped during the copy, and rebuilt once afterward.
     """
     # If the src does not exist, there is nothing to copy.
     if not os.path.exists(src_db):
@@ -353,15 +165,36 @@ def _inject_7_14_tables(src_db: str, dst_db: str) -> None:
         shutil.copy(src_db, dst_db)
         return
 
-    abs_src_db = os.path.abspath(src_db)
-    abs_dst_db = os.path.abspath(dst_db)
-
-    _inject_ChannelNode(abs_src_db, abs_dst_db)
-    _inject_TrackerState(abs_src_db, abs_dst_db)
-    _inject_TorrentState_TrackerState(abs_src_db, abs_dst_db)
-
-
-def upgrade(config: TriblerConfigManager, source: str, destination: str) -> None:
+    connection = sqlite3.connect(os.path.abspath(dst_db), isolation_level=None)
+    try:
+        connection.execute("ATTACH DATABASE ? AS old", (os.path.abspath(src_db),))
+        connection.execute("BEGIN")
+        _report_state("Dropping the search index of the metadata database", report_state)
+        dropped = connection.execute("SELECT type, name, sql FROM main.sqlite_master "
+                                     "WHERE (type = 'index' AND name LIKE 'idx_%') "
+                                     "OR (type = 'trigger' AND name LIKE 'fts_%')").fetchall()
+        for db_object_type, name, _ in dropped:
+            connection.execute(f'DROP {db_object_type} "{name}"')
+
+        for i, (state, statement) in enumerate(_INJECT_7_14_STATEMENTS, start=1):
+            _report_state(f"{state} ({i}/{len(_INJECT_7_14_STATEMENTS)})", report_state)
+            connection.execute(statement)
+
+        _report_state("Rebuilding the search index of the metadata database", report_state)
+        for _, _, sql in dropped:
+            connection.execute(sql)
+        rebuild_fts_indexes(connection.cursor())
+        connection.execute("COMMIT")
+    except sqlite3.Error as e:
+        logger.exception(e)
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+    finally:
+        connection.close()
+
+
+def upgrade(config: TriblerConfigManager, source: str, destination: str,
+            report_state: Callable[[str], None] | None = None) -> None:
     """
     Perform the upgrade from the previous version to the next version.
     When complete, write a ".upgraded" file to the destination path.
@@ -370,6 +203,8 @@ def upgrade(config: TriblerConfigManager, source: str, destination: str) -> None
     The files in ``destination`` should be expected to be in the TO format.
 
     Make sure to deal with corruption and/or missing files!
+
+    The (human-readable) progress of long-running steps is passed to ``report_state``, if given.
     """
     # Step 1: import settings
     os.makedirs(destination, exist_ok=True)
@@ -386,7 +221,7 @@ def upgrade(config: TriblerConfigManager, source: str, destination: str) -> None
 
     # Step 3: Copy metadata db.
     _inject_7_14_tables(os.path.join(source, "sqlite", "metadata.db"),
-                        os.path.join(destination, "sqlite", "metadata.db"))
+                        os.path.join(destination, "sqlite", "metadata.db"), report_state)
 
     # Step 4: Signal that our upgrade is done.
     with open(os.path.join(config.get_version_state_dir(), ".upgraded"), "a"):